@@ -0,0 +1,45 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'scrape_jobs' table to store background scrape runs per customer
+-- ------------------------------------------------
+CREATE TABLE scrape_jobs (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    job_uid UUID NOT NULL UNIQUE DEFAULT uuid_generate_v4(),             -- Public-facing job id
+    customer_uid UUID NOT NULL,                                          -- Customer whose tracked companies are scraped
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',                        -- queued, running, completed, failed
+    companies_total INTEGER NOT NULL DEFAULT 0,                          -- Tracked companies covered by the job
+    error TEXT,                                                          -- Job-level error, if any
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Creation timestamp
+    started_at TIMESTAMP,                                                -- First time a worker picked the job up
+    finished_at TIMESTAMP,                                               -- Completion timestamp
+    CONSTRAINT fk_scrape_job_customer FOREIGN KEY (customer_uid) REFERENCES customers(customer_uid)
+);
+
+CREATE INDEX idx_scrape_jobs_status ON scrape_jobs (status);
+
+-- ------------------------------------------------
+-- Create 'scrape_job_units' table to checkpoint each (tracked company, source) of a job
+-- ------------------------------------------------
+CREATE TABLE scrape_job_units (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    job_uid UUID NOT NULL,                                               -- Owning scrape job
+    customer_uid UUID NOT NULL,                                          -- Customer of the owning job
+    tracked_company_uid UUID NOT NULL,                                   -- Tracked company to scrape
+    domain VARCHAR(256) NOT NULL,                                        -- Tracked company domain, for reporting
+    source VARCHAR(32) NOT NULL,                                         -- linkedin, changelog, news
+    status VARCHAR(32) NOT NULL DEFAULT 'pending',                       -- pending, running, done, failed
+    updates_stored INTEGER NOT NULL DEFAULT 0,                           -- Updates stored by this unit
+    attempts INTEGER NOT NULL DEFAULT 0,                                 -- Number of times a worker started this unit
+    error TEXT,                                                          -- Last error, if the unit failed
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last checkpoint timestamp
+    CONSTRAINT uq_scrape_job_unit UNIQUE (job_uid, tracked_company_uid, source),
+    CONSTRAINT fk_scrape_job_unit_job FOREIGN KEY (job_uid) REFERENCES scrape_jobs(job_uid) ON DELETE CASCADE,
+    CONSTRAINT fk_scrape_job_unit_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES tracked_companies(tracked_company_uid)
+);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop scrape job tables
+-- ------------------------------------------------
+DROP TABLE IF EXISTS scrape_job_units;
+DROP TABLE IF EXISTS scrape_jobs;
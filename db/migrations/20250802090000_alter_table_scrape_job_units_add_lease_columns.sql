@@ -0,0 +1,25 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Add lease columns to 'scrape_job_units' so workers on several nodes can claim units
+-- ------------------------------------------------
+ALTER TABLE scrape_job_units
+ADD COLUMN lease_owner VARCHAR(255),
+ADD COLUMN lease_expires_at TIMESTAMP,
+ADD COLUMN heartbeat_at TIMESTAMP;
+
+COMMENT ON COLUMN scrape_job_units.lease_owner IS 'Worker currently holding the unit (host:pid:worker)';
+COMMENT ON COLUMN scrape_job_units.lease_expires_at IS 'UTC time after which another worker may reclaim a running unit';
+COMMENT ON COLUMN scrape_job_units.heartbeat_at IS 'UTC time of the last lease extension by the owning worker';
+
+CREATE INDEX idx_scrape_job_units_claim ON scrape_job_units (status, lease_expires_at, id);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove lease columns from 'scrape_job_units'
+-- ------------------------------------------------
+DROP INDEX IF EXISTS idx_scrape_job_units_claim;
+
+ALTER TABLE scrape_job_units
+DROP COLUMN IF EXISTS lease_owner,
+DROP COLUMN IF EXISTS lease_expires_at,
+DROP COLUMN IF EXISTS heartbeat_at;
@@ -0,0 +1,16 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'rate_limit_buckets' table to share upstream token buckets between workers
+-- ------------------------------------------------
+CREATE TABLE rate_limit_buckets (
+    bucket_key VARCHAR(255) PRIMARY KEY,                                 -- Upstream host the bucket throttles
+    tokens DOUBLE PRECISION NOT NULL,                                    -- Tokens left; negative when callers are queued
+    updated_at TIMESTAMP NOT NULL,                                       -- UTC time tokens were last refilled
+    blocked_until TIMESTAMP                                              -- UTC time until which the upstream asked us to back off (Retry-After)
+);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'rate_limit_buckets' table
+-- ------------------------------------------------
+DROP TABLE IF EXISTS rate_limit_buckets;
@@ -0,0 +1,22 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'page_snapshots' table to remember what a scraped page looked like last time
+-- ------------------------------------------------
+CREATE TABLE page_snapshots (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    tracked_company_uid UUID NOT NULL,                                   -- Tracked company the page belongs to
+    url VARCHAR(500) NOT NULL,                                           -- Page URL (e.g. changelogs_url)
+    etag VARCHAR(500),                                                   -- ETag returned by the server, for If-None-Match
+    last_modified VARCHAR(100),                                          -- Last-Modified returned by the server, for If-Modified-Since
+    content_hash CHAR(64) NOT NULL,                                      -- sha256 of the normalised page text
+    fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last successful fetch
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last time the content hash changed
+    CONSTRAINT uq_page_snapshot UNIQUE (tracked_company_uid, url),
+    CONSTRAINT fk_page_snapshot_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES tracked_companies(tracked_company_uid)
+);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'page_snapshots' table
+-- ------------------------------------------------
+DROP TABLE IF EXISTS page_snapshots;
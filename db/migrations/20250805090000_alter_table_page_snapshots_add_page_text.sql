@@ -0,0 +1,15 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Keep the extracted text of each page so the next scrape can diff against it
+-- ------------------------------------------------
+ALTER TABLE page_snapshots
+ADD COLUMN page_text TEXT;
+
+COMMENT ON COLUMN page_snapshots.page_text IS 'Extracted text fragments of the page, one per line, as of the last processed fetch';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove page_text from 'page_snapshots'
+-- ------------------------------------------------
+ALTER TABLE page_snapshots
+DROP COLUMN IF EXISTS page_text;
@@ -0,0 +1,37 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'seen_items' table: every post/article/entry a scraper has already processed,
+-- whether or not it produced a company update, so it is not sent to the LLM again
+-- ------------------------------------------------
+CREATE TABLE seen_items (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    tracked_company_uid UUID NOT NULL,                                   -- Tracked company the item belongs to
+    source VARCHAR(50) NOT NULL,                                         -- Scraper source (linkedin, changelog, news)
+    item_key VARCHAR(500) NOT NULL,                                      -- Normalised source_url, or sha256 of the normalised text
+    first_seen_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,          -- When the item was first processed
+    CONSTRAINT uq_seen_item UNIQUE (tracked_company_uid, item_key),
+    CONSTRAINT fk_seen_item_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES tracked_companies(tracked_company_uid)
+);
+
+-- ------------------------------------------------
+-- Same key on 'company_updates' so a re-scraped item can never be stored twice
+-- ------------------------------------------------
+ALTER TABLE company_updates
+ADD COLUMN item_key VARCHAR(500);
+
+COMMENT ON COLUMN company_updates.item_key IS 'Dedup key of the scraped item (see seen_items.item_key); NULL for rows created before dedup';
+
+ALTER TABLE company_updates
+ADD CONSTRAINT uq_company_updates_item UNIQUE (tracked_company_uid, item_key);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop dedup key and 'seen_items' table
+-- ------------------------------------------------
+ALTER TABLE company_updates
+DROP CONSTRAINT IF EXISTS uq_company_updates_item;
+
+ALTER TABLE company_updates
+DROP COLUMN IF EXISTS item_key;
+
+DROP TABLE IF EXISTS seen_items;
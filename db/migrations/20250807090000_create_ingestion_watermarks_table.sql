@@ -0,0 +1,20 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'ingestion_watermarks' table: how far each source has been ingested per tracked company
+-- ------------------------------------------------
+CREATE TABLE ingestion_watermarks (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    tracked_company_uid UUID NOT NULL,                                   -- Tracked company the watermark belongs to
+    source VARCHAR(50) NOT NULL,                                         -- Scraper source (linkedin, news)
+    last_seen_posted_at TIMESTAMP NOT NULL,                              -- posted_at of the newest item ingested
+    cursor VARCHAR(500),                                                 -- Identifier (URL) of that newest item
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last time the watermark moved
+    CONSTRAINT uq_ingestion_watermark UNIQUE (tracked_company_uid, source),
+    CONSTRAINT fk_ingestion_watermark_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES tracked_companies(tracked_company_uid)
+);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'ingestion_watermarks' table
+-- ------------------------------------------------
+DROP TABLE IF EXISTS ingestion_watermarks;
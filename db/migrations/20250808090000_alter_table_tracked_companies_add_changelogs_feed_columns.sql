@@ -0,0 +1,18 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Add changelog feed columns to 'tracked_companies' (RSS/Atom feed or sitemap found next to changelogs_url)
+-- ------------------------------------------------
+ALTER TABLE tracked_companies
+ADD COLUMN changelogs_feed_url VARCHAR(500),
+ADD COLUMN changelogs_feed_checked_at TIMESTAMP;
+
+COMMENT ON COLUMN tracked_companies.changelogs_feed_url IS 'RSS/Atom feed or sitemap listing changelog entries; NULL when none was found';
+COMMENT ON COLUMN tracked_companies.changelogs_feed_checked_at IS 'When feed discovery last ran for changelogs_url';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove changelog feed columns from 'tracked_companies'
+-- ------------------------------------------------
+ALTER TABLE tracked_companies
+DROP COLUMN IF EXISTS changelogs_feed_url,
+DROP COLUMN IF EXISTS changelogs_feed_checked_at;
@@ -0,0 +1,28 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'discovery_cache' table: SERP + LLM lookups (LinkedIn page, changelog page) per competitor domain,
+-- shared by every customer tracking that domain
+-- ------------------------------------------------
+CREATE TABLE discovery_cache (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    domain VARCHAR(256) NOT NULL,                                        -- Normalised competitor domain (lowercase, no scheme/www)
+    kind VARCHAR(50) NOT NULL,                                           -- What was looked up: linkedin_url, changelogs_url
+    value VARCHAR(500),                                                  -- Discovered URL; NULL for a negative entry
+    failures INTEGER NOT NULL DEFAULT 0,                                 -- Consecutive failed lookups, drives the retry back-off
+    expires_at TIMESTAMP,                                                -- A positive entry is revalidated after this (UTC)
+    retry_after TIMESTAMP,                                               -- A negative entry is not looked up again before this (UTC)
+    checked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last lookup
+    CONSTRAINT uq_discovery_cache UNIQUE (domain, kind)
+);
+
+-- ------------------------------------------------
+-- The 'false' sentinel is replaced by negative cache entries; let those rows be looked up again
+-- ------------------------------------------------
+UPDATE tracked_companies SET linkedin_username = NULL WHERE linkedin_username = 'false';
+UPDATE tracked_companies SET changelogs_url = NULL WHERE changelogs_url = 'false';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'discovery_cache' table (cleared 'false' sentinels are not restored)
+-- ------------------------------------------------
+DROP TABLE IF EXISTS discovery_cache;
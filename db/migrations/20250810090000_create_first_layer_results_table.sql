@@ -0,0 +1,22 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'first_layer_results' table: customer-independent first-layer LLM analysis of a scraped item,
+-- shared by every customer tracking the same competitor
+-- ------------------------------------------------
+CREATE TABLE first_layer_results (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    domain VARCHAR(256) NOT NULL,                                        -- Normalised competitor domain
+    item_hash VARCHAR(64) NOT NULL,                                      -- sha256 of prompt, source type, company type, company name and item text
+    source_type VARCHAR(100),                                            -- Source the item came from, for inspection
+    result TEXT NOT NULL,                                                -- First-layer output (LLMTrackedCompanyUpdate) as JSON
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- When the analysis ran
+    CONSTRAINT uq_first_layer_results UNIQUE (domain, item_hash)
+);
+
+COMMENT ON COLUMN first_layer_results.item_hash IS 'Includes a hash of the first-layer prompt, so editing the prompt invalidates stored results';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'first_layer_results' table
+-- ------------------------------------------------
+DROP TABLE IF EXISTS first_layer_results;
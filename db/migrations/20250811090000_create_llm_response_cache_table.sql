@@ -0,0 +1,24 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'llm_response_cache' table: parsed LLM chain outputs keyed by model, prompt template and inputs
+-- ------------------------------------------------
+CREATE TABLE llm_response_cache (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID
+    cache_key VARCHAR(64) NOT NULL UNIQUE,                               -- sha256 of model, prompt template hash and canonical inputs
+    model VARCHAR(255) NOT NULL,                                         -- Chat model class and name the response came from
+    prompt_hash VARCHAR(64) NOT NULL,                                    -- sha256 of the prompt template and its partial variables
+    response TEXT NOT NULL,                                              -- Parsed chain output as JSON
+    hits INTEGER NOT NULL DEFAULT 0,                                     -- Times the entry was served
+    created_at TIMESTAMP NOT NULL,                                       -- UTC time the response was stored
+    expires_at TIMESTAMP NOT NULL,                                       -- UTC time after which the entry is ignored and evicted
+    last_used_at TIMESTAMP NOT NULL                                      -- UTC time of the last write or hit, drives LRU eviction
+);
+
+CREATE INDEX idx_llm_response_cache_last_used_at ON llm_response_cache (last_used_at);
+CREATE INDEX idx_llm_response_cache_expires_at ON llm_response_cache (expires_at);
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'llm_response_cache' table
+-- ------------------------------------------------
+DROP TABLE IF EXISTS llm_response_cache;
@@ -0,0 +1,15 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Add 'customer_context_summary' to 'customers': the compact, token-budgeted context the LLM layers read
+-- ------------------------------------------------
+ALTER TABLE customers
+ADD COLUMN customer_context_summary TEXT;
+
+COMMENT ON COLUMN customers.customer_context_summary IS 'Ranked summary of customer_context under CUSTOMER_CONTEXT_SUMMARY_MAX_TOKENS; rebuilt whenever customer_context is written';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove 'customer_context_summary' from 'customers'
+-- ------------------------------------------------
+ALTER TABLE customers
+DROP COLUMN IF EXISTS customer_context_summary;
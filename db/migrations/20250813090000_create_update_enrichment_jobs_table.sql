@@ -0,0 +1,41 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Create 'update_enrichment_jobs' table: queue of stored updates waiting for agent selection,
+-- the agent call and action-point generation, run by background workers off the scrape path
+-- ------------------------------------------------
+CREATE TABLE update_enrichment_jobs (
+    id SERIAL PRIMARY KEY,                                               -- Auto-incremented internal ID, claim order
+    company_update_id INTEGER NOT NULL UNIQUE,                           -- Update whose action_point the job fills in
+    customer_uid UUID NOT NULL,                                          -- Customer whose context the second and final layers use
+    tracked_company_uid UUID NOT NULL,                                   -- Tracked company the update belongs to
+    company VARCHAR(255) NOT NULL,                                       -- Competitor name as passed to the prompts
+    company_type VARCHAR(255),                                           -- Competitor type as passed to the prompts
+    source_type VARCHAR(255) NOT NULL,                                   -- Source the item came from
+    item_text TEXT NOT NULL,                                             -- Scraped item text the update was generated from
+    first_layer TEXT NOT NULL,                                           -- First-layer output (LLMTrackedCompanyUpdate) as JSON
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',                       -- pending, running, done or failed
+    attempts INTEGER NOT NULL DEFAULT 0,                                 -- Claims so far, including the current one
+    error TEXT,                                                          -- Last failure
+    lease_owner VARCHAR(255),                                            -- Worker holding the job while running
+    lease_expires_at TIMESTAMP,                                          -- After this a running job may be claimed again
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- When the update was queued
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,             -- Last status change
+    CONSTRAINT fk_update_enrichment_update FOREIGN KEY (company_update_id) REFERENCES company_updates(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_update_enrichment_jobs_status ON update_enrichment_jobs (status, id);
+
+-- Where the update is in enrichment, so readers can tell "action point coming" from "none"
+ALTER TABLE company_updates
+ADD COLUMN enrichment_status VARCHAR(20);
+
+COMMENT ON COLUMN company_updates.enrichment_status IS 'NULL when not queued for enrichment, else pending, done (action_point set), no_action_point or failed';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Drop 'update_enrichment_jobs' table and 'company_updates.enrichment_status'
+-- ------------------------------------------------
+ALTER TABLE company_updates
+DROP COLUMN IF EXISTS enrichment_status;
+
+DROP TABLE IF EXISTS update_enrichment_jobs;
@@ -0,0 +1,36 @@
+-- migrate:up
+-- ------------------------------------------------
+-- At most one queued or running scrape job per customer, enforced by the database so
+-- concurrent submits for the same customer cannot both create a job
+-- ------------------------------------------------
+
+-- Duplicates created before the index: keep the newest active job per customer
+UPDATE scrape_job_units SET status = 'failed', error = 'Superseded by a newer scrape job'
+WHERE status = 'pending'
+AND job_uid IN (
+    SELECT job_uid FROM scrape_jobs older
+    WHERE older.status IN ('queued', 'running')
+    AND EXISTS (
+        SELECT 1 FROM scrape_jobs newer
+        WHERE newer.customer_uid = older.customer_uid
+        AND newer.status IN ('queued', 'running')
+        AND newer.id > older.id
+    )
+);
+
+UPDATE scrape_jobs older SET status = 'failed', error = 'Superseded by a newer scrape job', finished_at = CURRENT_TIMESTAMP
+WHERE older.status IN ('queued', 'running')
+AND EXISTS (
+    SELECT 1 FROM scrape_jobs newer
+    WHERE newer.customer_uid = older.customer_uid
+    AND newer.status IN ('queued', 'running')
+    AND newer.id > older.id
+);
+
+CREATE UNIQUE INDEX uq_scrape_jobs_active_customer ON scrape_jobs (customer_uid) WHERE status IN ('queued', 'running');
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove the active-job index from 'scrape_jobs'
+-- ------------------------------------------------
+DROP INDEX IF EXISTS uq_scrape_jobs_active_customer;
@@ -0,0 +1,15 @@
+-- migrate:up
+-- ------------------------------------------------
+-- Add 'available_at' to 'update_enrichment_jobs' so a failed attempt is retried after a back-off
+-- ------------------------------------------------
+ALTER TABLE update_enrichment_jobs
+ADD COLUMN available_at TIMESTAMP;
+
+COMMENT ON COLUMN update_enrichment_jobs.available_at IS 'UTC time before which a pending job is not claimed; set after a failed attempt, NULL when claimable now';
+
+-- migrate:down
+-- ------------------------------------------------
+-- Remove 'available_at' from 'update_enrichment_jobs'
+-- ------------------------------------------------
+ALTER TABLE update_enrichment_jobs
+DROP COLUMN IF EXISTS available_at;
@@ -45,10 +45,26 @@ CREATE TABLE public.company_updates (
     created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
     action_point text,
     tracked_company_uid uuid NOT NULL,
-    is_saved boolean DEFAULT false
+    is_saved boolean DEFAULT false,
+    item_key character varying(500),
+    enrichment_status character varying(20)
 );
 
 
+--
+-- Name: COLUMN company_updates.item_key; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.company_updates.item_key IS 'Dedup key of the scraped item (see seen_items.item_key); NULL for rows created before dedup';
+
+
+--
+-- Name: COLUMN company_updates.enrichment_status; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.company_updates.enrichment_status IS 'NULL when not queued for enrichment, else pending, done (action_point set), no_action_point or failed';
+
+
 --
 -- Name: company_updates_id_seq; Type: SEQUENCE; Schema: public; Owner: -
 --
@@ -87,10 +103,18 @@ CREATE TABLE public.customers (
     onboarding_completion boolean DEFAULT false,
     created_at timestamp with time zone DEFAULT now(),
     customer_context text,
-    owner_id integer
+    owner_id integer,
+    customer_context_summary text
 );
 
 
+--
+-- Name: COLUMN customers.customer_context_summary; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.customers.customer_context_summary IS 'Ranked summary of customer_context under CUSTOMER_CONTEXT_SUMMARY_MAX_TOKENS; rebuilt whenever customer_context is written';
+
+
 --
 -- Name: customers_id_seq; Type: SEQUENCE; Schema: public; Owner: -
 --
@@ -142,6 +166,42 @@ CREATE SEQUENCE public.departments_id_seq
 ALTER SEQUENCE public.departments_id_seq OWNED BY public.departments.id;
 
 
+--
+-- Name: discovery_cache; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.discovery_cache (
+    id integer NOT NULL,
+    domain character varying(256) NOT NULL,
+    kind character varying(50) NOT NULL,
+    value character varying(500),
+    failures integer DEFAULT 0 NOT NULL,
+    expires_at timestamp without time zone,
+    retry_after timestamp without time zone,
+    checked_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+--
+-- Name: discovery_cache_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.discovery_cache_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: discovery_cache_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.discovery_cache_id_seq OWNED BY public.discovery_cache.id;
+
+
 --
 -- Name: email_recipients; Type: TABLE; Schema: public; Owner: -
 --
@@ -178,6 +238,118 @@ CREATE SEQUENCE public.email_recipients_id_seq
 ALTER SEQUENCE public.email_recipients_id_seq OWNED BY public.email_recipients.id;
 
 
+--
+-- Name: first_layer_results; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.first_layer_results (
+    id integer NOT NULL,
+    domain character varying(256) NOT NULL,
+    item_hash character varying(64) NOT NULL,
+    source_type character varying(100),
+    result text NOT NULL,
+    created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+--
+-- Name: COLUMN first_layer_results.item_hash; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.first_layer_results.item_hash IS 'Includes a hash of the first-layer prompt, so editing the prompt invalidates stored results';
+
+
+--
+-- Name: first_layer_results_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.first_layer_results_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: first_layer_results_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.first_layer_results_id_seq OWNED BY public.first_layer_results.id;
+
+
+--
+-- Name: ingestion_watermarks; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.ingestion_watermarks (
+    id integer NOT NULL,
+    tracked_company_uid uuid NOT NULL,
+    source character varying(50) NOT NULL,
+    last_seen_posted_at timestamp without time zone NOT NULL,
+    cursor character varying(500),
+    updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+--
+-- Name: ingestion_watermarks_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.ingestion_watermarks_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: ingestion_watermarks_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.ingestion_watermarks_id_seq OWNED BY public.ingestion_watermarks.id;
+
+
+--
+-- Name: llm_response_cache; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.llm_response_cache (
+    id integer NOT NULL,
+    cache_key character varying(64) NOT NULL,
+    model character varying(255) NOT NULL,
+    prompt_hash character varying(64) NOT NULL,
+    response text NOT NULL,
+    hits integer DEFAULT 0 NOT NULL,
+    created_at timestamp without time zone NOT NULL,
+    expires_at timestamp without time zone NOT NULL,
+    last_used_at timestamp without time zone NOT NULL
+);
+
+
+--
+-- Name: llm_response_cache_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.llm_response_cache_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: llm_response_cache_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.llm_response_cache_id_seq OWNED BY public.llm_response_cache.id;
+
+
 --
 -- Name: newsletters; Type: TABLE; Schema: public; Owner: -
 --
@@ -212,6 +384,62 @@ CREATE SEQUENCE public.newsletters_id_seq
 ALTER SEQUENCE public.newsletters_id_seq OWNED BY public.newsletters.id;
 
 
+--
+-- Name: page_snapshots; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.page_snapshots (
+    id integer NOT NULL,
+    tracked_company_uid uuid NOT NULL,
+    url character varying(500) NOT NULL,
+    etag character varying(500),
+    last_modified character varying(100),
+    content_hash character(64) NOT NULL,
+    fetched_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    changed_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    page_text text
+);
+
+
+--
+-- Name: COLUMN page_snapshots.page_text; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.page_snapshots.page_text IS 'Extracted text fragments of the page, one per line, as of the last processed fetch';
+
+
+--
+-- Name: page_snapshots_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.page_snapshots_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: page_snapshots_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.page_snapshots_id_seq OWNED BY public.page_snapshots.id;
+
+
+--
+-- Name: rate_limit_buckets; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.rate_limit_buckets (
+    bucket_key character varying(255) NOT NULL,
+    tokens double precision NOT NULL,
+    updated_at timestamp without time zone NOT NULL,
+    blocked_until timestamp without time zone
+);
+
+
 --
 -- Name: schema_migrations; Type: TABLE; Schema: public; Owner: -
 --
@@ -221,6 +449,139 @@ CREATE TABLE public.schema_migrations (
 );
 
 
+--
+-- Name: scrape_job_units; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.scrape_job_units (
+    id integer NOT NULL,
+    job_uid uuid NOT NULL,
+    customer_uid uuid NOT NULL,
+    tracked_company_uid uuid NOT NULL,
+    domain character varying(256) NOT NULL,
+    source character varying(32) NOT NULL,
+    status character varying(32) DEFAULT 'pending'::character varying NOT NULL,
+    updates_stored integer DEFAULT 0 NOT NULL,
+    attempts integer DEFAULT 0 NOT NULL,
+    error text,
+    updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    lease_owner character varying(255),
+    lease_expires_at timestamp without time zone,
+    heartbeat_at timestamp without time zone
+);
+
+
+--
+-- Name: COLUMN scrape_job_units.lease_owner; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.scrape_job_units.lease_owner IS 'Worker currently holding the unit (host:pid:worker)';
+
+
+--
+-- Name: COLUMN scrape_job_units.lease_expires_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.scrape_job_units.lease_expires_at IS 'UTC time after which another worker may reclaim a running unit';
+
+
+--
+-- Name: COLUMN scrape_job_units.heartbeat_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.scrape_job_units.heartbeat_at IS 'UTC time of the last lease extension by the owning worker';
+
+
+--
+-- Name: scrape_job_units_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.scrape_job_units_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: scrape_job_units_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.scrape_job_units_id_seq OWNED BY public.scrape_job_units.id;
+
+
+--
+-- Name: scrape_jobs; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.scrape_jobs (
+    id integer NOT NULL,
+    job_uid uuid DEFAULT public.uuid_generate_v4() NOT NULL,
+    customer_uid uuid NOT NULL,
+    status character varying(32) DEFAULT 'queued'::character varying NOT NULL,
+    companies_total integer DEFAULT 0 NOT NULL,
+    error text,
+    created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    started_at timestamp without time zone,
+    finished_at timestamp without time zone
+);
+
+
+--
+-- Name: scrape_jobs_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.scrape_jobs_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: scrape_jobs_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.scrape_jobs_id_seq OWNED BY public.scrape_jobs.id;
+
+
+--
+-- Name: seen_items; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.seen_items (
+    id integer NOT NULL,
+    tracked_company_uid uuid NOT NULL,
+    source character varying(50) NOT NULL,
+    item_key character varying(500) NOT NULL,
+    first_seen_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+--
+-- Name: seen_items_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.seen_items_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: seen_items_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.seen_items_id_seq OWNED BY public.seen_items.id;
+
+
 --
 -- Name: tracked_companies; Type: TABLE; Schema: public; Owner: -
 --
@@ -236,7 +597,9 @@ CREATE TABLE public.tracked_companies (
     created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP,
     linkedin_username character varying(255),
     changelogs_url character varying(255),
-    isactive boolean DEFAULT true NOT NULL
+    isactive boolean DEFAULT true NOT NULL,
+    changelogs_feed_url character varying(500),
+    changelogs_feed_checked_at timestamp without time zone
 );
 
 
@@ -247,6 +610,20 @@ CREATE TABLE public.tracked_companies (
 COMMENT ON COLUMN public.tracked_companies.isactive IS 'Flag indicating whether the company tracking is active';
 
 
+--
+-- Name: COLUMN tracked_companies.changelogs_feed_url; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.tracked_companies.changelogs_feed_url IS 'RSS/Atom feed or sitemap listing changelog entries; NULL when none was found';
+
+
+--
+-- Name: COLUMN tracked_companies.changelogs_feed_checked_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.tracked_companies.changelogs_feed_checked_at IS 'When feed discovery last ran for changelogs_url';
+
+
 --
 -- Name: tracked_companies_id_seq; Type: SEQUENCE; Schema: public; Owner: -
 --
@@ -267,6 +644,58 @@ CREATE SEQUENCE public.tracked_companies_id_seq
 ALTER SEQUENCE public.tracked_companies_id_seq OWNED BY public.tracked_companies.id;
 
 
+--
+-- Name: update_enrichment_jobs; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.update_enrichment_jobs (
+    id integer NOT NULL,
+    company_update_id integer NOT NULL,
+    customer_uid uuid NOT NULL,
+    tracked_company_uid uuid NOT NULL,
+    company character varying(255) NOT NULL,
+    company_type character varying(255),
+    source_type character varying(255) NOT NULL,
+    item_text text NOT NULL,
+    first_layer text NOT NULL,
+    status character varying(20) DEFAULT 'pending'::character varying NOT NULL,
+    attempts integer DEFAULT 0 NOT NULL,
+    error text,
+    lease_owner character varying(255),
+    lease_expires_at timestamp without time zone,
+    created_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at timestamp without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    available_at timestamp without time zone
+);
+
+
+--
+-- Name: COLUMN update_enrichment_jobs.available_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.update_enrichment_jobs.available_at IS 'UTC time before which a pending job is not claimed; set after a failed attempt, NULL when claimable now';
+
+
+--
+-- Name: update_enrichment_jobs_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.update_enrichment_jobs_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: update_enrichment_jobs_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.update_enrichment_jobs_id_seq OWNED BY public.update_enrichment_jobs.id;
+
+
 --
 -- Name: users; Type: TABLE; Schema: public; Owner: -
 --
@@ -326,6 +755,13 @@ ALTER TABLE ONLY public.customers ALTER COLUMN id SET DEFAULT nextval('public.cu
 ALTER TABLE ONLY public.departments ALTER COLUMN id SET DEFAULT nextval('public.departments_id_seq'::regclass);
 
 
+--
+-- Name: discovery_cache id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.discovery_cache ALTER COLUMN id SET DEFAULT nextval('public.discovery_cache_id_seq'::regclass);
+
+
 --
 -- Name: email_recipients id; Type: DEFAULT; Schema: public; Owner: -
 --
@@ -333,6 +769,27 @@ ALTER TABLE ONLY public.departments ALTER COLUMN id SET DEFAULT nextval('public.
 ALTER TABLE ONLY public.email_recipients ALTER COLUMN id SET DEFAULT nextval('public.email_recipients_id_seq'::regclass);
 
 
+--
+-- Name: first_layer_results id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.first_layer_results ALTER COLUMN id SET DEFAULT nextval('public.first_layer_results_id_seq'::regclass);
+
+
+--
+-- Name: ingestion_watermarks id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.ingestion_watermarks ALTER COLUMN id SET DEFAULT nextval('public.ingestion_watermarks_id_seq'::regclass);
+
+
+--
+-- Name: llm_response_cache id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.llm_response_cache ALTER COLUMN id SET DEFAULT nextval('public.llm_response_cache_id_seq'::regclass);
+
+
 --
 -- Name: newsletters id; Type: DEFAULT; Schema: public; Owner: -
 --
@@ -340,6 +797,34 @@ ALTER TABLE ONLY public.email_recipients ALTER COLUMN id SET DEFAULT nextval('pu
 ALTER TABLE ONLY public.newsletters ALTER COLUMN id SET DEFAULT nextval('public.newsletters_id_seq'::regclass);
 
 
+--
+-- Name: page_snapshots id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.page_snapshots ALTER COLUMN id SET DEFAULT nextval('public.page_snapshots_id_seq'::regclass);
+
+
+--
+-- Name: scrape_job_units id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_job_units ALTER COLUMN id SET DEFAULT nextval('public.scrape_job_units_id_seq'::regclass);
+
+
+--
+-- Name: scrape_jobs id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_jobs ALTER COLUMN id SET DEFAULT nextval('public.scrape_jobs_id_seq'::regclass);
+
+
+--
+-- Name: seen_items id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.seen_items ALTER COLUMN id SET DEFAULT nextval('public.seen_items_id_seq'::regclass);
+
+
 --
 -- Name: tracked_companies id; Type: DEFAULT; Schema: public; Owner: -
 --
@@ -347,6 +832,13 @@ ALTER TABLE ONLY public.newsletters ALTER COLUMN id SET DEFAULT nextval('public.
 ALTER TABLE ONLY public.tracked_companies ALTER COLUMN id SET DEFAULT nextval('public.tracked_companies_id_seq'::regclass);
 
 
+--
+-- Name: update_enrichment_jobs id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.update_enrichment_jobs ALTER COLUMN id SET DEFAULT nextval('public.update_enrichment_jobs_id_seq'::regclass);
+
+
 --
 -- Name: users id; Type: DEFAULT; Schema: public; Owner: -
 --
@@ -418,6 +910,14 @@ ALTER TABLE ONLY public.departments
     ADD CONSTRAINT departments_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: discovery_cache discovery_cache_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.discovery_cache
+    ADD CONSTRAINT discovery_cache_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: email_recipients email_recipients_email_key; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -442,6 +942,38 @@ ALTER TABLE ONLY public.email_recipients
     ADD CONSTRAINT email_recipients_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: first_layer_results first_layer_results_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.first_layer_results
+    ADD CONSTRAINT first_layer_results_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: ingestion_watermarks ingestion_watermarks_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.ingestion_watermarks
+    ADD CONSTRAINT ingestion_watermarks_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: llm_response_cache llm_response_cache_cache_key_key; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.llm_response_cache
+    ADD CONSTRAINT llm_response_cache_cache_key_key UNIQUE (cache_key);
+
+
+--
+-- Name: llm_response_cache llm_response_cache_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.llm_response_cache
+    ADD CONSTRAINT llm_response_cache_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: newsletters newsletters_newsletter_uid_key; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -458,6 +990,22 @@ ALTER TABLE ONLY public.newsletters
     ADD CONSTRAINT newsletters_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: page_snapshots page_snapshots_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.page_snapshots
+    ADD CONSTRAINT page_snapshots_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: rate_limit_buckets rate_limit_buckets_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.rate_limit_buckets
+    ADD CONSTRAINT rate_limit_buckets_pkey PRIMARY KEY (bucket_key);
+
+
 --
 -- Name: schema_migrations schema_migrations_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -466,6 +1014,38 @@ ALTER TABLE ONLY public.schema_migrations
     ADD CONSTRAINT schema_migrations_pkey PRIMARY KEY (version);
 
 
+--
+-- Name: scrape_job_units scrape_job_units_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_job_units
+    ADD CONSTRAINT scrape_job_units_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: scrape_jobs scrape_jobs_job_uid_key; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_jobs
+    ADD CONSTRAINT scrape_jobs_job_uid_key UNIQUE (job_uid);
+
+
+--
+-- Name: scrape_jobs scrape_jobs_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_jobs
+    ADD CONSTRAINT scrape_jobs_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: seen_items seen_items_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.seen_items
+    ADD CONSTRAINT seen_items_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: tracked_companies tracked_companies_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -482,6 +1062,78 @@ ALTER TABLE ONLY public.tracked_companies
     ADD CONSTRAINT tracked_companies_tracked_company_uid_key UNIQUE (tracked_company_uid);
 
 
+--
+-- Name: update_enrichment_jobs update_enrichment_jobs_company_update_id_key; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.update_enrichment_jobs
+    ADD CONSTRAINT update_enrichment_jobs_company_update_id_key UNIQUE (company_update_id);
+
+
+--
+-- Name: update_enrichment_jobs update_enrichment_jobs_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.update_enrichment_jobs
+    ADD CONSTRAINT update_enrichment_jobs_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: company_updates uq_company_updates_item; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.company_updates
+    ADD CONSTRAINT uq_company_updates_item UNIQUE (tracked_company_uid, item_key);
+
+
+--
+-- Name: discovery_cache uq_discovery_cache; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.discovery_cache
+    ADD CONSTRAINT uq_discovery_cache UNIQUE (domain, kind);
+
+
+--
+-- Name: first_layer_results uq_first_layer_results; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.first_layer_results
+    ADD CONSTRAINT uq_first_layer_results UNIQUE (domain, item_hash);
+
+
+--
+-- Name: ingestion_watermarks uq_ingestion_watermark; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.ingestion_watermarks
+    ADD CONSTRAINT uq_ingestion_watermark UNIQUE (tracked_company_uid, source);
+
+
+--
+-- Name: page_snapshots uq_page_snapshot; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.page_snapshots
+    ADD CONSTRAINT uq_page_snapshot UNIQUE (tracked_company_uid, url);
+
+
+--
+-- Name: scrape_job_units uq_scrape_job_unit; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_job_units
+    ADD CONSTRAINT uq_scrape_job_unit UNIQUE (job_uid, tracked_company_uid, source);
+
+
+--
+-- Name: seen_items uq_seen_item; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.seen_items
+    ADD CONSTRAINT uq_seen_item UNIQUE (tracked_company_uid, item_key);
+
+
 --
 -- Name: users users_clerk_id_key; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -514,6 +1166,48 @@ ALTER TABLE ONLY public.users
     ADD CONSTRAINT users_user_id_key UNIQUE (user_id);
 
 
+--
+-- Name: idx_llm_response_cache_expires_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_llm_response_cache_expires_at ON public.llm_response_cache USING btree (expires_at);
+
+
+--
+-- Name: idx_llm_response_cache_last_used_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_llm_response_cache_last_used_at ON public.llm_response_cache USING btree (last_used_at);
+
+
+--
+-- Name: idx_scrape_job_units_claim; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_scrape_job_units_claim ON public.scrape_job_units USING btree (status, lease_expires_at, id);
+
+
+--
+-- Name: idx_scrape_jobs_status; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_scrape_jobs_status ON public.scrape_jobs USING btree (status);
+
+
+--
+-- Name: idx_update_enrichment_jobs_status; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_update_enrichment_jobs_status ON public.update_enrichment_jobs USING btree (status, id);
+
+
+--
+-- Name: uq_scrape_jobs_active_customer; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX uq_scrape_jobs_active_customer ON public.scrape_jobs USING btree (customer_uid) WHERE ((status)::text = ANY ((ARRAY['queued'::character varying, 'running'::character varying])::text[]));
+
+
 --
 -- Name: tracked_companies fk_customer; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -546,6 +1240,14 @@ ALTER TABLE ONLY public.email_recipients
     ADD CONSTRAINT fk_department FOREIGN KEY (department_uid) REFERENCES public.departments(department_uid);
 
 
+--
+-- Name: ingestion_watermarks fk_ingestion_watermark_tracked_company; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.ingestion_watermarks
+    ADD CONSTRAINT fk_ingestion_watermark_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES public.tracked_companies(tracked_company_uid);
+
+
 --
 -- Name: newsletters fk_newsletter_customer; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -570,6 +1272,46 @@ ALTER TABLE ONLY public.customers
     ADD CONSTRAINT fk_owner FOREIGN KEY (owner_id) REFERENCES public.users(id) ON DELETE SET NULL;
 
 
+--
+-- Name: page_snapshots fk_page_snapshot_tracked_company; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.page_snapshots
+    ADD CONSTRAINT fk_page_snapshot_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES public.tracked_companies(tracked_company_uid);
+
+
+--
+-- Name: scrape_jobs fk_scrape_job_customer; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_jobs
+    ADD CONSTRAINT fk_scrape_job_customer FOREIGN KEY (customer_uid) REFERENCES public.customers(customer_uid);
+
+
+--
+-- Name: scrape_job_units fk_scrape_job_unit_job; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_job_units
+    ADD CONSTRAINT fk_scrape_job_unit_job FOREIGN KEY (job_uid) REFERENCES public.scrape_jobs(job_uid) ON DELETE CASCADE;
+
+
+--
+-- Name: scrape_job_units fk_scrape_job_unit_tracked_company; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.scrape_job_units
+    ADD CONSTRAINT fk_scrape_job_unit_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES public.tracked_companies(tracked_company_uid);
+
+
+--
+-- Name: seen_items fk_seen_item_tracked_company; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.seen_items
+    ADD CONSTRAINT fk_seen_item_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES public.tracked_companies(tracked_company_uid);
+
+
 --
 -- Name: company_updates fk_tracked_company; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -578,6 +1320,14 @@ ALTER TABLE ONLY public.company_updates
     ADD CONSTRAINT fk_tracked_company FOREIGN KEY (tracked_company_uid) REFERENCES public.tracked_companies(tracked_company_uid);
 
 
+--
+-- Name: update_enrichment_jobs fk_update_enrichment_update; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.update_enrichment_jobs
+    ADD CONSTRAINT fk_update_enrichment_update FOREIGN KEY (company_update_id) REFERENCES public.company_updates(id) ON DELETE CASCADE;
+
+
 --
 -- Name: users users_department_uid_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -606,4 +1356,19 @@ INSERT INTO public.schema_migrations (version) VALUES
     ('20250703060020'),
     ('20250709110217'),
     ('20250710063225'),
-    ('20250725134757');
+    ('20250725134757'),
+    ('20250801090000'),
+    ('20250802090000'),
+    ('20250803090000'),
+    ('20250804090000'),
+    ('20250805090000'),
+    ('20250806090000'),
+    ('20250807090000'),
+    ('20250808090000'),
+    ('20250809090000'),
+    ('20250810090000'),
+    ('20250811090000'),
+    ('20250812090000'),
+    ('20250813090000'),
+    ('20250814090000'),
+    ('20250815090000');
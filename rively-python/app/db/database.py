@@ -1,5 +1,6 @@
 # app/db/database.py
 from app.config import settings
+from app.scraper_config import scraper_settings
 from databases import Database
 
 # from config import settings
@@ -8,9 +9,22 @@ from databases import Database
 # Use the DATABASE_URL from app.config
 database = Database(settings.DATABASE_URL)
 
+# Scrape job queue; shares the main database unless SCRAPE_QUEUE_DATABASE_URL points elsewhere
+scrape_queue_database = (
+    Database(scraper_settings.SCRAPE_QUEUE_DATABASE_URL)
+    if scraper_settings.SCRAPE_QUEUE_DATABASE_URL
+    else database
+)
+
+# LLM response cache; shares the main database unless LLM_CACHE_DATABASE_URL points elsewhere
+llm_cache_database = (
+    Database(scraper_settings.LLM_CACHE_DATABASE_URL)
+    if scraper_settings.LLM_CACHE_DATABASE_URL
+    else database
+)
+
 async def get_db():
+    # The connection is owned by the app lifespan; background scrape jobs keep using it
+    # after the request that queued them has finished, so requests must not disconnect it.
     await database.connect()
-    try:
-        yield database
-    finally:
-        await database.disconnect()
\ No newline at end of file
+    yield database
\ No newline at end of file
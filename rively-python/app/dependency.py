@@ -1,12 +1,20 @@
 # app/dependency.py
-from fastapi import Depends
+from fastapi import Depends, Request
 from databases import Database
 from .repository.tracked_companies import TrackedCompanyRepository
 from .repository.tracked_company_updates import TrackedCompanyUpdateRepository
 from .repository.customers import CustomerRepository
+from .repository.page_snapshots import PageSnapshotRepository
+from .repository.seen_items import SeenItemRepository
+from .repository.ingestion_watermarks import IngestionWatermarkRepository
+from .repository.discovery_cache import DiscoveryCacheRepository
+from .repository.first_layer_results import FirstLayerResultRepository
+from .repository.update_enrichment import UpdateEnrichmentRepository
 
 from app.services.newsletter import NewsletterService
 from .services.scraper import ScraperService
+from .services.scrape_jobs import ScrapeJobManager
+from .services.update_enrichment import UpdateEnrichmentManager
 
 from .db.database import get_db
 
@@ -19,10 +27,44 @@ def get_company_update_repository(db: Database = Depends(get_db)) -> TrackedComp
 def get_customer_repository(db: Database = Depends(get_db)) -> CustomerRepository:
     return CustomerRepository(db)
 
+def get_page_snapshot_repository(db: Database = Depends(get_db)) -> PageSnapshotRepository:
+    return PageSnapshotRepository(db)
+
+def get_seen_item_repository(db: Database = Depends(get_db)) -> SeenItemRepository:
+    return SeenItemRepository(db)
+
+def get_ingestion_watermark_repository(db: Database = Depends(get_db)) -> IngestionWatermarkRepository:
+    return IngestionWatermarkRepository(db)
+
+def get_discovery_cache_repository(db: Database = Depends(get_db)) -> DiscoveryCacheRepository:
+    return DiscoveryCacheRepository(db)
+
+def get_first_layer_result_repository(db: Database = Depends(get_db)) -> FirstLayerResultRepository:
+    return FirstLayerResultRepository(db)
+
+def get_update_enrichment_repository(db: Database = Depends(get_db)) -> UpdateEnrichmentRepository:
+    return UpdateEnrichmentRepository(db)
+
 def get_scraper_service(scraper_repo: TrackedCompanyRepository = Depends(get_scraper_repository), 
                         company_update_repo: TrackedCompanyUpdateRepository = Depends(get_company_update_repository),
-                        customer_repo: CustomerRepository = Depends(get_customer_repository)) -> ScraperService:
-    return ScraperService(scraper_repo, company_update_repo, customer_repo)
+                        customer_repo: CustomerRepository = Depends(get_customer_repository),
+                        page_snapshot_repo: PageSnapshotRepository = Depends(get_page_snapshot_repository),
+                        seen_item_repo: SeenItemRepository = Depends(get_seen_item_repository),
+                        watermark_repo: IngestionWatermarkRepository = Depends(get_ingestion_watermark_repository),
+                        discovery_cache_repo: DiscoveryCacheRepository = Depends(get_discovery_cache_repository),
+                        first_layer_repo: FirstLayerResultRepository = Depends(get_first_layer_result_repository),
+                        enrichment_repo: UpdateEnrichmentRepository = Depends(get_update_enrichment_repository)) -> ScraperService:
+    return ScraperService(scraper_repo, company_update_repo, customer_repo, page_snapshot_repo, seen_item_repo, watermark_repo, discovery_cache_repo, first_layer_repo, enrichment_repo)
+
+def build_scraper_service(db: Database) -> ScraperService:
+    """Build a ScraperService outside of a request, e.g. for background scrape jobs."""
+    return ScraperService(TrackedCompanyRepository(db), TrackedCompanyUpdateRepository(db), CustomerRepository(db), PageSnapshotRepository(db), SeenItemRepository(db), IngestionWatermarkRepository(db), DiscoveryCacheRepository(db), FirstLayerResultRepository(db), UpdateEnrichmentRepository(db))
+
+def get_scrape_job_manager(request: Request) -> ScrapeJobManager:
+    return request.app.state.scrape_job_manager
+
+def get_update_enrichment_manager(request: Request) -> UpdateEnrichmentManager:
+    return request.app.state.update_enrichment_manager
 
 def get_newsletter_service(db: Database = Depends(get_db)):
     return NewsletterService(db)
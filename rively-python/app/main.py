@@ -4,7 +4,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import scraper
 from app.routers import newsletter 
-from app.db.database import database
+from app.db.database import database, scrape_queue_database, llm_cache_database
+from app.repository.scrape_jobs import ScrapeJobRepository
+from app.repository.customers import CustomerRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
+from app.dependency import build_scraper_service
+from app.services.scrape_jobs import ScrapeJobManager
+from app.services.update_enrichment import UpdateEnrichmentManager
+from app.utils.http_client import open_http_client, close_http_client
+from app.utils.browser_pool import close_crawler_pool
+from app.utils.text_extraction import shutdown_text_extraction_pool
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -14,8 +23,32 @@ async def lifespan(app: FastAPI):
     # yield
     # Startup logic
     await database.connect()
+    await scrape_queue_database.connect()
+    await llm_cache_database.connect()
+    await open_http_client()
+    scrape_job_manager = ScrapeJobManager(
+        lambda: build_scraper_service(database),
+        ScrapeJobRepository(scrape_queue_database),
+    )
+    await scrape_job_manager.start()
+    app.state.scrape_job_manager = scrape_job_manager
+    # Enrichment jobs update company_updates in the same transaction, so they live in the main database
+    update_enrichment_manager = UpdateEnrichmentManager(
+        UpdateEnrichmentRepository(database),
+        CustomerRepository(database),
+    )
+    await update_enrichment_manager.start()
+    app.state.update_enrichment_manager = update_enrichment_manager
     yield
     # Shutdown logic
+    # Scrape units queue enrichments, so they are drained first
+    await scrape_job_manager.shutdown()
+    await update_enrichment_manager.shutdown()
+    await close_http_client()
+    await close_crawler_pool()
+    shutdown_text_extraction_pool()
+    await scrape_queue_database.disconnect()
+    await llm_cache_database.disconnect()
     await database.disconnect()
 
 # Create FastAPI app with lifespan
@@ -1,3 +1,4 @@
+from typing import Optional
 from databases import Database
 from app.schemas.customers import CustomerContextUpdate
 
@@ -8,15 +9,26 @@ class CustomerRepository:
     async def update_customer_with_customer_context(self, customer_uid: str, company_update: CustomerContextUpdate):
             query = """
                 UPDATE customers
-                SET customer_context = :customer_context
+                SET customer_context = :customer_context,
+                    customer_context_summary = :customer_context_summary
                 WHERE customer_uid = :customer_uid
             """
             values = {
                 "customer_context": company_update.customer_context,
+                "customer_context_summary": company_update.customer_context_summary,
                 "customer_uid": customer_uid
             }
             await self.db.execute(query=query, values=values)
 
+    async def update_customer_context_summary(self, customer_uid: str, customer_context_summary: str):
+            query = """
+                UPDATE customers
+                SET customer_context_summary = :customer_context_summary
+                WHERE customer_uid = :customer_uid
+            """
+            values = {"customer_context_summary": customer_context_summary, "customer_uid": customer_uid}
+            await self.db.execute(query=query, values=values)
+
 
     async def get_customer_context(self, customer_uid: str) -> str:
             query = """
@@ -26,6 +38,14 @@ class CustomerRepository:
             result = await self.db.fetch_one(query=query, values=values)
             return result["customer_context"]
 
+    async def get_customer_context_summary(self, customer_uid: str) -> Optional[str]:
+            query = """
+                SELECT customer_context_summary FROM customers WHERE customer_uid = :customer_uid
+            """
+            values = {"customer_uid": customer_uid}
+            result = await self.db.fetch_one(query=query, values=values)
+            return result["customer_context_summary"] if result else None
+
     async def get_customer_company_domain(self, customer_uid: str) -> str:
             query = """
                 SELECT domain FROM customers WHERE customer_uid = :customer_uid
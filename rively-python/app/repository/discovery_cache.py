@@ -0,0 +1,46 @@
+from databases import Database
+from typing import Optional
+from app.schemas.discovery_cache import DiscoveryCacheEntry
+
+class DiscoveryCacheRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get_entry(self, domain: str, kind: str) -> Optional[DiscoveryCacheEntry]:
+        query = """
+            SELECT domain, kind, value, failures, expires_at, retry_after
+            FROM discovery_cache
+            WHERE domain = :domain AND kind = :kind
+        """
+        row = await self.db.fetch_one(query=query, values={"domain": domain, "kind": kind})
+        if row is None:
+            return None
+        return DiscoveryCacheEntry(
+            domain=row["domain"],
+            kind=row["kind"],
+            value=row["value"],
+            failures=row["failures"],
+            expires_at=row["expires_at"],
+            retry_after=row["retry_after"],
+        )
+
+    async def save_entry(self, entry: DiscoveryCacheEntry):
+        query = """
+            INSERT INTO discovery_cache (domain, kind, value, failures, expires_at, retry_after, checked_at)
+            VALUES (:domain, :kind, :value, :failures, :expires_at, :retry_after, CURRENT_TIMESTAMP)
+            ON CONFLICT (domain, kind) DO UPDATE SET
+                value = EXCLUDED.value,
+                failures = EXCLUDED.failures,
+                expires_at = EXCLUDED.expires_at,
+                retry_after = EXCLUDED.retry_after,
+                checked_at = EXCLUDED.checked_at
+        """
+        values = {
+            "domain": entry.domain,
+            "kind": entry.kind,
+            "value": entry.value,
+            "failures": entry.failures,
+            "expires_at": entry.expires_at,
+            "retry_after": entry.retry_after,
+        }
+        await self.db.execute(query=query, values=values)
@@ -0,0 +1,47 @@
+from databases import Database
+from datetime import datetime
+from typing import Optional
+from app.schemas.first_layer_results import FirstLayerResult
+
+class FirstLayerResultRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get_result(self, domain: str, item_hash: str, not_before: Optional[datetime] = None) -> Optional[FirstLayerResult]:
+        query = """
+            SELECT domain, item_hash, source_type, result, created_at
+            FROM first_layer_results
+            WHERE domain = :domain AND item_hash = :item_hash
+        """
+        values = {"domain": domain, "item_hash": item_hash}
+        if not_before:
+            query += " AND created_at >= :not_before"
+            values["not_before"] = not_before
+        row = await self.db.fetch_one(query=query, values=values)
+        if row is None:
+            return None
+        return FirstLayerResult(
+            domain=row["domain"],
+            item_hash=row["item_hash"],
+            source_type=row["source_type"],
+            result=row["result"],
+            created_at=row["created_at"],
+        )
+
+    async def save_result(self, result: FirstLayerResult):
+        # Stamped from utcnow(), the clock get_result's not_before is computed with
+        query = """
+            INSERT INTO first_layer_results (domain, item_hash, source_type, result, created_at)
+            VALUES (:domain, :item_hash, :source_type, :result, :now)
+            ON CONFLICT (domain, item_hash) DO UPDATE SET
+                result = EXCLUDED.result,
+                created_at = EXCLUDED.created_at
+        """
+        values = {
+            "domain": result.domain,
+            "item_hash": result.item_hash,
+            "source_type": result.source_type,
+            "result": result.result,
+            "now": datetime.utcnow(),
+        }
+        await self.db.execute(query=query, values=values)
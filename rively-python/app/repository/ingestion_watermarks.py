@@ -0,0 +1,44 @@
+from databases import Database
+from typing import Optional
+from datetime import datetime
+from app.schemas.ingestion_watermarks import IngestionWatermark
+
+class IngestionWatermarkRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get_watermark(self, tracked_company_uid: str, source: str) -> Optional[IngestionWatermark]:
+        query = """
+            SELECT tracked_company_uid, source, last_seen_posted_at, cursor
+            FROM ingestion_watermarks
+            WHERE tracked_company_uid = :tracked_company_uid AND source = :source
+        """
+        values = {"tracked_company_uid": tracked_company_uid, "source": source}
+        row = await self.db.fetch_one(query=query, values=values)
+        if row is None:
+            return None
+        return IngestionWatermark(
+            tracked_company_uid=str(row["tracked_company_uid"]),
+            source=row["source"],
+            last_seen_posted_at=row["last_seen_posted_at"],
+            cursor=row["cursor"],
+        )
+
+    async def save_watermark(self, tracked_company_uid: str, source: str, last_seen_posted_at: datetime, cursor: Optional[str]):
+        """Move the watermark forward; an older posted_at never replaces a newer one."""
+        query = """
+            INSERT INTO ingestion_watermarks (tracked_company_uid, source, last_seen_posted_at, cursor, updated_at)
+            VALUES (:tracked_company_uid, :source, :last_seen_posted_at, :cursor, CURRENT_TIMESTAMP)
+            ON CONFLICT (tracked_company_uid, source) DO UPDATE SET
+                last_seen_posted_at = EXCLUDED.last_seen_posted_at,
+                cursor = EXCLUDED.cursor,
+                updated_at = EXCLUDED.updated_at
+            WHERE ingestion_watermarks.last_seen_posted_at < EXCLUDED.last_seen_posted_at
+        """
+        values = {
+            "tracked_company_uid": tracked_company_uid,
+            "source": source,
+            "last_seen_posted_at": last_seen_posted_at,
+            "cursor": cursor,
+        }
+        await self.db.execute(query=query, values=values)
@@ -0,0 +1,93 @@
+from databases import Database
+from datetime import datetime
+from typing import Optional
+
+# SQLite stand-in for the Postgres table in db/migrations, used when the cache is
+# pointed at a local sqlite database (LLM_CACHE_DATABASE_URL=sqlite:///./llm_cache.db).
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS llm_response_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cache_key TEXT NOT NULL UNIQUE,
+        model TEXT NOT NULL,
+        prompt_hash TEXT NOT NULL,
+        response TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        last_used_at TIMESTAMP NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used_at ON llm_response_cache (last_used_at)",
+    "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires_at ON llm_response_cache (expires_at)",
+]
+
+
+class LLMResponseCacheRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.db.url.dialect == "sqlite"
+
+    async def ensure_schema(self):
+        """Create the cache table on SQLite; the Postgres table comes from db/migrations."""
+        if not self.is_sqlite:
+            return
+        for statement in SQLITE_SCHEMA:
+            await self.db.execute(query=statement)
+
+    async def get_response(self, cache_key: str, now: datetime) -> Optional[str]:
+        """The stored response if it has not expired; a hit also refreshes its LRU position."""
+        row = await self.db.fetch_one(
+            query="SELECT response FROM llm_response_cache WHERE cache_key = :cache_key AND expires_at > :now",
+            values={"cache_key": cache_key, "now": now},
+        )
+        if row is None:
+            return None
+        await self.db.execute(
+            query="UPDATE llm_response_cache SET hits = hits + 1, last_used_at = :now WHERE cache_key = :cache_key",
+            values={"cache_key": cache_key, "now": now},
+        )
+        return row["response"]
+
+    async def save_response(self, cache_key: str, model: str, prompt_hash: str, response: str, now: datetime, expires_at: datetime):
+        query = """
+            INSERT INTO llm_response_cache (cache_key, model, prompt_hash, response, hits, created_at, expires_at, last_used_at)
+            VALUES (:cache_key, :model, :prompt_hash, :response, 0, :now, :expires_at, :now)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                response = EXCLUDED.response,
+                created_at = EXCLUDED.created_at,
+                expires_at = EXCLUDED.expires_at,
+                last_used_at = EXCLUDED.last_used_at
+        """
+        values = {
+            "cache_key": cache_key,
+            "model": model,
+            "prompt_hash": prompt_hash,
+            "response": response,
+            "now": now,
+            "expires_at": expires_at,
+        }
+        await self.db.execute(query=query, values=values)
+
+    async def evict(self, now: datetime, max_entries: int) -> int:
+        """Drop expired entries, then the least recently used ones beyond `max_entries`. Returns how many were removed."""
+        expired = await self.db.fetch_val(
+            query="SELECT COUNT(*) FROM llm_response_cache WHERE expires_at <= :now", values={"now": now}
+        )
+        if expired:
+            await self.db.execute(query="DELETE FROM llm_response_cache WHERE expires_at <= :now", values={"now": now})
+
+        total = await self.db.fetch_val(query="SELECT COUNT(*) FROM llm_response_cache")
+        excess = (total or 0) - max_entries
+        if excess > 0:
+            await self.db.execute(
+                query="""
+                    DELETE FROM llm_response_cache
+                    WHERE id IN (SELECT id FROM llm_response_cache ORDER BY last_used_at ASC LIMIT :excess)
+                """,
+                values={"excess": excess},
+            )
+        return (expired or 0) + max(excess, 0)
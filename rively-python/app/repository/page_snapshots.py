@@ -0,0 +1,52 @@
+from databases import Database
+from typing import Optional
+from app.schemas.page_snapshots import PageSnapshot
+
+class PageSnapshotRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get_snapshot(self, tracked_company_uid: str, url: str) -> Optional[PageSnapshot]:
+        query = """
+            SELECT tracked_company_uid, url, etag, last_modified, content_hash, page_text
+            FROM page_snapshots
+            WHERE tracked_company_uid = :tracked_company_uid AND url = :url
+        """
+        values = {"tracked_company_uid": tracked_company_uid, "url": url}
+        row = await self.db.fetch_one(query=query, values=values)
+        if row is None:
+            return None
+        return PageSnapshot(
+            tracked_company_uid=str(row["tracked_company_uid"]),
+            url=row["url"],
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            content_hash=row["content_hash"],
+            page_text=row["page_text"],
+        )
+
+    async def save_snapshot(self, snapshot: PageSnapshot):
+        """Insert or refresh the snapshot; changed_at only moves when the content hash differs."""
+        query = """
+            INSERT INTO page_snapshots (tracked_company_uid, url, etag, last_modified, content_hash, page_text, fetched_at, changed_at)
+            VALUES (:tracked_company_uid, :url, :etag, :last_modified, :content_hash, :page_text, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ON CONFLICT (tracked_company_uid, url) DO UPDATE SET
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                fetched_at = EXCLUDED.fetched_at,
+                changed_at = CASE
+                    WHEN page_snapshots.content_hash = EXCLUDED.content_hash THEN page_snapshots.changed_at
+                    ELSE EXCLUDED.changed_at
+                END,
+                content_hash = EXCLUDED.content_hash,
+                page_text = COALESCE(EXCLUDED.page_text, page_snapshots.page_text)
+        """
+        values = {
+            "tracked_company_uid": snapshot.tracked_company_uid,
+            "url": snapshot.url,
+            "etag": snapshot.etag,
+            "last_modified": snapshot.last_modified,
+            "content_hash": snapshot.content_hash,
+            "page_text": snapshot.page_text,
+        }
+        await self.db.execute(query=query, values=values)
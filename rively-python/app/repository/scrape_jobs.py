@@ -0,0 +1,299 @@
+from databases import Database
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from app.schemas.scraper import ScrapeJobUnit
+
+# SQLite stand-in for the Postgres tables in db/migrations, used when the scrape
+# queue is pointed at a local sqlite database for testing.
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS scrape_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_uid TEXT NOT NULL UNIQUE,
+        customer_uid TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        companies_total INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scrape_job_units (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_uid TEXT NOT NULL REFERENCES scrape_jobs(job_uid) ON DELETE CASCADE,
+        customer_uid TEXT NOT NULL,
+        tracked_company_uid TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        source TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        updates_stored INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        lease_owner TEXT,
+        lease_expires_at TIMESTAMP,
+        heartbeat_at TIMESTAMP,
+        UNIQUE (job_uid, tracked_company_uid, source)
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_scrape_jobs_active_customer
+    ON scrape_jobs (customer_uid) WHERE status IN ('queued', 'running')
+    """,
+]
+
+
+# Every timestamp is written as naive UTC from datetime.utcnow(), the clock leases are compared
+# against; the database CURRENT_TIMESTAMP follows the session time zone instead.
+class ScrapeJobRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.db.url.dialect == "sqlite"
+
+    async def ensure_schema(self):
+        """Create the queue tables on SQLite; Postgres tables come from db/migrations."""
+        if not self.is_sqlite:
+            return
+        for statement in SQLITE_SCHEMA:
+            await self.db.execute(query=statement)
+
+    async def create_job(self, job_uid: str, customer_uid: str, units: List[Tuple[str, str, str]]) -> bool:
+        """
+        Insert a queued job and one pending unit per (tracked_company_uid, domain, source).
+        Returns False, inserting nothing, when the customer already has a queued or running job.
+        """
+        now = datetime.utcnow()
+        async with self.db.transaction():
+            created = await self.db.fetch_one(
+                query="""
+                    INSERT INTO scrape_jobs (job_uid, customer_uid, status, companies_total, created_at)
+                    VALUES (:job_uid, :customer_uid, 'queued', :companies_total, :now)
+                    ON CONFLICT (customer_uid) WHERE status IN ('queued', 'running') DO NOTHING
+                    RETURNING id
+                """,
+                values={
+                    "job_uid": job_uid,
+                    "customer_uid": customer_uid,
+                    "companies_total": len({tracked_company_uid for tracked_company_uid, _, _ in units}),
+                    "now": now,
+                },
+            )
+            if created is None:
+                return False
+            if units:
+                await self.db.execute_many(
+                    query="""
+                        INSERT INTO scrape_job_units (job_uid, customer_uid, tracked_company_uid, domain, source, updated_at)
+                        VALUES (:job_uid, :customer_uid, :tracked_company_uid, :domain, :source, :now)
+                    """,
+                    values=[
+                        {
+                            "job_uid": job_uid,
+                            "customer_uid": customer_uid,
+                            "tracked_company_uid": tracked_company_uid,
+                            "domain": domain,
+                            "source": source,
+                            "now": now,
+                        }
+                        for tracked_company_uid, domain, source in units
+                    ],
+                )
+        return True
+
+    async def get_job(self, job_uid: str):
+        query = """
+            SELECT job_uid, customer_uid, status, companies_total, error, created_at, started_at, finished_at
+            FROM scrape_jobs WHERE job_uid = :job_uid
+        """
+        return await self.db.fetch_one(query=query, values={"job_uid": job_uid})
+
+    async def find_active_job(self, customer_uid: str) -> Optional[str]:
+        query = """
+            SELECT job_uid FROM scrape_jobs
+            WHERE customer_uid = :customer_uid AND status IN ('queued', 'running')
+            ORDER BY created_at DESC
+            LIMIT 1
+        """
+        result = await self.db.fetch_one(query=query, values={"customer_uid": customer_uid})
+        return str(result["job_uid"]) if result else None
+
+    async def get_units(self, job_uid: str) -> List[ScrapeJobUnit]:
+        query = """
+            SELECT id, job_uid, customer_uid, tracked_company_uid, domain, source, status, updates_stored, attempts, error
+            FROM scrape_job_units WHERE job_uid = :job_uid
+            ORDER BY id
+        """
+        results = await self.db.fetch_all(query=query, values={"job_uid": job_uid})
+        return [
+            ScrapeJobUnit(
+                id=row["id"],
+                job_uid=str(row["job_uid"]),
+                customer_uid=str(row["customer_uid"]),
+                tracked_company_uid=str(row["tracked_company_uid"]),
+                domain=row["domain"],
+                source=row["source"],
+                status=row["status"],
+                updates_stored=row["updates_stored"],
+                attempts=row["attempts"],
+                error=row["error"],
+            )
+            for row in results
+        ]
+
+    async def mark_job_running(self, job_uid: str):
+        query = """
+            UPDATE scrape_jobs
+            SET status = 'running', started_at = COALESCE(started_at, :now)
+            WHERE job_uid = :job_uid
+        """
+        await self.db.execute(query=query, values={"job_uid": job_uid, "now": datetime.utcnow()})
+
+    async def mark_job_finished(self, job_uid: str, status: str, error: Optional[str] = None):
+        query = """
+            UPDATE scrape_jobs
+            SET status = :status, error = :error, finished_at = :now
+            WHERE job_uid = :job_uid
+        """
+        await self.db.execute(query=query, values={"job_uid": job_uid, "status": status, "error": error, "now": datetime.utcnow()})
+
+    async def claim_unit(self, lease_owner: str, lease_seconds: int, max_attempts: int) -> Optional[ScrapeJobUnit]:
+        """
+        Atomically lease the oldest claimable unit to `lease_owner`.
+        A unit is claimable when it is pending, or running under a lease that has expired
+        (its worker died). On Postgres concurrent claimers skip rows locked by each other,
+        so every unit is handed to exactly one worker; SQLite serialises writers instead.
+        """
+        now = datetime.utcnow()
+        lock_clause = "" if self.is_sqlite else "FOR UPDATE SKIP LOCKED"
+        query = f"""
+            UPDATE scrape_job_units
+            SET status = 'running',
+                lease_owner = :lease_owner,
+                lease_expires_at = :lease_expires_at,
+                heartbeat_at = :now,
+                attempts = attempts + 1,
+                updated_at = :now
+            WHERE id = (
+                SELECT id FROM scrape_job_units
+                WHERE (status = 'pending' OR (status = 'running' AND lease_expires_at < :now))
+                AND attempts < :max_attempts
+                ORDER BY id
+                LIMIT 1
+                {lock_clause}
+            )
+            RETURNING id, job_uid, customer_uid, tracked_company_uid, domain, source, status, updates_stored, attempts, error
+        """
+        row = await self.db.fetch_one(
+            query=query,
+            values={
+                "lease_owner": lease_owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "now": now,
+                "max_attempts": max_attempts,
+            },
+        )
+        if row is None:
+            return None
+        return ScrapeJobUnit(
+            id=row["id"],
+            job_uid=str(row["job_uid"]),
+            customer_uid=str(row["customer_uid"]),
+            tracked_company_uid=str(row["tracked_company_uid"]),
+            domain=row["domain"],
+            source=row["source"],
+            status=row["status"],
+            updates_stored=row["updates_stored"],
+            attempts=row["attempts"],
+            error=row["error"],
+        )
+
+    async def heartbeat_unit(self, unit_id: int, lease_owner: str, lease_seconds: int) -> bool:
+        """Extend the lease on a running unit. Returns False when the lease was lost to another worker."""
+        now = datetime.utcnow()
+        query = """
+            UPDATE scrape_job_units
+            SET lease_expires_at = :lease_expires_at, heartbeat_at = :now
+            WHERE id = :id AND lease_owner = :lease_owner AND status = 'running'
+            RETURNING id
+        """
+        row = await self.db.fetch_one(
+            query=query,
+            values={
+                "id": unit_id,
+                "lease_owner": lease_owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "now": now,
+            },
+        )
+        return row is not None
+
+    async def checkpoint_unit(self, unit_id: int, lease_owner: str, status: str, updates_stored: int = 0, error: Optional[str] = None) -> bool:
+        """
+        Record the outcome of a leased unit and release the lease. Finished units are never claimed again.
+        Returns False when the lease had already been lost, in which case nothing is written.
+        """
+        query = """
+            UPDATE scrape_job_units
+            SET status = :status, updates_stored = :updates_stored, error = :error,
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+            WHERE id = :id AND lease_owner = :lease_owner
+            RETURNING id
+        """
+        row = await self.db.fetch_one(
+            query=query,
+            values={
+                "id": unit_id,
+                "lease_owner": lease_owner,
+                "status": status,
+                "updates_stored": updates_stored,
+                "error": error,
+                "now": datetime.utcnow(),
+            },
+        )
+        return row is not None
+
+    async def release_unit(self, unit_id: int, lease_owner: str):
+        """Hand an unfinished unit back to the queue, e.g. when its worker is shutting down."""
+        query = """
+            UPDATE scrape_job_units
+            SET status = 'pending', attempts = attempts - 1, lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+            WHERE id = :id AND lease_owner = :lease_owner AND status = 'running'
+        """
+        await self.db.execute(query=query, values={"id": unit_id, "lease_owner": lease_owner, "now": datetime.utcnow()})
+
+    async def fail_exhausted_units(self, max_attempts: int) -> List[str]:
+        """
+        Fail units whose lease expired after their last allowed attempt, so their jobs can finish.
+        Returns the affected job uids.
+        """
+        query = """
+            UPDATE scrape_job_units
+            SET status = 'failed', error = 'Lease expired after the maximum number of attempts',
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+            WHERE status = 'running' AND lease_expires_at < :now AND attempts >= :max_attempts
+            RETURNING job_uid
+        """
+        results = await self.db.fetch_all(query=query, values={"now": datetime.utcnow(), "max_attempts": max_attempts})
+        return list({str(row["job_uid"]) for row in results})
+
+    async def finish_job_if_done(self, job_uid: str):
+        """Close the job once none of its units are pending or running; a no-op otherwise."""
+        query = """
+            UPDATE scrape_jobs
+            SET status = CASE
+                    WHEN EXISTS (SELECT 1 FROM scrape_job_units WHERE job_uid = :job_uid AND status = 'failed') THEN 'failed'
+                    ELSE 'completed'
+                END,
+                finished_at = :now
+            WHERE job_uid = :job_uid
+            AND status IN ('queued', 'running')
+            AND NOT EXISTS (
+                SELECT 1 FROM scrape_job_units WHERE job_uid = :job_uid AND status IN ('pending', 'running')
+            )
+        """
+        await self.db.execute(query=query, values={"job_uid": job_uid, "now": datetime.utcnow()})
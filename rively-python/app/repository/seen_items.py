@@ -0,0 +1,36 @@
+from databases import Database
+from typing import Iterable, Set
+
+
+class SeenItemRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get_seen_keys(self, tracked_company_uid: str, item_keys: Iterable[str]) -> Set[str]:
+        """Return the subset of item_keys already processed for this tracked company."""
+        item_keys = list(dict.fromkeys(item_keys))
+        if not item_keys:
+            return set()
+
+        placeholders = ",".join([f":key{i+1}" for i in range(len(item_keys))])
+        query = f"""
+            SELECT item_key FROM seen_items
+            WHERE tracked_company_uid = :tracked_company_uid
+            AND item_key IN ({placeholders})
+        """
+        values = {f"key{i+1}": key for i, key in enumerate(item_keys)}
+        values["tracked_company_uid"] = tracked_company_uid
+        rows = await self.db.fetch_all(query=query, values=values)
+        return {row["item_key"] for row in rows}
+
+    async def is_seen(self, tracked_company_uid: str, item_key: str) -> bool:
+        return item_key in await self.get_seen_keys(tracked_company_uid, [item_key])
+
+    async def mark_seen(self, tracked_company_uid: str, source: str, item_key: str):
+        query = """
+            INSERT INTO seen_items (tracked_company_uid, source, item_key)
+            VALUES (:tracked_company_uid, :source, :item_key)
+            ON CONFLICT (tracked_company_uid, item_key) DO NOTHING
+        """
+        values = {"tracked_company_uid": tracked_company_uid, "source": source, "item_key": item_key}
+        await self.db.execute(query=query, values=values)
@@ -1,4 +1,6 @@
 from databases import Database
+from datetime import datetime
+from typing import Optional
 from app.schemas.tracked_companies import TrackedCompany
 from app.schemas.company_updates import TrackedCompanyLinkedInUpdate
 
@@ -24,10 +26,33 @@ class TrackedCompanyRepository:
                 created_at=row["created_at"],
                 name=row["name"],
                 changelogs_url=row["changelogs_url"],
+                changelogs_feed_url=row["changelogs_feed_url"],
+                changelogs_feed_checked_at=row["changelogs_feed_checked_at"],
             )
             for row in result
         ]
     
+    async def get_tracked_company(self, tracked_company_uid: str) -> Optional[TrackedCompany]:
+        query = """
+            SELECT * FROM tracked_companies WHERE tracked_company_uid = :tracked_company_uid AND isactive = true
+        """
+        values = {"tracked_company_uid": tracked_company_uid}
+        row = await self.db.fetch_one(query=query, values=values)
+        if row is None:
+            return None
+        return TrackedCompany(
+            tracked_company_uid=str(row["tracked_company_uid"]),
+            customer_uid=str(row["customer_uid"]),
+            domain=row["domain"],
+            type=row["type"],
+            linkedin_username=row["linkedin_username"],
+            created_at=row["created_at"],
+            name=row["name"],
+            changelogs_url=row["changelogs_url"],
+            changelogs_feed_url=row["changelogs_feed_url"],
+            changelogs_feed_checked_at=row["changelogs_feed_checked_at"],
+        )
+
     async def update_tracked_company_with_linkedin_username(self, tracked_company_uid: str, company_update: TrackedCompanyLinkedInUpdate):
         query = """
             UPDATE tracked_companies
@@ -52,5 +77,19 @@ class TrackedCompanyRepository:
         }
         await self.db.execute(query=query, values=values)
 
-    
-   
\ No newline at end of file
+    async def update_tracked_company_with_changelogs_feed_url(self, tracked_company_uid: str, company_update: TrackedCompanyLinkedInUpdate):
+        """
+        Record the result of feed discovery; a None feed URL means none was found as of now.
+        checked_at is naive UTC, compared against utcnow() when deciding to rediscover.
+        """
+        query = """
+            UPDATE tracked_companies
+            SET changelogs_feed_url = :changelogs_feed_url, changelogs_feed_checked_at = :now
+            WHERE tracked_company_uid = :tracked_company_uid
+        """
+        values = {
+            "changelogs_feed_url": company_update.changelogs_feed_url,
+            "tracked_company_uid": tracked_company_uid,
+            "now": datetime.utcnow()
+        }
+        await self.db.execute(query=query, values=values)
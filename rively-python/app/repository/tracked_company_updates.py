@@ -1,6 +1,6 @@
 from databases import Database
 from app.schemas.company_updates import TrackedCompanyLinkedInUpdate, TrackedCompanyUpdateCreate
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -9,14 +9,16 @@ class TrackedCompanyUpdateRepository:
     def __init__(self, db: Database):
         self.db = db
 
-    async def create_company_update(self, company_update: TrackedCompanyUpdateCreate) -> int:
+    async def create_company_update(self, company_update: TrackedCompanyUpdateCreate) -> Optional[int]:
         """
-        Insert a new idea into the 'ideas' table.
-        Returns the ID of the newly created idea.
+        Insert a new update into the 'company_updates' table.
+        Returns the ID of the newly created update, or None when an update with the
+        same (tracked_company_uid, item_key) already exists.
         """
         query = """
-            INSERT INTO company_updates (title, description, update_category, update_type, source_type, source_url, posted_at, tracked_company_uid, action_point)
-            VALUES (:title, :description, :update_category, :update_type, :source_type, :source_url, :posted_at, :tracked_company_uid, :action_point)
+            INSERT INTO company_updates (title, description, update_category, update_type, source_type, source_url, posted_at, tracked_company_uid, action_point, item_key)
+            VALUES (:title, :description, :update_category, :update_type, :source_type, :source_url, :posted_at, :tracked_company_uid, :action_point, :item_key)
+            ON CONFLICT (tracked_company_uid, item_key) DO NOTHING
             RETURNING id
         """
         values = {
@@ -28,11 +30,12 @@ class TrackedCompanyUpdateRepository:
             "source_url": company_update.source_url,
             "posted_at": company_update.posted_at,
             "tracked_company_uid": company_update.tracked_company_uid,
-            "action_point": company_update.action_point
+            "action_point": company_update.action_point,
+            "item_key": company_update.item_key
         }
 
         result = await self.db.fetch_one(query=query, values=values)
-        return result["id"]
+        return result["id"] if result else None
     
     async def get_updates_for_companies(self, company_uids: List[str], since_date: datetime, limit: int = 5) -> List[TrackedCompanyLinkedInUpdate]:
         """
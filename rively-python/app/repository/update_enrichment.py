@@ -0,0 +1,168 @@
+from databases import Database
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.schemas.update_enrichment import UpdateEnrichmentJob
+
+
+class UpdateEnrichmentRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.db.url.dialect == "sqlite"
+
+    async def enqueue(self, job: UpdateEnrichmentJob) -> bool:
+        """
+        Queue a stored update for enrichment and mark it pending, in one transaction. Returns
+        False when the update was already queued, which is then left as it is.
+        """
+        query = """
+            INSERT INTO update_enrichment_jobs (company_update_id, customer_uid, tracked_company_uid, company, company_type, source_type, item_text, first_layer)
+            VALUES (:company_update_id, :customer_uid, :tracked_company_uid, :company, :company_type, :source_type, :item_text, :first_layer)
+            ON CONFLICT (company_update_id) DO NOTHING
+            RETURNING id
+        """
+        values = {
+            "company_update_id": job.company_update_id,
+            "customer_uid": job.customer_uid,
+            "tracked_company_uid": job.tracked_company_uid,
+            "company": job.company,
+            "company_type": job.company_type,
+            "source_type": job.source_type,
+            "item_text": job.item_text,
+            "first_layer": job.first_layer,
+        }
+        async with self.db.transaction():
+            row = await self.db.fetch_one(query=query, values=values)
+            if row is None:
+                return False
+            await self.db.execute(
+                query="UPDATE company_updates SET enrichment_status = 'pending' WHERE id = :id",
+                values={"id": job.company_update_id},
+            )
+        return True
+
+    async def claim_job(self, lease_owner: str, lease_seconds: int, max_attempts: int) -> Optional[UpdateEnrichmentJob]:
+        """
+        Atomically lease the oldest claimable job: pending and past its retry back-off, or running
+        under an expired lease. Concurrent claimers on Postgres skip each other's locked rows.
+        """
+        now = datetime.utcnow()
+        lock_clause = "" if self.is_sqlite else "FOR UPDATE SKIP LOCKED"
+        query = f"""
+            UPDATE update_enrichment_jobs
+            SET status = 'running',
+                lease_owner = :lease_owner,
+                lease_expires_at = :lease_expires_at,
+                attempts = attempts + 1,
+                updated_at = :now
+            WHERE id = (
+                SELECT id FROM update_enrichment_jobs
+                WHERE (
+                    (status = 'pending' AND (available_at IS NULL OR available_at <= :now))
+                    OR (status = 'running' AND lease_expires_at < :now)
+                )
+                AND attempts < :max_attempts
+                ORDER BY id
+                LIMIT 1
+                {lock_clause}
+            )
+            RETURNING id, company_update_id, customer_uid, tracked_company_uid, company, company_type, source_type, item_text, first_layer, status, attempts, error
+        """
+        row = await self.db.fetch_one(
+            query=query,
+            values={
+                "lease_owner": lease_owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "now": now,
+                "max_attempts": max_attempts,
+            },
+        )
+        if row is None:
+            return None
+        return UpdateEnrichmentJob(
+            id=row["id"],
+            company_update_id=row["company_update_id"],
+            customer_uid=str(row["customer_uid"]),
+            tracked_company_uid=str(row["tracked_company_uid"]),
+            company=row["company"],
+            company_type=row["company_type"],
+            source_type=row["source_type"],
+            item_text=row["item_text"],
+            first_layer=row["first_layer"],
+            status=row["status"],
+            attempts=row["attempts"],
+            error=row["error"],
+        )
+
+    async def complete_job(self, job_id: int, lease_owner: str, status: str, enrichment_status: str, action_point: Optional[str] = None, error: Optional[str] = None, retry_in_seconds: Optional[float] = None) -> bool:
+        """
+        Record the outcome and write it to the update in one transaction. A job put back to pending
+        with `retry_in_seconds` is not claimed again before then. Returns False when the lease was
+        lost (another worker owns the job now), in which case nothing is written.
+        """
+        now = datetime.utcnow()
+        async with self.db.transaction():
+            row = await self.db.fetch_one(
+                query="""
+                    UPDATE update_enrichment_jobs
+                    SET status = :status, error = :error, lease_owner = NULL, lease_expires_at = NULL,
+                        available_at = :available_at, updated_at = :now
+                    WHERE id = :id AND lease_owner = :lease_owner
+                    RETURNING company_update_id
+                """,
+                values={
+                    "id": job_id,
+                    "lease_owner": lease_owner,
+                    "status": status,
+                    "error": error,
+                    "available_at": now + timedelta(seconds=retry_in_seconds) if retry_in_seconds else None,
+                    "now": now,
+                },
+            )
+            if row is None:
+                return False
+            await self.db.execute(
+                query="""
+                    UPDATE company_updates
+                    SET action_point = COALESCE(:action_point, action_point), enrichment_status = :enrichment_status
+                    WHERE id = :company_update_id
+                """,
+                values={"action_point": action_point, "enrichment_status": enrichment_status, "company_update_id": row["company_update_id"]},
+            )
+        return True
+
+    async def release_job(self, job_id: int, lease_owner: str):
+        """Hand an unfinished job back to the queue, e.g. when its worker is shutting down."""
+        query = """
+            UPDATE update_enrichment_jobs
+            SET status = 'pending', attempts = attempts - 1, lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+            WHERE id = :id AND lease_owner = :lease_owner AND status = 'running'
+        """
+        await self.db.execute(query=query, values={"id": job_id, "lease_owner": lease_owner, "now": datetime.utcnow()})
+
+    async def fail_exhausted_jobs(self, max_attempts: int) -> int:
+        """Fail jobs whose lease expired after their last allowed attempt, and mark their updates failed."""
+        now = datetime.utcnow()
+        async with self.db.transaction():
+            rows = await self.db.fetch_all(
+                query="""
+                    UPDATE update_enrichment_jobs
+                    SET status = 'failed', error = 'Lease expired after the maximum number of attempts',
+                        lease_owner = NULL, lease_expires_at = NULL, updated_at = :now
+                    WHERE status = 'running' AND lease_expires_at < :now AND attempts >= :max_attempts
+                    RETURNING company_update_id
+                """,
+                values={"now": now, "max_attempts": max_attempts},
+            )
+            for row in rows:
+                await self.db.execute(
+                    query="UPDATE company_updates SET enrichment_status = 'failed' WHERE id = :id",
+                    values={"id": row["company_update_id"]},
+                )
+        return len(rows)
+
+    async def count_by_status(self) -> Dict[str, int]:
+        rows = await self.db.fetch_all(query="SELECT status, COUNT(*) AS jobs FROM update_enrichment_jobs GROUP BY status")
+        return {row["status"]: row["jobs"] for row in rows}
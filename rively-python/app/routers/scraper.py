@@ -1,25 +1,61 @@
 # app/routers/scraper.py
-from fastapi import APIRouter, Depends
-from app.schemas.scraper import ScraperInput, ScraperResponse
-from app.services.scraper import ScraperService
-from app.dependency import get_scraper_service
+from fastapi import APIRouter, Depends, HTTPException
+from app.schemas.scraper import ScraperInput, ScrapeJobStatus
+from app.services.scrape_jobs import ScrapeJobManager
+from app.services.update_enrichment import UpdateEnrichmentManager
+from app.dependency import get_scrape_job_manager, get_update_enrichment_manager
+from app.utils.llm_cache import get_llm_cache_stats
+from app.utils.model_routing import get_routing_stats
+from app.utils.token_budget import get_token_budget_stats
 
 router = APIRouter()
 
-@router.post("/scraper/", response_model=ScraperResponse)
+@router.post("/scraper/", response_model=ScrapeJobStatus, status_code=202)
 async def scrape_tracked_companies(
     scraper: ScraperInput,
-    scraper_service: ScraperService = Depends(get_scraper_service), 
+    job_manager: ScrapeJobManager = Depends(get_scrape_job_manager),
 ):
     # Print the input data for debugging
     print(f"Received request with customer_uid: {scraper.customer_uid}")
 
-    # Call the scraper service
-    print("Calling scraper_service.scrape_data...")
-    success = await scraper_service.scrape_data(scraper.customer_uid)
+    # Queue the scrape and return straight away; progress is polled via GET /scraper/jobs/{job_id}
+    try:
+        job_uid = await job_manager.submit(scraper.customer_uid)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    # Print the result for debugging
-    print(f"Scraping result: {success}")
+    job_status = await job_manager.get_status(job_uid)
+    print(f"Scrape job: {job_status.job_id} ({job_status.status})")
+    return job_status
 
-    # Return the result
-    return success
\ No newline at end of file
+@router.get("/scraper/jobs/{job_id}", response_model=ScrapeJobStatus)
+async def get_scrape_job(
+    job_id: str,
+    job_manager: ScrapeJobManager = Depends(get_scrape_job_manager),
+):
+    job_status = await job_manager.get_status(job_id)
+    if job_status is None:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job_status
+
+@router.get("/scraper/llm-cache/stats")
+async def get_llm_cache_statistics():
+    # Hit/miss counters of this worker's LLM response cache since startup
+    return get_llm_cache_stats()
+
+@router.get("/scraper/token-budget/stats")
+async def get_token_budget_statistics():
+    # Per-prompt input sizes and what the token budgets trimmed in this worker since startup
+    return get_token_budget_stats()
+
+@router.get("/scraper/model-routing/stats")
+async def get_model_routing_statistics():
+    # Tier per LLM step and per-tier call counts and latencies in this worker since startup
+    return get_routing_stats().snapshot()
+
+@router.get("/scraper/enrichment/stats")
+async def get_enrichment_statistics(
+    enrichment_manager: UpdateEnrichmentManager = Depends(get_update_enrichment_manager),
+):
+    # Agent enrichment jobs per status (pending, running, done, failed) across all workers
+    return await enrichment_manager.get_stats()
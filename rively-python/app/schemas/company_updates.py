@@ -12,10 +12,12 @@ class TrackedCompanyUpdateCreate(BaseModel):
     posted_at: datetime
     tracked_company_uid: str
     action_point: Optional[str] = None  
+    item_key: Optional[str] = None
 
 class TrackedCompanyLinkedInUpdate(BaseModel):
     linkedin_username: Optional[str] = None
     changelogs_url: Optional[str] = None
+    changelogs_feed_url: Optional[str] = None
 
 class LLMTrackedCompanyUpdate(BaseModel):
     title: str
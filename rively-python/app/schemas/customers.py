@@ -1,6 +1,6 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class CustomerContextUpdate(BaseModel):
     customer_context: str
-
-
+    customer_context_summary: Optional[str] = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class DiscoveryCacheEntry(BaseModel):
+    domain: str
+    kind: str
+    value: Optional[str] = None
+    failures: int = 0
+    expires_at: Optional[datetime] = None
+    retry_after: Optional[datetime] = None
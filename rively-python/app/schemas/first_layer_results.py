@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class FirstLayerResult(BaseModel):
+    domain: str
+    item_hash: str
+    source_type: Optional[str] = None
+    result: str
+    created_at: Optional[datetime] = None
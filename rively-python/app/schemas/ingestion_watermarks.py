@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class IngestionWatermark(BaseModel):
+    tracked_company_uid: str
+    source: str
+    last_seen_posted_at: datetime
+    cursor: Optional[str] = None
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PageSnapshot(BaseModel):
+    tracked_company_uid: str
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: str
+    # Extracted text fragments, newline separated; diffed against on the next fetch
+    page_text: Optional[str] = None
@@ -1,8 +1,48 @@
 # app/schemas/recommendations.py
 from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
 
 class ScraperInput(BaseModel):
     customer_uid: str
 
+class CompanyScrapeResult(BaseModel):
+    tracked_company_uid: str
+    domain: str
+    success: bool
+    updates_stored: int = 0
+    error: Optional[str] = None
+
+class SourceScrapeResult(BaseModel):
+    source: str
+    success: bool
+    companies: List[CompanyScrapeResult] = []
+
 class ScraperResponse(BaseModel):
     success: bool
+    sources: List[SourceScrapeResult] = []
+
+class ScrapeJobStatus(BaseModel):
+    job_id: str
+    customer_uid: str
+    status: str
+    companies_total: int = 0
+    companies_done: int = 0
+    updates_stored: int = 0
+    errors: List[str] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[ScraperResponse] = None
+
+class ScrapeJobUnit(BaseModel):
+    id: int
+    job_uid: str
+    customer_uid: str
+    tracked_company_uid: str
+    domain: str
+    source: str
+    status: str
+    updates_stored: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
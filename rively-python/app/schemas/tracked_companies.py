@@ -11,5 +11,7 @@ class TrackedCompany(BaseModel):
     tracked_company_uid: str
     customer_uid: str
     changelogs_url: Optional[str] = None
+    changelogs_feed_url: Optional[str] = None
+    changelogs_feed_checked_at: Optional[datetime] = None
     
  
\ No newline at end of file
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class UpdateEnrichmentJob(BaseModel):
+    company_update_id: int
+    customer_uid: str
+    tracked_company_uid: str
+    company: str
+    company_type: Optional[str] = None
+    source_type: str
+    item_text: str
+    # First-layer output (LLMTrackedCompanyUpdate) as JSON
+    first_layer: str
+    id: Optional[int] = None
+    status: str = "pending"
+    attempts: int = 0
+    error: Optional[str] = None
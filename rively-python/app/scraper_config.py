@@ -0,0 +1,192 @@
+# app/scraper_config.py
+from typing import Any, Dict, List, Optional
+from pydantic_settings import BaseSettings
+
+
+class ScraperSettings(BaseSettings):
+    # Upper bound on scrape tasks (one per tracked company and source) in flight at once
+    SCRAPER_MAX_CONCURRENCY: int = 8
+    # Per-source bounds, applied on top of the global one
+    SCRAPER_LINKEDIN_CONCURRENCY: int = 4
+    SCRAPER_CHANGELOG_CONCURRENCY: int = 4
+    SCRAPER_NEWS_CONCURRENCY: int = 2
+
+    # Background scrape job pool: claim loops per process, each working one leased unit at a time
+    SCRAPE_JOB_WORKERS: int = 8
+    SCRAPE_JOB_SHUTDOWN_TIMEOUT_SECONDS: float = 60.0
+    # A unit (tracked company, source) whose worker died is reclaimed until it has been started this many times
+    SCRAPE_JOB_MAX_ATTEMPTS: int = 3
+    # Lease held on a claimed unit; extended by heartbeats while the unit runs
+    SCRAPE_UNIT_LEASE_SECONDS: int = 300
+    SCRAPE_UNIT_HEARTBEAT_SECONDS: int = 60
+    # How often idle workers look for units queued by other instances
+    SCRAPE_QUEUE_POLL_SECONDS: float = 2.0
+    # Where the scrape job queue lives; defaults to DATABASE_URL. Point it at e.g.
+    # sqlite:///./scrape_queue.db to run the queue locally without Postgres.
+    SCRAPE_QUEUE_DATABASE_URL: Optional[str] = None
+
+    # Agent selection, agent call and action point for updates over the usefulness threshold:
+    # "deferred" stores the first-layer update and leaves them to the enrichment workers,
+    # "inline" runs them inside the scrape before the update is stored
+    AGENT_ENRICHMENT_MODE: str = "deferred"
+    # Enrichment claim loops per process, i.e. concurrent enrichments; separate from the scrape limits
+    ENRICHMENT_WORKERS: int = 2
+    ENRICHMENT_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+    # A failed or abandoned enrichment is retried until it has been started this many times
+    ENRICHMENT_MAX_ATTEMPTS: int = 3
+    # A failed attempt is retried after ENRICHMENT_RETRY_BASE_SECONDS, doubling per attempt up to the max
+    ENRICHMENT_RETRY_BASE_SECONDS: float = 60.0
+    ENRICHMENT_RETRY_MAX_SECONDS: float = 3600.0
+    # Lease on a claimed job; an enrichment still running after ENRICHMENT_TIMEOUT_SECONDS is
+    # abandoned, so the lease must be longer than that
+    ENRICHMENT_LEASE_SECONDS: int = 300
+    ENRICHMENT_TIMEOUT_SECONDS: float = 240.0
+    # How often idle enrichment workers look for jobs queued by other instances
+    ENRICHMENT_POLL_SECONDS: float = 5.0
+
+    # SERP + LLM discovery of LinkedIn / changelog URLs, cached per competitor domain across customers
+    DISCOVERY_CACHE_TTL_DAYS: int = 30
+    # Failed lookups are retried after DISCOVERY_RETRY_HOURS, doubling per consecutive failure
+    DISCOVERY_RETRY_HOURS: float = 24.0
+    DISCOVERY_MAX_RETRY_DAYS: int = 30
+
+    # News source is off by default; it crawls every article with a headless browser
+    SCRAPER_NEWS_ENABLED: bool = False
+
+    # Headless browsers shared by article crawls (news). Each is started on first use
+    # and relaunched after CRAWLER_PAGES_PER_BROWSER crawls to bound memory growth.
+    CRAWLER_POOL_SIZE: int = 3
+    CRAWLER_PAGES_PER_BROWSER: int = 50
+    # crawl4ai cache mode: enabled, disabled, read_only, write_only or bypass
+    CRAWLER_CACHE_MODE: str = "enabled"
+
+    # HTML-to-text engine for changelog pages: "lxml" (single pass) or "bs4" (the original walk)
+    TEXT_EXTRACTION_ENGINE: str = "lxml"
+    # Pages at least this large are parsed in a process pool so they do not block the event loop; 0 processes disables the pool
+    TEXT_EXTRACTION_PROCESSES: int = 2
+    TEXT_EXTRACTION_PROCESS_MIN_BYTES: int = 200_000
+
+    # Per-call timeouts for LLM chains (awaited with ainvoke) and for the Lyzr agent API
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    AGENT_TIMEOUT_SECONDS: float = 30.0
+
+    # Model tiers: "portkey" calls go through the Portkey gateway (an empty model lets the Portkey
+    # config choose; "portkey_config" selects a saved config), "groq" calls Groq directly.
+    # "portkey" and "groq" are the models every step used before routing; "small" and "large"
+    # pin explicit models. Override with JSON, e.g.
+    # LLM_MODEL_TIERS='{"small": {"provider": "groq", "model": "llama-3.1-8b-instant", "temperature": 0}}'
+    LLM_MODEL_TIERS: Dict[str, Dict[str, Any]] = {
+        "portkey": {"provider": "portkey", "model": "", "temperature": 0.7},
+        "groq": {"provider": "groq", "model": "llama3-70b-8192", "temperature": 0.7},
+        "small": {"provider": "portkey", "model": "llama-3.1-8b-instant", "temperature": 0.0},
+        "large": {"provider": "portkey", "model": "llama-3.3-70b-versatile", "temperature": 0.7},
+    }
+    # Tier per LLM step; unlisted steps use LLM_DEFAULT_TIER. Routing is opt-in: the defaults keep
+    # each step on the model it used before routing, so no step changes model until this is set.
+    # The candidates for "small" are the steps that see every item (first_layer, url_discovery,
+    # changelog_extraction), e.g.
+    # LLM_LAYER_TIERS='{"first_layer": "small", "url_discovery": "small", "changelog_extraction": "small"}'
+    # Switch a step only after comparing its output on the small tier with the current model, and
+    # watch errors and latency per step in GET /scraper/model-routing/stats afterwards.
+    LLM_LAYER_TIERS: Dict[str, str] = {
+        "first_layer": "portkey",
+        "url_discovery": "groq",
+        "changelog_extraction": "groq",
+        "second_layer": "portkey",
+        "final_layer": "portkey",
+    }
+    LLM_DEFAULT_TIER: str = "portkey"
+    # Latency samples kept per step and tier for GET /scraper/model-routing/stats
+    LLM_ROUTING_LATENCY_SAMPLES: int = 500
+
+    # First-layer classification sends up to this many items (and tokens) per LLM request
+    FIRST_LAYER_BATCH_SIZE: int = 8
+    FIRST_LAYER_BATCH_MAX_TOKENS: int = 6000
+
+    # Persistent cache of parsed LLM chain outputs, keyed by model, prompt template and inputs.
+    # Defaults to DATABASE_URL; e.g. sqlite:///./llm_cache.db keeps it on local disk.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DATABASE_URL: Optional[str] = None
+    LLM_CACHE_TTL_HOURS: float = 24.0 * 7
+    LLM_CACHE_MAX_ENTRIES: int = 50_000
+    LLM_CACHE_EVICT_EVERY_WRITES: int = 200
+    # Skip cache reads (responses are still written), e.g. after a model change
+    LLM_CACHE_BYPASS: bool = False
+
+    # Local CPU-only pre-filter in front of the first layer: "off", "shadow" (score and log
+    # disagreements with the LLM to app/logs/prefilter_shadow.jsonl) or "enforce" (skip the LLM
+    # for items scored low value with at least PREFILTER_REJECT_THRESHOLD probability)
+    PREFILTER_MODE: str = "shadow"
+    PREFILTER_REJECT_THRESHOLD: float = 0.9
+    PREFILTER_SOURCE_TYPES: List[str] = ["Company's LinkedIn Page"]
+    # Written by train_prefilter.py; without it only the keyword rules score
+    PREFILTER_MODEL_PATH: str = "app/services/prefilter_model.json"
+    # A first-layer result counts as low value when titled "Not useful" or not actionable and scored at most this
+    PREFILTER_LOW_VALUE_MAX_SCORE: int = 30
+    # The shadow log rotates at this size, keeping this many older files (prefilter_shadow.jsonl.1, ...)
+    PREFILTER_SHADOW_LOG_MAX_BYTES: int = 20_000_000
+    PREFILTER_SHADOW_LOG_BACKUPS: int = 5
+
+    # Customers tracking the same competitor share source fetches made within this window (0 disables)
+    SHARED_FETCH_TTL_SECONDS: int = 900
+    # Stored first-layer analyses older than this are recomputed
+    FIRST_LAYER_RESULT_TTL_DAYS: int = 30
+    # A customer's parsed context is reused for this long within the process; writes invalidate it (0 disables)
+    CUSTOMER_CONTEXT_CACHE_TTL_SECONDS: int = 1800
+    # Token budget of customers.customer_context_summary, the context the second and final layers see
+    CUSTOMER_CONTEXT_SUMMARY_MAX_TOKENS: int = 300
+
+    # Token budgets per prompt input; text over budget is trimmed on section, line or sentence
+    # boundaries and the dropped tokens are counted (GET /scraper/token-budget/stats)
+    TOKEN_BUDGET_MODEL: str = "llama-3.3-70b-versatile"
+    # Count with tiktoken (cl100k_base for non-OpenAI models); False estimates 4 characters per token
+    TOKEN_BUDGET_USE_TIKTOKEN: bool = True
+    LINKEDIN_POST_MAX_TOKENS: int = 1500
+    NEWS_ARTICLE_MAX_TOKENS: int = 1250
+    # Any single item reaching the first layer, whatever its source
+    FIRST_LAYER_ITEM_MAX_TOKENS: int = 3000
+    # Item text re-sent to the second layer and to the agent with its input
+    SECOND_LAYER_TEXT_MAX_TOKENS: int = 1000
+    AGENT_INPUT_MAX_TOKENS: int = 1500
+    FINAL_LAYER_AGENT_OUTPUT_MAX_TOKENS: int = 1500
+
+    # Shared async HTTP client used by every scraper source
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 40
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    # Token buckets per upstream host: refill `rate` tokens/second up to `burst`.
+    # Override with a JSON object in the environment, e.g. UPSTREAM_RATE_LIMITS='{"api.portkey.ai": {"rate": 2, "burst": 4}}'
+    UPSTREAM_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "real-time-web-search.p.rapidapi.com": {"rate": 1.0, "burst": 5},
+        "linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com": {"rate": 1.0, "burst": 5},
+        "google-news13.p.rapidapi.com": {"rate": 1.0, "burst": 5},
+        "api.portkey.ai": {"rate": 5.0, "burst": 10},
+        "api.groq.com": {"rate": 0.5, "burst": 5},
+    }
+    # "memory" keeps buckets per process; "database" shares them between workers via rate_limit_buckets (Postgres)
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_MAX_RETRIES: int = 3
+    # Back-off used for a 429 without a usable Retry-After header
+    RATE_LIMIT_DEFAULT_BACKOFF_SECONDS: float = 5.0
+
+    # Cap on changelog text sent to the first LLM layer; applies to the first fetch of a page
+    # (no snapshot to diff against yet), to unusually large diffs and to single entries
+    CHANGELOG_MAX_PROMPT_TOKENS: int = 3000
+    # Cap on a changelog detail page sent to the second changelog prompt
+    CHANGELOG_DETAIL_MAX_TOKENS: int = 3000
+    # Changelog entries older than this are not sent anywhere
+    CHANGELOG_WINDOW_DAYS: int = 7
+    # How long "no RSS/Atom feed or sitemap" is trusted before discovery runs again
+    CHANGELOG_FEED_REDISCOVERY_DAYS: int = 7
+    # Unchanged fragments kept before each added run so new entries keep their heading/date
+    CHANGELOG_DIFF_CONTEXT_FRAGMENTS: int = 3
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"
+
+
+scraper_settings = ScraperSettings()
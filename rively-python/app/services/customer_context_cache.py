@@ -0,0 +1,149 @@
+# app/services/customer_context_cache.py
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+from app.repository.customers import CustomerRepository
+from app.schemas.customers import CustomerContextUpdate
+from app.services.customer_context import CompanyContextExtractor
+from app.services.customer_context_summary import summarise_customer_context
+from app.utils.shared_fetch import SharedFetchCache
+from app.scraper_config import scraper_settings
+
+LOGS_DIR = "app/logs"
+
+
+class CustomerContext(BaseModel):
+    customer_uid: str
+    domain: Optional[str] = None
+    # Parsed customers.customer_context; None when there is none and extraction failed
+    context: Optional[Any] = None
+    # customers.customer_context_summary, which is what the second and final layer prompts get
+    summary: Optional[str] = None
+    # The context as it goes into those prompts: the summary, else the full formatted context
+    prompt_text: str
+
+
+def format_customer_context_for_prompt(customer_context) -> str:
+    """Format customer context for use in prompts."""
+    if customer_context is None:
+        return "No context available"
+
+    if isinstance(customer_context, dict):
+        # Format dictionary as readable text
+        formatted_lines = []
+        for key, value in customer_context.items():
+            # Convert snake_case to readable format
+            readable_key = key.replace('_', ' ').title()
+            formatted_lines.append(f"{readable_key}: {value}")
+        return "\n".join(formatted_lines)
+
+    return str(customer_context)
+
+
+def save_company_context_log(customer_uid: str, company_domain: str, context_data: dict):
+    """Save company context to a dedicated log file for each customer."""
+    try:
+        os.makedirs(LOGS_DIR, exist_ok=True)
+        log_file = os.path.join(LOGS_DIR, f"customer_context_{customer_uid}.txt")
+        timestamp = datetime.now().isoformat()
+
+        log_entry = f"""
+========================================
+Timestamp: {timestamp}
+Customer UID: {customer_uid}
+Company Domain: {company_domain}
+Context Data:
+{json.dumps(context_data, indent=2)}
+========================================
+
+"""
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(log_entry)
+
+        logging.info(f"Company context saved to {log_file}")
+
+    except Exception as e:
+        logging.error(f"Failed to save company context log: {e}")
+
+
+_cache: Optional[SharedFetchCache] = None
+
+
+def get_customer_context_cache() -> SharedFetchCache:
+    """
+    Customer contexts keyed by customer_uid. Every item analysed for a customer in a scrape
+    round reads the same entry; concurrent misses wait on one load (and one Lyzr extraction).
+    """
+    global _cache
+    if _cache is None:
+        _cache = SharedFetchCache(scraper_settings.CUSTOMER_CONTEXT_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def invalidate_customer_context(customer_uid: str) -> None:
+    get_customer_context_cache().invalidate(customer_uid)
+
+
+async def save_customer_context(customer_uid: str, customer_repo: CustomerRepository, context: Any) -> None:
+    """
+    Write customers.customer_context with its compact summary and drop the cached copy; every
+    context update goes through here so the summary is built once per write, not per prompt.
+    """
+    await customer_repo.update_customer_with_customer_context(
+        customer_uid, CustomerContextUpdate(
+            customer_context=json.dumps(context),
+            customer_context_summary=summarise_customer_context(context),
+        )
+    )
+    invalidate_customer_context(customer_uid)
+
+
+async def get_customer_context(customer_uid: str, customer_repo: CustomerRepository) -> CustomerContext:
+    return await get_customer_context_cache().get_or_fetch(
+        customer_uid, lambda: _load_customer_context(customer_uid, customer_repo)
+    )
+
+
+async def _load_customer_context(customer_uid: str, customer_repo: CustomerRepository) -> CustomerContext:
+    customer_domain = await customer_repo.get_customer_company_domain(customer_uid)
+    customer_context_str = await customer_repo.get_customer_context(customer_uid)
+    summary = await customer_repo.get_customer_context_summary(customer_uid)
+
+    if customer_context_str is None:
+        try:
+            context_json = await CompanyContextExtractor().extract_customer_context(customer_domain)
+        except Exception as extraction_error:
+            logging.error(f"Failed to extract customer context: {extraction_error}")
+            context_json = None
+        if context_json is None:
+            # Not persisted, so the next scrape round tries again; until then this round stops asking
+            customer_context = {"error": "Context extraction failed", "domain": customer_domain}
+        else:
+            await save_customer_context(customer_uid, customer_repo, context_json)
+            customer_context = context_json
+            summary = summarise_customer_context(customer_context)
+    else:
+        try:
+            customer_context = json.loads(customer_context_str)
+        except json.JSONDecodeError:
+            # If parsing fails, treat as plain string
+            customer_context = {"raw_context": customer_context_str}
+        if summary is None:
+            # Stored before summaries existed: build it once and keep it
+            summary = summarise_customer_context(customer_context)
+            if summary:
+                await customer_repo.update_customer_context_summary(customer_uid, summary)
+
+    # Logged once per load rather than once per analysed item
+    save_company_context_log(customer_uid, customer_domain or "unknown", customer_context)
+    return CustomerContext(
+        customer_uid=customer_uid,
+        domain=customer_domain,
+        context=customer_context,
+        summary=summary,
+        prompt_text=summary or format_customer_context_for_prompt(customer_context),
+    )
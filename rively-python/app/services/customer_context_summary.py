@@ -0,0 +1,114 @@
+# app/services/customer_context_summary.py
+import json
+import re
+from typing import Any, Dict, List, Optional
+from app.scraper_config import scraper_settings
+from app.utils.token_budget import CHARS_PER_TOKEN, estimate_tokens
+
+# Lyzr context fields in the order they matter for judging a competitor update; anything not
+# listed comes after these, and SKIPPED_FIELDS never reach the prompt
+FIELD_PRIORITY = [
+    "company_name",
+    "core_products_services",
+    "customer_value_proposition",
+    "target_customers",
+    "primary_markets",
+    "key_features_usps",
+    "competitive_moat",
+    "strategic_objectives",
+    "business_model",
+    "opportunity_triggers",
+    "risk_sensitivities",
+    "go_to_market_strategy",
+    "partnerships_alliances",
+    "current_growth_stage",
+    "pricing_strategy",
+    "tech_stack",
+    "recent_strategic_moves",
+]
+SKIPPED_FIELDS = {
+    "domain", "founded_year", "headquarters_operations", "vision_statement", "mission_statement",
+    "recent_press", "funding_status", "supply_chain_dependencies", "error",
+}
+EMPTY_VALUES = {"", "n/a", "na", "none", "null", "unknown", "not available"}
+
+# List values keep this many items; the rest are rarely what decides relevance
+MAX_LIST_ITEMS = 5
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+def _unwrap(customer_context: Any) -> Any:
+    """Lyzr sometimes answers with fenced JSON that the extractor stores as {"raw_content": "```json {...}```"}."""
+    if isinstance(customer_context, dict) and isinstance(customer_context.get("raw_content"), str):
+        raw = customer_context["raw_content"]
+        match = _FENCE.search(raw)
+        try:
+            parsed = json.loads(match.group(1) if match else raw)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    return customer_context
+
+
+def _value_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        items = [_value_text(item) for item in value]
+        items = [item for item in items if item]
+        return "; ".join(items[:MAX_LIST_ITEMS])
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_value_text(item)}" for key, item in value.items() if _value_text(item))
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return "" if text.lower() in EMPTY_VALUES else text
+
+
+def _truncate_words(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,;:")
+    return f"{cut}..."
+
+
+def summarise_customer_context(customer_context: Any, max_tokens: Optional[int] = None) -> Optional[str]:
+    """
+    Compact, ranked "Key: value" lines of the context under `max_tokens` (default
+    CUSTOMER_CONTEXT_SUMMARY_MAX_TOKENS). Fields are added by FIELD_PRIORITY until the budget
+    runs out; the first field that does not fit is cut on a word boundary. None when there is
+    nothing worth summarising.
+    """
+    max_tokens = max_tokens or scraper_settings.CUSTOMER_CONTEXT_SUMMARY_MAX_TOKENS
+    customer_context = _unwrap(customer_context)
+    if customer_context is None:
+        return None
+    if not isinstance(customer_context, dict):
+        text = _value_text(customer_context)
+        return _truncate_words(text, max_tokens) if text else None
+
+    rank = {key: index for index, key in enumerate(FIELD_PRIORITY)}
+    fields: Dict[str, str] = {}
+    for key, value in customer_context.items():
+        if key in SKIPPED_FIELDS:
+            continue
+        text = _value_text(value)
+        if text:
+            fields[key] = text
+    ordered = sorted(fields, key=lambda key: rank.get(key, len(FIELD_PRIORITY)))
+
+    lines: List[str] = []
+    used = 0
+    for key in ordered:
+        line = f"{key.replace('_', ' ').title()}: {fields[key]}"
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            remaining = max_tokens - used - 1
+            if remaining >= 16:
+                lines.append(_truncate_words(line, remaining))
+            dropped = ordered[len(lines):]
+            if dropped:
+                print(f"Customer context summary over {max_tokens} tokens; dropped {dropped}")
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines) or None
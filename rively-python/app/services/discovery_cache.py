@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from app.repository.discovery_cache import DiscoveryCacheRepository
+from app.schemas.discovery_cache import DiscoveryCacheEntry
+from app.scraper_config import scraper_settings
+
+# Lookups running in this process, so concurrent companies on the same domain share one SERP + LLM call
+_in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+
+def _found(value: Optional[str]) -> Optional[str]:
+    # The URL retriever prompts answer "false" when they find nothing
+    return value if value and value != "false" else None
+
+
+def normalise_domain(domain: str) -> str:
+    """'https://www.Example.com/' -> 'example.com'"""
+    domain = domain.strip().lower()
+    if "//" in domain:
+        domain = urlsplit(domain).netloc or domain
+    domain = domain.split("/", 1)[0]
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class DiscoveryCache:
+    """
+    Domain-keyed cache in front of the SERP + LLM URL discovery (LinkedIn page, changelog page).
+    Found URLs are kept for DISCOVERY_CACHE_TTL_DAYS and then revalidated; a failed lookup is
+    stored as a negative entry retried after an exponential back-off instead of never again.
+    """
+
+    def __init__(self, repo: Optional[DiscoveryCacheRepository] = None):
+        self.repo = repo
+
+    def _retry_delay(self, failures: int) -> timedelta:
+        hours = scraper_settings.DISCOVERY_RETRY_HOURS * (2 ** max(failures - 1, 0))
+        return timedelta(hours=min(hours, scraper_settings.DISCOVERY_MAX_RETRY_DAYS * 24))
+
+    async def resolve(self, domain: str, kind: str, discover: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Cached URL for `kind` of `domain`, running `discover` when there is none or it is due for revalidation."""
+        if self.repo is None:
+            return _found(await discover())
+
+        key = (normalise_domain(domain), kind)
+        if key in _in_flight:
+            return await asyncio.shield(_in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        _in_flight[key] = future
+        try:
+            value = await self._resolve(key[0], kind, discover)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the exception; mark it retrieved so an unwaited future does not log it
+            future.exception()
+            raise
+        finally:
+            _in_flight.pop(key, None)
+
+    async def _resolve(self, domain: str, kind: str, discover: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        now = datetime.utcnow()
+        entry = await self.repo.get_entry(domain, kind)
+        if entry and entry.value and entry.expires_at and entry.expires_at > now:
+            print(f"Discovery cache hit for {kind} of {domain}: {entry.value}")
+            return entry.value
+        if entry and not entry.value and entry.retry_after and entry.retry_after > now:
+            print(f"Discovery cache: no {kind} for {domain} until {entry.retry_after}")
+            return None
+
+        value = _found(await discover())
+        if value:
+            await self.repo.save_entry(DiscoveryCacheEntry(
+                domain=domain,
+                kind=kind,
+                value=value,
+                failures=0,
+                expires_at=now + timedelta(days=scraper_settings.DISCOVERY_CACHE_TTL_DAYS),
+            ))
+            return value
+
+        failures = (entry.failures if entry else 0) + 1
+        retry_after = now + self._retry_delay(failures)
+        if entry and entry.value:
+            # Revalidation failed: keep serving the known URL until the next attempt
+            print(f"Revalidating {kind} for {domain} failed; keeping {entry.value} until {retry_after}")
+            await self.repo.save_entry(DiscoveryCacheEntry(
+                domain=domain, kind=kind, value=entry.value, failures=failures, expires_at=retry_after,
+            ))
+            return entry.value
+
+        await self.repo.save_entry(DiscoveryCacheEntry(
+            domain=domain, kind=kind, value=None, failures=failures, retry_after=retry_after,
+        ))
+        return None
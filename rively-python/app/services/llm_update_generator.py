@@ -1,19 +1,29 @@
 import os
 import json
 import re
-import requests
+import asyncio
+import httpx
 import logging
-from datetime import datetime
-from langchain_openai import ChatOpenAI
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langsmith import traceable, Client, trace as run
-from portkey_ai import createHeaders, PORTKEY_GATEWAY_URL
+from pydantic import BaseModel
 from app.config import settings
 from app.schemas.company_updates import LLMTrackedCompanyUpdate
-from app.services.customer_context import CompanyContextExtractor
-from app.schemas.customers import CustomerContextUpdate
 from app.repository.customers import CustomerRepository
+from app.services.customer_context_cache import format_customer_context_for_prompt, get_customer_context
+from app.repository.first_layer_results import FirstLayerResultRepository
+from app.schemas.first_layer_results import FirstLayerResult
+from app.services.discovery_cache import normalise_domain
+from app.services.prefilter import applies_to as prefilter_applies_to, get_prefilter, log_prefilter_decision
+from app.utils.http_client import get_http_client
+from app.utils.llm_calls import ainvoke_chain
+from app.utils.model_routing import route_model
+from app.utils.item_keys import text_hash
+from app.utils.token_budget import chunk_by_budget, trim_to_budget
+from app.scraper_config import scraper_settings
 
 # Set LangSmith environment variables
 os.environ["LANGCHAIN_TRACING_V2"] = str(settings.LANGCHAIN_TRACING_V2)
@@ -27,22 +37,6 @@ client = Client(api_key=settings.LANGCHAIN_API_KEY)
 LOGS_DIR = "app/logs"
 os.makedirs(LOGS_DIR, exist_ok=True)
 
-def format_customer_context_for_prompt(customer_context) -> str:
-    """Format customer context for use in prompts."""
-    if customer_context is None:
-        return "No context available"
-    
-    if isinstance(customer_context, dict):
-        # Format dictionary as readable text
-        formatted_lines = []
-        for key, value in customer_context.items():
-            # Convert snake_case to readable format
-            readable_key = key.replace('_', ' ').title()
-            formatted_lines.append(f"{readable_key}: {value}")
-        return "\n".join(formatted_lines)
-    
-    return str(customer_context)
-
 def clean_json_response(response_text: str, expected_keys: list = None) -> dict:
     """Clean and extract JSON from LLM response text."""
     print(f"DEBUG - clean_json_response called with:")
@@ -93,31 +87,6 @@ def clean_json_response(response_text: str, expected_keys: list = None) -> dict:
             return fallback
         return {}
 
-def save_company_context_log(customer_uid: str, company_domain: str, context_data: dict):
-    """Save company context to a dedicated log file for each customer."""
-    try:
-        log_file = os.path.join(LOGS_DIR, f"customer_context_{customer_uid}.txt")
-        timestamp = datetime.now().isoformat()
-        
-        log_entry = f"""
-========================================
-Timestamp: {timestamp}
-Customer UID: {customer_uid}
-Company Domain: {company_domain}
-Context Data:
-{json.dumps(context_data, indent=2)}
-========================================
-
-"""
-        
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(log_entry)
-            
-        logging.info(f"Company context saved to {log_file}")
-        
-    except Exception as e:
-        logging.error(f"Failed to save company context log: {e}")
-
 def save_threshold_trigger_log(customer_uid: str, company: str, threshold_data: str, agent_triggered: bool):
     """Save log when threshold check is positive and agents are triggered."""
     try:
@@ -218,7 +187,7 @@ async def call_agent_api(agent_name: str, message: str) -> dict:
     print(f"DEBUG - Payload: {payload}")
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = await get_http_client().post(url, headers=headers, json=payload, timeout=scraper_settings.AGENT_TIMEOUT_SECONDS)
         print(f"DEBUG - API response status: {response.status_code}")
         response.raise_for_status()
         
@@ -233,16 +202,16 @@ async def call_agent_api(agent_name: str, message: str) -> dict:
         print(f"DEBUG - Returning successful result")
         return result
         
-    except requests.exceptions.Timeout as e:
-        error_msg = f"Timeout calling {agent_name} API after 30 seconds: {str(e)}"
+    except httpx.TimeoutException as e:
+        error_msg = f"Timeout calling {agent_name} API after {scraper_settings.AGENT_TIMEOUT_SECONDS} seconds: {str(e)}"
         print(f"DEBUG - TIMEOUT ERROR: {error_msg}")
         logging.error(error_msg)
         return {
             "success": False,
-            "agent_output": f"Agent API call timed out after 30 seconds",
+            "agent_output": f"Agent API call timed out after {scraper_settings.AGENT_TIMEOUT_SECONDS} seconds",
             "error": "timeout"
         }
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         error_msg = f"Error calling {agent_name} API: {str(e)}"
         print(f"DEBUG - REQUEST ERROR: {error_msg}")
         logging.error(error_msg)
@@ -252,57 +221,59 @@ async def call_agent_api(agent_name: str, message: str) -> dict:
             "error": str(e)
         }
 
-@traceable(run_type="chain", metadata={"function": "convert_data_into_updates_llm"})
-async def convert_data_into_updates_llm(
-    text: str, 
-    source_type: str, 
-    company_type: str,
-    company: str,
-    tracked_company_uid: str,
-    customer_repo: CustomerRepository,
-    customer_uid: str
-) -> LLMTrackedCompanyUpdate:
-    
-    # DEBUG: Print initial function call info
-    print(f"\n=== DEBUG - convert_data_into_updates_llm STARTED ===")
-    print(f"Company: {company}")
-    print(f"Company Type: {company_type}")
-    print(f"Source Type: {source_type}")
-    print(f"Customer UID: {customer_uid}")
-    print(f"Text length: {len(text) if text else 0}")
-    print(f"=======================================================\n")
-    
-    # Save initial input data
-    input_data = f"""Input Data:
-        Text: {text[:200]}... (truncated)
-        Source Type: {source_type}
-        Company Type: {company_type}
-        Company: {company}
-        Tracked Company UID: {tracked_company_uid}
-        Customer UID: {customer_uid}
-        """
+# First-layer title for items that should not become an update; the scraper sources skip these
+NOT_USEFUL_TITLE = "Not useful for product manager"
+
+# Items need to be actionable and score above this for the second layer, agent and final layer
+USEFULNESS_THRESHOLD = 70
+
+def is_low_value(first_layer_response: LLMTrackedCompanyUpdate) -> bool:
+    """What the pre-filter predicts: the item is dropped, or is neither actionable nor scored above PREFILTER_LOW_VALUE_MAX_SCORE."""
+    if first_layer_response.title == NOT_USEFUL_TITLE:
+        return True
+    try:
+        score = int(first_layer_response.update_usefulness_score or 0)
+    except (TypeError, ValueError):
+        score = 0
+    return str(first_layer_response.actionable_and_useful).lower() != 'true' and score <= scraper_settings.PREFILTER_LOW_VALUE_MAX_SCORE
 
-    # First Layer - Load base prompt
+def load_first_layer_prompt() -> str:
     try:
-        with run(name="LoadBasePrompt", run_type="tool", metadata={"step": "prompt_loading"}):
-            with open("app/services/prompts/update_generator_prompt.txt", "r") as file:
-                base_prompt = file.read()
+        with open("app/services/prompts/update_generator_prompt.txt", "r") as file:
+            return file.read()
     except Exception as e:
         error_msg = f"Error loading base_prompt: {e}"
         logging.error(error_msg)
-        raise Exception(error_msg)   
+        raise Exception(error_msg)
 
-    # Configure Portkey headers - let Portkey manage model and provider
-    portkey_headers = createHeaders(
-        api_key=settings.PORTKEY_KEY
-    )
-    
-    llm = ChatOpenAI(
-        api_key="dummy-key-portkey-handles-routing", 
-        base_url=PORTKEY_GATEWAY_URL,
-        default_headers=portkey_headers,
-        temperature=0.7
-    )
+def parse_first_layer_response(response) -> LLMTrackedCompanyUpdate:
+    """Normalise the first-layer output; actionable_and_useful is always 'true' or 'false'."""
+    if not isinstance(response, LLMTrackedCompanyUpdate):
+        print(f"DEBUG - Converting response to LLMTrackedCompanyUpdate")
+        actionable_value = str(response.get("actionable_and_useful", "false")).lower()
+        actionable_str = actionable_value if actionable_value in ['true', 'false'] else 'false'
+
+        return LLMTrackedCompanyUpdate(
+            title=response.get("title", ""),
+            description=response.get("description", ""),
+            update_type=response.get("update_type", ""),
+            update_category=response.get("update_category", ""),
+            actionable_and_useful=actionable_str,
+            update_usefulness_score=response.get("update_usefulness_score", 0),
+            action_point=response.get("action_point", "")
+        )
+    print(f"DEBUG - Response is already LLMTrackedCompanyUpdate")
+    actionable_value = response.actionable_and_useful.lower() if isinstance(response.actionable_and_useful, str) else str(response.actionable_and_useful).lower()
+    response.actionable_and_useful = actionable_value if actionable_value in ['true', 'false'] else 'false'
+    return response
+
+@traceable(run_type="chain", metadata={"function": "run_first_layer_analysis"})
+async def run_first_layer_analysis(text: str, source_type: str, company_type: str, company: str, customer_uid: str) -> LLMTrackedCompanyUpdate:
+    """First layer: title, category, usefulness score. Uses no customer data; customer_uid is only trace metadata."""
+    with run(name="LoadBasePrompt", run_type="tool", metadata={"step": "prompt_loading"}):
+        base_prompt = load_first_layer_prompt()
+
+    route = route_model("first_layer")
     output_parser = JsonOutputParser(pydantic_object=LLMTrackedCompanyUpdate)
     
     prompt_template = PromptTemplate(
@@ -311,7 +282,7 @@ async def convert_data_into_updates_llm(
         partial_variables={"format_instructions": output_parser.get_format_instructions()},
     )
     
-    chain = prompt_template | llm | output_parser
+    chain = prompt_template | route.llm | output_parser
 
     prompt_input = {
         "text": text,
@@ -321,10 +292,13 @@ async def convert_data_into_updates_llm(
     }
 
     try:
-        with run(name="FirstLayerLLMCall", run_type="llm", metadata={"step": "first_layer", "model": "llama-3.3-70b-versatile"}):
+        with run(name="FirstLayerLLMCall", run_type="llm", metadata={"step": "first_layer", **route.metadata}):
             print(f"DEBUG - Calling first layer LLM with input: {prompt_input}")
-            response = chain.invoke(
+            response = await ainvoke_chain(
+                chain,
                 prompt_input,
+                route.host,
+                route=route,
                 config={
                     "metadata": {
                         "step": "first_layer",
@@ -341,27 +315,8 @@ async def convert_data_into_updates_llm(
         print(f"DEBUG - First layer error: {error_msg}")
         logging.error(error_msg)
         raise Exception(error_msg)
-    
-    # Handle response conversion
-    if not isinstance(response, LLMTrackedCompanyUpdate):
-        print(f"DEBUG - Converting response to LLMTrackedCompanyUpdate")
-        actionable_value = response.get("actionable_and_useful", "false").lower()
-        actionable_str = actionable_value if actionable_value in ['true', 'false'] else 'false'
 
-        first_layer_response = LLMTrackedCompanyUpdate(
-            title=response.get("title", ""),
-            description=response.get("description", ""),
-            update_type=response.get("update_type", ""),
-            update_category=response.get("update_category", ""),
-            actionable_and_useful=actionable_str,
-            update_usefulness_score=response.get("update_usefulness_score", 0),
-            action_point=response.get("action_point", "")
-        )
-    else:
-        print(f"DEBUG - Response is already LLMTrackedCompanyUpdate")
-        first_layer_response = response
-        actionable_value = first_layer_response.actionable_and_useful.lower() if isinstance(first_layer_response.actionable_and_useful, str) else str(first_layer_response.actionable_and_useful).lower()
-        first_layer_response.actionable_and_useful = actionable_value if actionable_value in ['true', 'false'] else 'false'
+    first_layer_response = parse_first_layer_response(response)
 
     print(f"DEBUG - First layer final response:")
     print(f"  - Title: {first_layer_response.title}")
@@ -369,68 +324,334 @@ async def convert_data_into_updates_llm(
     print(f"  - Update Category: {first_layer_response.update_category}")
     print(f"  - Actionable: {first_layer_response.actionable_and_useful}")
     print(f"  - Usefulness Score: {first_layer_response.update_usefulness_score}")
+    return first_layer_response
 
-    # Get company context
-    customer_domain = None
+def load_first_layer_batch_prompt() -> str:
     try:
-        with run(name="GetCustomerContext", run_type="tool", metadata={"step": "context_retrieval"}):
-            customer_context_str = await customer_repo.get_customer_context(customer_uid)
-            
-            if customer_context_str is None:
-                with run(name="ExtractCustomerContext", run_type="tool", metadata={"step": "context_extraction"}):
-                    try:
-                        extractor = CompanyContextExtractor()
-                        customer_domain = await customer_repo.get_customer_company_domain(customer_uid)
-                        context_json = await extractor.extract_customer_context(customer_domain)
-                        await customer_repo.update_customer_with_customer_context(
-                            customer_uid, CustomerContextUpdate(customer_context=json.dumps(context_json))
-                        )
-                        customer_context = context_json
-                        
-                        # Save company context to log file
-                        save_company_context_log(customer_uid, customer_domain, context_json)
-                    except Exception as extraction_error:
-                        error_msg = f"Failed to extract customer context: {extraction_error}"
-                        logging.error(error_msg)
-                        customer_context = {"error": "Context extraction failed", "domain": customer_domain}
-                        save_company_context_log(customer_uid, customer_domain or "unknown", customer_context)
-            else:
-                # Parse the JSON string retrieved from database
-                try:
-                    customer_context = json.loads(customer_context_str)
-                except json.JSONDecodeError:
-                    # If parsing fails, treat as plain string
-                    customer_context = {"raw_context": customer_context_str}
-                
-                # Also log when existing context is retrieved
-                if customer_domain is None:
-                    customer_domain = await customer_repo.get_customer_company_domain(customer_uid)
-                save_company_context_log(customer_uid, customer_domain, customer_context)
-                
+        with open("app/services/prompts/update_generator_batch_prompt.txt", "r") as file:
+            return file.read()
     except Exception as e:
-        error_msg = f"Error retrieving customer_context: {type(e).__name__}: {str(e)}"
+        error_msg = f"Error loading batch base_prompt: {e}"
         logging.error(error_msg)
-        customer_context = None
+        raise Exception(error_msg)
 
-    # Check threshold
+def chunk_first_layer_batches(texts: List[str]) -> List[List[int]]:
+    """Group item indices into batches of at most FIRST_LAYER_BATCH_SIZE items and FIRST_LAYER_BATCH_MAX_TOKENS tokens."""
+    return chunk_by_budget(texts, scraper_settings.FIRST_LAYER_BATCH_MAX_TOKENS, scraper_settings.FIRST_LAYER_BATCH_SIZE)
+
+@traceable(run_type="chain", metadata={"function": "run_first_layer_batch"})
+async def run_first_layer_batch(texts: List[str], source_type: str, company_type: str, company: str, customer_uid: str) -> List[LLMTrackedCompanyUpdate]:
+    """
+    Classify several items in one request with the batch prompt. Items the model leaves out
+    (or a failed batch) fall back to the single-item first layer, so every item gets a result.
+    """
+    if len(texts) == 1:
+        return [await run_first_layer_analysis(texts[0], source_type, company_type, company, customer_uid)]
+
+    with run(name="LoadBatchPrompt", run_type="tool", metadata={"step": "prompt_loading"}):
+        batch_prompt = load_first_layer_batch_prompt()
+
+    prompt_template = PromptTemplate(
+        template=batch_prompt,
+        input_variables=["items", "count", "source-type", "company-type", "company"],
+    )
+    route = route_model("first_layer")
+    chain = prompt_template | route.llm | JsonOutputParser()
+
+    response = None
     try:
-        with run(name="ThresholdCheck", run_type="tool", metadata={"step": "threshold_evaluation"}):
-            # Handle both string and boolean values for actionable_and_useful
-            actionable_value = first_layer_response.actionable_and_useful
-            if isinstance(actionable_value, bool):
-                is_actionable = actionable_value
-            elif isinstance(actionable_value, str):
-                is_actionable = actionable_value.lower() == 'true'
+        with run(name="FirstLayerBatchLLMCall", run_type="llm", metadata={"step": "first_layer_batch", "batch_size": len(texts), **route.metadata}):
+            print(f"DEBUG - Calling first layer LLM for a batch of {len(texts)} items from {source_type}")
+            response = await ainvoke_chain(
+                chain,
+                {
+                    "items": json.dumps([{"index": index, "text": text} for index, text in enumerate(texts)], ensure_ascii=False),
+                    "count": len(texts),
+                    "source-type": source_type,
+                    "company-type": company_type,
+                    "company": company
+                },
+                route.host,
+                route=route,
+                config={
+                    "metadata": {
+                        "step": "first_layer_batch",
+                        "company": company,
+                        "customer_uid": customer_uid,
+                        "source_type": source_type,
+                        "batch_size": len(texts)
+                    }
+                }
+            )
+    except Exception as e:
+        error_msg = f"Error invoking first layer batch chain: {e}"
+        print(f"DEBUG - First layer batch error: {error_msg}")
+        logging.error(error_msg)
+
+    entries = response.get("updates", []) if isinstance(response, dict) else response if isinstance(response, list) else []
+    results: List[Optional[LLMTrackedCompanyUpdate]] = [None] * len(texts)
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("index"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(texts) and results[index] is None:
+            results[index] = parse_first_layer_response(entry)
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        print(f"DEBUG - First layer batch returned {len(texts) - len(missing)}/{len(texts)} items; analysing the rest one by one")
+        for index in missing:
+            results[index] = await run_first_layer_analysis(texts[index], source_type, company_type, company, customer_uid)
+    return results
+
+async def classify_first_layer(texts: List[str], source_type: str, company_type: str, company: str, customer_uid: str) -> List[LLMTrackedCompanyUpdate]:
+    """First layer for many items of one company and source: batches run concurrently, results keep input order."""
+    batches = chunk_first_layer_batches(texts)
+    batch_results = await asyncio.gather(*[
+        run_first_layer_batch([texts[index] for index in batch], source_type, company_type, company, customer_uid)
+        for batch in batches
+    ])
+    results: List[Optional[LLMTrackedCompanyUpdate]] = [None] * len(texts)
+    for batch, batch_result in zip(batches, batch_results):
+        for index, result in zip(batch, batch_result):
+            results[index] = result
+    return results
+
+def first_layer_item_hash(text: str, source_type: str, company_type: str, company: str) -> str:
+    """Everything the first-layer prompt sees, plus the prompt itself so prompt edits invalidate stored results."""
+    return text_hash("\n".join([text_hash(load_first_layer_prompt()), source_type or "", company_type or "", company or "", text or ""]))
+
+# First-layer analyses running in this process, so customers scraped concurrently share one LLM call
+_first_layer_in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+async def get_first_layer_analyses(
+    texts: List[str],
+    source_type: str,
+    company_type: str,
+    company: str,
+    customer_uid: str,
+    domain: Optional[str] = None,
+    first_layer_repo: Optional[FirstLayerResultRepository] = None
+) -> List[LLMTrackedCompanyUpdate]:
+    """
+    First-layer analysis of `texts` through the cross-customer store keyed by (competitor domain,
+    item hash); only items with no stored or in-flight result are sent, batched, to the LLM.
+    Without a repository or domain every item is analysed.
+    """
+    if first_layer_repo is None or not domain:
+        return await classify_first_layer(texts, source_type, company_type, company, customer_uid)
+
+    domain_key = normalise_domain(domain)
+    keys = [(domain_key, first_layer_item_hash(text, source_type, company_type, company)) for text in texts]
+    results: List[Optional[LLMTrackedCompanyUpdate]] = [None] * len(texts)
+    owned: Dict[int, asyncio.Future] = {}
+    waiting: Dict[int, asyncio.Future] = {}
+    for index, key in enumerate(keys):
+        if key in _first_layer_in_flight:
+            # Another customer (or a duplicate item in this batch) is already analysing it
+            waiting[index] = _first_layer_in_flight[key]
+            continue
+        future = asyncio.get_running_loop().create_future()
+        _first_layer_in_flight[key] = future
+        owned[index] = future
+
+    try:
+        not_before = datetime.utcnow() - timedelta(days=scraper_settings.FIRST_LAYER_RESULT_TTL_DAYS)
+        to_analyse = []
+        for index in owned:
+            stored = await first_layer_repo.get_result(keys[index][0], keys[index][1], not_before=not_before)
+            if stored:
+                print(f"DEBUG - Reusing first layer result for {company} ({keys[index][0]}, {keys[index][1][:12]})")
+                results[index] = LLMTrackedCompanyUpdate.model_validate_json(stored.result)
             else:
-                is_actionable = False
-                
-            usefulness_score = int(first_layer_response.update_usefulness_score) if first_layer_response.update_usefulness_score is not None else 0
-            
+                to_analyse.append(index)
+
+        if to_analyse:
+            analysed = await classify_first_layer([texts[index] for index in to_analyse], source_type, company_type, company, customer_uid)
+            for index, first_layer_response in zip(to_analyse, analysed):
+                results[index] = first_layer_response
+                await first_layer_repo.save_result(FirstLayerResult(
+                    domain=keys[index][0],
+                    item_hash=keys[index][1],
+                    source_type=source_type,
+                    result=first_layer_response.model_dump_json(),
+                ))
+        for index, future in owned.items():
+            future.set_result(results[index])
+    except asyncio.CancelledError:
+        for future in owned.values():
+            if not future.done():
+                future.cancel()
+        raise
+    except Exception as e:
+        for future in owned.values():
+            if not future.done():
+                future.set_exception(e)
+                future.exception()
+        raise
+    finally:
+        for index in owned:
+            _first_layer_in_flight.pop(keys[index], None)
+
+    for index, future in waiting.items():
+        results[index] = await asyncio.shield(future)
+    # Callers may mutate the results; each gets its own copy
+    return [result.model_copy() for result in results]
+
+async def get_first_layer_analysis(
+    text: str,
+    source_type: str,
+    company_type: str,
+    company: str,
+    customer_uid: str,
+    domain: Optional[str] = None,
+    first_layer_repo: Optional[FirstLayerResultRepository] = None
+) -> LLMTrackedCompanyUpdate:
+    return (await get_first_layer_analyses([text], source_type, company_type, company, customer_uid, domain, first_layer_repo))[0]
+
+@traceable(run_type="chain", metadata={"function": "convert_data_into_updates_llm"})
+async def convert_data_into_updates_llm(
+    text: str, 
+    source_type: str, 
+    company_type: str,
+    company: str,
+    tracked_company_uid: str,
+    customer_repo: CustomerRepository,
+    customer_uid: str,
+    domain: Optional[str] = None,
+    first_layer_repo: Optional[FirstLayerResultRepository] = None
+) -> LLMTrackedCompanyUpdate:
+    
+    # DEBUG: Print initial function call info
+    print(f"\n=== DEBUG - convert_data_into_updates_llm STARTED ===")
+    print(f"Company: {company}")
+    print(f"Company Type: {company_type}")
+    print(f"Source Type: {source_type}")
+    print(f"Customer UID: {customer_uid}")
+    print(f"Text length: {len(text) if text else 0}")
+    print(f"=======================================================\n")
+
+    text = trim_to_budget(text, scraper_settings.FIRST_LAYER_ITEM_MAX_TOKENS, "first_layer_item")
+    
+    # Save initial input data
+    input_data = f"""Input Data:
+        Text: {text[:200]}... (truncated)
+        Source Type: {source_type}
+        Company Type: {company_type}
+        Company: {company}
+        Tracked Company UID: {tracked_company_uid}
+        Customer UID: {customer_uid}
+        """
+
+    # First layer depends only on the item, not the customer; shared across customers by domain
+    first_layer_response = await get_first_layer_analysis(
+        text, source_type, company_type, company, customer_uid, domain=domain, first_layer_repo=first_layer_repo
+    )
+    return await run_customer_layers(first_layer_response, text, source_type, company_type, company, tracked_company_uid, customer_repo, customer_uid)
+
+@traceable(run_type="chain", metadata={"function": "convert_batch_into_updates_llm"})
+async def convert_batch_into_updates_llm(
+    texts: List[str],
+    source_type: str,
+    company_type: str,
+    company: str,
+    tracked_company_uid: str,
+    customer_repo: CustomerRepository,
+    customer_uid: str,
+    domain: Optional[str] = None,
+    first_layer_repo: Optional[FirstLayerResultRepository] = None,
+    defer_enrichment: bool = False
+) -> List[LLMTrackedCompanyUpdate]:
+    """
+    convert_data_into_updates_llm for all items a source collected for one company: the first
+    layer is batched, the customer-specific layers then run per item. Results keep input order.
+    Items the local pre-filter rejects (PREFILTER_MODE=enforce) come back titled NOT_USEFUL_TITLE.
+    With defer_enrichment, items over the threshold come back without an action point; the
+    caller queues those for which needs_enrichment() is true once they are stored.
+    """
+    print(f"\n=== DEBUG - convert_batch_into_updates_llm: {len(texts)} items for {company} from {source_type} ===")
+    if not texts:
+        return []
+    texts = [trim_to_budget(text, scraper_settings.FIRST_LAYER_ITEM_MAX_TOKENS, "first_layer_item") for text in texts]
+
+    # Local pre-filter: in enforce mode confident low-value items never reach the LLM
+    scores = [get_prefilter().score(text) for text in texts] if prefilter_applies_to(source_type) else None
+    rejected = set()
+    if scores and scraper_settings.PREFILTER_MODE == "enforce":
+        rejected = {index for index, score in enumerate(scores) if score.probability >= scraper_settings.PREFILTER_REJECT_THRESHOLD}
+    analysed = [index for index in range(len(texts)) if index not in rejected]
+
+    first_layer_responses = await get_first_layer_analyses(
+        [texts[index] for index in analysed], source_type, company_type, company, customer_uid, domain=domain, first_layer_repo=first_layer_repo
+    )
+    first_layer_by_index = dict(zip(analysed, first_layer_responses))
+
+    updates = []
+    for index, text in enumerate(texts):
+        if index in rejected:
+            print(f"DEBUG - Pre-filter rejected item (p={scores[index].probability}, {scores[index].reasons}): {text[:50]}...")
+            log_prefilter_decision(source_type, company, text, scores[index], rejected=True, llm_low_value=None)
+            updates.append(LLMTrackedCompanyUpdate(
+                title=NOT_USEFUL_TITLE,
+                description=f"Rejected by the local pre-filter: {', '.join(scores[index].reasons) or 'model score'}",
+                actionable_and_useful='false',
+                update_usefulness_score=0
+            ))
+            continue
+        first_layer_response = first_layer_by_index[index]
+        if scores:
+            log_prefilter_decision(source_type, company, text, scores[index], rejected=False, llm_low_value=is_low_value(first_layer_response))
+        updates.append(await run_customer_layers(first_layer_response, text, source_type, company_type, company, tracked_company_uid, customer_repo, customer_uid, defer_enrichment=defer_enrichment))
+    return updates
+
+def evaluate_threshold(first_layer_response: LLMTrackedCompanyUpdate) -> Tuple[bool, int]:
+    """(actionable, usefulness score) from the first-layer output, tolerating strings and missing values."""
+    try:
+        # Handle both string and boolean values for actionable_and_useful
+        actionable_value = first_layer_response.actionable_and_useful
+        if isinstance(actionable_value, bool):
+            is_actionable = actionable_value
+        elif isinstance(actionable_value, str):
+            is_actionable = actionable_value.lower() == 'true'
+        else:
+            is_actionable = False
+
+        usefulness_score = int(first_layer_response.update_usefulness_score) if first_layer_response.update_usefulness_score is not None else 0
+
     except (AttributeError, ValueError, TypeError) as e:
         error_msg = f"Error parsing threshold values: {e}"
         logging.error(error_msg)
         is_actionable = False
         usefulness_score = 0
+    return is_actionable, usefulness_score
+
+def needs_enrichment(first_layer_response: LLMTrackedCompanyUpdate) -> bool:
+    """Whether the item goes on to the second layer, the agent and the final layer."""
+    is_actionable, usefulness_score = evaluate_threshold(first_layer_response)
+    return is_actionable and usefulness_score > USEFULNESS_THRESHOLD
+
+@traceable(run_type="chain", metadata={"function": "run_customer_layers"})
+async def run_customer_layers(
+    first_layer_response: LLMTrackedCompanyUpdate,
+    text: str,
+    source_type: str,
+    company_type: str,
+    company: str,
+    tracked_company_uid: str,
+    customer_repo: CustomerRepository,
+    customer_uid: str,
+    defer_enrichment: bool = False
+) -> LLMTrackedCompanyUpdate:
+    """
+    Threshold check, then enrich_update for items over it. With defer_enrichment the item is
+    returned as the first layer left it and the caller queues it (see app/services/update_enrichment.py).
+    """
+    # Check threshold
+    with run(name="ThresholdCheck", run_type="tool", metadata={"step": "threshold_evaluation"}):
+        is_actionable, usefulness_score = evaluate_threshold(first_layer_response)
 
     threshold_data = f"Actionable: {is_actionable}, Usefulness Score: {usefulness_score}"
     
@@ -438,233 +659,293 @@ async def convert_data_into_updates_llm(
     print(f"DEBUG - Threshold Check:")
     print(f"  - is_actionable: {is_actionable} (type: {type(is_actionable)})")
     print(f"  - usefulness_score: {usefulness_score} (type: {type(usefulness_score)})")
-    print(f"  - threshold_met: {is_actionable and usefulness_score > 70}")
-    logging.info(f"Threshold evaluation - Actionable: {is_actionable}, Score: {usefulness_score}, Met: {is_actionable and usefulness_score > 70}")
+    print(f"  - threshold_met: {is_actionable and usefulness_score > USEFULNESS_THRESHOLD}")
+    logging.info(f"Threshold evaluation - Actionable: {is_actionable}, Score: {usefulness_score}, Met: {is_actionable and usefulness_score > USEFULNESS_THRESHOLD}")
 
-    if is_actionable and usefulness_score > 70:
+    if is_actionable and usefulness_score > USEFULNESS_THRESHOLD:
         # Log when threshold check is positive and agents will be triggered
         save_threshold_trigger_log(customer_uid, company, threshold_data, True)
+        if defer_enrichment:
+            print(f"DEBUG - Threshold met, agent enrichment deferred to the enrichment queue")
+            return first_layer_response
+        return (await enrich_update(first_layer_response, text, company_type, company, customer_repo, customer_uid)).update
+    else:
+        # Log when threshold check is negative
+        print(f"DEBUG - Threshold not met, skipping agent processing")
+        save_threshold_trigger_log(customer_uid, company, threshold_data, False)
+
+    return first_layer_response
+
+class EnrichmentResult(BaseModel):
+    update: LLMTrackedCompanyUpdate
+    # True when an agent ran and the final layer produced update.action_point
+    enriched: bool = False
+
+@traceable(run_type="chain", metadata={"function": "enrich_update"})
+async def enrich_update(
+    first_layer_response: LLMTrackedCompanyUpdate,
+    text: str,
+    company_type: str,
+    company: str,
+    customer_repo: CustomerRepository,
+    customer_uid: str,
+    raise_errors: bool = False
+) -> EnrichmentResult:
+    """
+    Customer context, second layer (agent selection), agent call and final layer (action point)
+    for an item over the threshold. Without an agent, or when a step fails, the first-layer output
+    comes back unenriched; with raise_errors, failures are raised instead so the enrichment queue
+    can retry the job.
+    """
+    # Get company context
+    try:
+        with run(name="GetCustomerContext", run_type="tool", metadata={"step": "context_retrieval"}):
+            customer_context = (await get_customer_context(customer_uid, customer_repo)).prompt_text
+    except Exception as e:
+        error_msg = f"Error retrieving customer_context: {type(e).__name__}: {str(e)}"
+        logging.error(error_msg)
+        if raise_errors:
+            raise
+        customer_context = format_customer_context_for_prompt(None)
+
+    with run(name="SecondLayerProcessing", run_type="chain", metadata={"step": "second_layer_analysis"}):
+        second_layer_prompt = """
+        You are a JSON analysis assistant. Analyze the company update and determine if an agent is needed.
         
-        with run(name="SecondLayerProcessing", run_type="chain", metadata={"step": "second_layer_analysis"}):
-            second_layer_prompt = """
-            You are a JSON analysis assistant. Analyze the company update and determine if an agent is needed.
-            
-            STRICT INSTRUCTIONS:
-            1. ONLY return valid JSON - no markdown, no explanations, no code blocks
-            2. Follow the exact format specified below
-            3. Keep responses concise and direct
+        STRICT INSTRUCTIONS:
+        1. ONLY return valid JSON - no markdown, no explanations, no code blocks
+        2. Follow the exact format specified below
+        3. Keep responses concise and direct
+        
+        Input Analysis:
+        Company: {company}
+        Company Context: {customer_context}
+        Company Type: {company_type}
+        Update Type: {update_type}
+        Update Category: {update_category}
+        Raw data/update: {text}
+        Title: {title}
+        Key Insights: {key_insights}
+        Agent Catalogue: {agent_catalogue}
+        
+        Return ONLY this JSON format:
+        {{
+            "is_agent_useful": "true" or "false",
+            "agent_name": "exact agent name from catalogue or empty string",
+            "agent_input": "specific input for the agent or empty string"
+        }}
+        """
+        
+        AGENT_CATALOGUE = """
+        "Similar Client Discovery Agent": "This agent takes a company name, domain, or a brief description as input and finds similar companies using Perplexity. It returns a list of similar companies along with their domains for further lead discovery or sales prospecting. input: company domain (or) name + description. Only when to use: when the company's update is about onboarding a new customer or client."
+        "Content Marketing Agent": "This agent takes a piece of content (blog, post, tweet, text) as input and creates a better and plagiarism free content of same type. It also suggests trending topics for consideration. input: content. Only when to use: when the company's update is about content marketing, blog posts, or social media updates."
+        """
+
+        second_layer_input = {
+            "company": company,
+            "customer_context": customer_context,
+            "company_type": company_type,
+            "update_type": first_layer_response.update_type,
+            "update_category": first_layer_response.update_category,
+            "text": trim_to_budget(text, scraper_settings.SECOND_LAYER_TEXT_MAX_TOKENS, "second_layer_text"),
+            "title": first_layer_response.title,
+            "key_insights": first_layer_response.description,
+            "agent_catalogue": AGENT_CATALOGUE
+        }
+
+        second_layer_template = PromptTemplate(
+            template=second_layer_prompt,
+            input_variables=[
+                "company",
+                "customer_context",
+                "company_type",
+                "update_type",
+                "update_category",
+                "text",
+                "title",
+                "key_insights",
+                "agent_catalogue"
+            ],
+            partial_variables={"format_instructions": JsonOutputParser().get_format_instructions()}
+        )
+        
+        second_layer_route = route_model("second_layer")
+        second_layer_chain = second_layer_template | second_layer_route.llm | JsonOutputParser()
+        
+        try:
+            print(f"DEBUG - Invoking second layer with input:")
+            print(f"  - Company: {company}")
+            print(f"  - Update Type: {first_layer_response.update_type}")
+            print(f"  - Update Category: {first_layer_response.update_category}")
             
-            Input Analysis:
-            Company: {company}
-            Company Context: {customer_context}
-            Company Type: {company_type}
-            Update Type: {update_type}
-            Update Category: {update_category}
-            Raw data/update: {text}
-            Title: {title}
-            Key Insights: {key_insights}
-            Agent Catalogue: {agent_catalogue}
+            second_layer_response = await ainvoke_chain(
+                second_layer_chain,
+                second_layer_input,
+                second_layer_route.host,
+                route=second_layer_route,
+                config={
+                    "metadata": {
+                        "step": "second_layer",
+                        "company": company,
+                        "customer_uid": customer_uid
+                    }
+                }
+            )
             
-            Return ONLY this JSON format:
-            {{
-                "is_agent_useful": "true" or "false",
-                "agent_name": "exact agent name from catalogue or empty string",
-                "agent_input": "specific input for the agent or empty string"
-            }}
-            """
+            print(f"DEBUG - Raw second layer response: {second_layer_response}")
+            print(f"DEBUG - Second layer response type: {type(second_layer_response)}")
             
-            AGENT_CATALOGUE = """
-            "Similar Client Discovery Agent": "This agent takes a company name, domain, or a brief description as input and finds similar companies using Perplexity. It returns a list of similar companies along with their domains for further lead discovery or sales prospecting. input: company domain (or) name + description. Only when to use: when the company's update is about onboarding a new customer or client."
-            "Content Marketing Agent": "This agent takes a piece of content (blog, post, tweet, text) as input and creates a better and plagiarism free content of same type. It also suggests trending topics for consideration. input: content. Only when to use: when the company's update is about content marketing, blog posts, or social media updates."
-            """
-
-            second_layer_input = {
-                "company": company,
-                "customer_context": format_customer_context_for_prompt(customer_context),
-                "company_type": company_type,
-                "update_type": first_layer_response.update_type,
-                "update_category": first_layer_response.update_category,
-                "text": text,
-                "title": first_layer_response.title,
-                "key_insights": first_layer_response.description,
-                "agent_catalogue": AGENT_CATALOGUE
-            }
-
-            second_layer_template = PromptTemplate(
-                template=second_layer_prompt,
-                input_variables=[
-                    "company",
-                    "customer_context",
-                    "company_type",
-                    "update_type",
-                    "update_category",
-                    "text",
-                    "title",
-                    "key_insights",
-                    "agent_catalogue"
-                ],
-                partial_variables={"format_instructions": JsonOutputParser().get_format_instructions()}
+            # Handle cases where LLM returns text instead of JSON
+            second_layer_response = clean_json_response(
+                second_layer_response, 
+                ["is_agent_useful", "agent_name", "agent_input"]
             )
             
-            second_layer_chain = second_layer_template | llm | JsonOutputParser()
+            print(f"DEBUG - Cleaned second layer response: {second_layer_response}")
+            print(f"DEBUG - is_agent_useful value: '{second_layer_response.get('is_agent_useful', '')}' (lower: '{second_layer_response.get('is_agent_useful', '').lower()}')")
             
-            try:
-                print(f"DEBUG - Invoking second layer with input:")
-                print(f"  - Company: {company}")
-                print(f"  - Update Type: {first_layer_response.update_type}")
-                print(f"  - Update Category: {first_layer_response.update_category}")
-                
-                second_layer_response = second_layer_chain.invoke(
-                    second_layer_input,
-                    config={
-                        "metadata": {
-                            "step": "second_layer",
-                            "company": company,
-                            "customer_uid": customer_uid
-                        }
-                    }
-                )
-                
-                print(f"DEBUG - Raw second layer response: {second_layer_response}")
-                print(f"DEBUG - Second layer response type: {type(second_layer_response)}")
-                
-                # Handle cases where LLM returns text instead of JSON
-                second_layer_response = clean_json_response(
-                    second_layer_response, 
-                    ["is_agent_useful", "agent_name", "agent_input"]
-                )
-                
-                print(f"DEBUG - Cleaned second layer response: {second_layer_response}")
-                print(f"DEBUG - is_agent_useful value: '{second_layer_response.get('is_agent_useful', '')}' (lower: '{second_layer_response.get('is_agent_useful', '').lower()}')")
-                
-                if second_layer_response.get("is_agent_useful", "").lower() == 'true':
-                    print(f"DEBUG - Agent deemed useful! Proceeding with agent processing...")
-                    with run(name="AgentProcessing", run_type="chain", metadata={"step": "agent_layer"}):
-                        agent_name = second_layer_response.get("agent_name", "")
-                        agent_input = second_layer_response.get("agent_input", "")
+            if second_layer_response.get("is_agent_useful", "").lower() == 'true':
+                print(f"DEBUG - Agent deemed useful! Proceeding with agent processing...")
+                with run(name="AgentProcessing", run_type="chain", metadata={"step": "agent_layer"}):
+                    agent_name = second_layer_response.get("agent_name", "")
+                    agent_input = second_layer_response.get("agent_input", "")
+                    
+                    # Append raw text data to agent input
+                    agent_text = trim_to_budget(text, scraper_settings.AGENT_INPUT_MAX_TOKENS, "agent_input") if text else text
+                    if agent_input and agent_text:
+                        full_agent_input = f"{agent_input}\n\nRaw data/update:\n{agent_text}"
+                    elif agent_text:
+                        full_agent_input = f"Raw data/update:\n{agent_text}"
+                    else:
+                        full_agent_input = agent_input
+                    
+                    print(f"DEBUG - Agent details:")
+                    print(f"  - Agent Name: '{agent_name}'")
+                    print(f"  - Agent Input: '{agent_input}'")
+                    print(f"  - Full Agent Input: '{full_agent_input[:200]}...' (truncated)")
+                    print(f"  - Full Agent Input Length: {len(full_agent_input) if full_agent_input else 0}")
+                    
+                    if not agent_name:
+                        print(f"ERROR - No agent name provided!")
+                        logging.error("No agent name provided in second layer response")
+                        return EnrichmentResult(update=first_layer_response)
+                    
+                    if not agent_input and not text:
+                        print(f"WARNING - No agent input or raw text provided!")
+                        logging.warning("No agent input or raw text provided in second layer response")
+                    
+                    try:
+                        print(f"DEBUG - Calling agent API: {agent_name}")
+                        # Make actual API call to the agent with full input including raw data
+                        agent_api_response = await call_agent_api(agent_name, full_agent_input)
+                        
+                        print(f"DEBUG - Agent API response: {agent_api_response}")
                         
-                        # Append raw text data to agent input
-                        if agent_input and text:
-                            full_agent_input = f"{agent_input}\n\nRaw data/update:\n{text}"
-                        elif text:
-                            full_agent_input = f"Raw data/update:\n{text}"
+                        if agent_api_response["success"]:
+                            print(f"DEBUG - Agent API call successful!")
+                            agent_layer_response = {
+                                "agent_output": agent_api_response["agent_output"]
+                            }
+                            # Log successful agent output
+                            save_agent_output_log(customer_uid, company, agent_name, agent_api_response["agent_output"], True)
+                            
                         else:
-                            full_agent_input = agent_input
+                            print(f"DEBUG - Agent API call failed: {agent_api_response.get('error', 'Unknown error')}")
+                            # Handle agent API failure
+                            agent_layer_response = {
+                                "agent_output": f"Agent API call failed: {agent_api_response.get('error', 'Unknown error')}"
+                            }
+                            # Log failed agent output
+                            save_agent_output_log(customer_uid, company, agent_name, agent_layer_response["agent_output"], False)
+                            if raise_errors:
+                                raise RuntimeError(agent_layer_response["agent_output"])
+                            
+                    except Exception as e:
+                        if raise_errors:
+                            raise
+                        error_msg = f"Error calling agent API: {e}"
+                        print(f"DEBUG - Exception calling agent API: {error_msg}")
+                        logging.error(error_msg)
+                        agent_layer_response = {
+                            "agent_output": f"Error calling agent: {str(e)}"
+                        }
+                        # Log error agent output
+                        save_agent_output_log(customer_uid, company, agent_name, agent_layer_response["agent_output"], False)
+                    
+                    # Final Layer - Process the agent output regardless of success/failure
+                    with run(name="FinalLayerProcessing", run_type="chain", metadata={"step": "final_layer"}):
+                        final_layer_prompt = """
+                        You are a business insights assistant. Generate a clear, actionable business recommendation.
                         
-                        print(f"DEBUG - Agent details:")
-                        print(f"  - Agent Name: '{agent_name}'")
-                        print(f"  - Agent Input: '{agent_input}'")
-                        print(f"  - Full Agent Input: '{full_agent_input[:200]}...' (truncated)")
-                        print(f"  - Full Agent Input Length: {len(full_agent_input) if full_agent_input else 0}")
+                        STRICT INSTRUCTIONS:
+                        1. ONLY return valid JSON - no markdown, no explanations, no code blocks
+                        2. Keep the action_point concise and specific
+                        3. Focus on practical next steps
                         
-                        if not agent_name:
-                            print(f"ERROR - No agent name provided!")
-                            logging.error("No agent name provided in second layer response")
-                            return first_layer_response
+                        Context:
+                        Company: {company} ({company_type})
+                        Update: {update_category} - {update_type}
+                        Agent Used: {agent_name}
+                        Agent Output: {agent_output}
+                        Your Company Context: {customer_context}
+
+                        Return ONLY this JSON format:
+                        {{
+                            "action_point": "A clear, specific recommendation with actionable next steps."
+                        }}
+                        """
                         
-                        if not agent_input and not text:
-                            print(f"WARNING - No agent input or raw text provided!")
-                            logging.warning("No agent input or raw text provided in second layer response")
+                        final_layer_template = PromptTemplate(
+                            template=final_layer_prompt,
+                            input_variables=["company", "company_type", "update_category", "update_type", "customer_context", "agent_name", "agent_output"],
+                            partial_variables={"format_instructions": JsonOutputParser().get_format_instructions()}
+                        )
+                        
+                        final_layer_route = route_model("final_layer")
+                        final_layer_chain = final_layer_template | final_layer_route.llm | JsonOutputParser()
                         
                         try:
-                            print(f"DEBUG - Calling agent API: {agent_name}")
-                            # Make actual API call to the agent with full input including raw data
-                            agent_api_response = await call_agent_api(agent_name, full_agent_input)
-                            
-                            print(f"DEBUG - Agent API response: {agent_api_response}")
-                            
-                            if agent_api_response["success"]:
-                                print(f"DEBUG - Agent API call successful!")
-                                agent_layer_response = {
-                                    "agent_output": agent_api_response["agent_output"]
-                                }
-                                # Log successful agent output
-                                save_agent_output_log(customer_uid, company, agent_name, agent_api_response["agent_output"], True)
-                                
-                            else:
-                                print(f"DEBUG - Agent API call failed: {agent_api_response.get('error', 'Unknown error')}")
-                                # Handle agent API failure
-                                agent_layer_response = {
-                                    "agent_output": f"Agent API call failed: {agent_api_response.get('error', 'Unknown error')}"
+                            final_layer_response = await ainvoke_chain(
+                                final_layer_chain,
+                                {
+                                    "company": company,
+                                    "company_type": company_type,
+                                    "update_category": first_layer_response.update_category,
+                                    "update_type": first_layer_response.update_type,
+                                    "customer_context": customer_context,
+                                    "agent_name": agent_name,
+                                    "agent_output": trim_to_budget(
+                                        str(agent_layer_response.get("agent_output", "")),
+                                        scraper_settings.FINAL_LAYER_AGENT_OUTPUT_MAX_TOKENS,
+                                        "final_layer_agent_output"
+                                    )
+                                },
+                                final_layer_route.host,
+                                route=final_layer_route,
+                                config={
+                                    "metadata": {
+                                        "step": "final_layer",
+                                        "company": company,
+                                        "customer_uid": customer_uid,
+                                        "agent_name": agent_name
+                                    }
                                 }
-                                # Log failed agent output
-                                save_agent_output_log(customer_uid, company, agent_name, agent_layer_response["agent_output"], False)
-                                
-                        except Exception as e:
-                            error_msg = f"Error calling agent API: {e}"
-                            print(f"DEBUG - Exception calling agent API: {error_msg}")
-                            logging.error(error_msg)
-                            agent_layer_response = {
-                                "agent_output": f"Error calling agent: {str(e)}"
-                            }
-                            # Log error agent output
-                            save_agent_output_log(customer_uid, company, agent_name, agent_layer_response["agent_output"], False)
-                        
-                        # Final Layer - Process the agent output regardless of success/failure
-                        with run(name="FinalLayerProcessing", run_type="chain", metadata={"step": "final_layer"}):
-                            final_layer_prompt = """
-                            You are a business insights assistant. Generate a clear, actionable business recommendation.
-                            
-                            STRICT INSTRUCTIONS:
-                            1. ONLY return valid JSON - no markdown, no explanations, no code blocks
-                            2. Keep the action_point concise and specific
-                            3. Focus on practical next steps
-                            
-                            Context:
-                            Company: {company} ({company_type})
-                            Update: {update_category} - {update_type}
-                            Agent Used: {agent_name}
-                            Agent Output: {agent_output}
-                            Your Company Context: {customer_context}
-
-                            Return ONLY this JSON format:
-                            {{
-                                "action_point": "A clear, specific recommendation with actionable next steps."
-                            }}
-                            """
+                            )
                             
-                            final_layer_template = PromptTemplate(
-                                template=final_layer_prompt,
-                                input_variables=["company", "company_type", "update_category", "update_type", "customer_context", "agent_name", "agent_output"],
-                                partial_variables={"format_instructions": JsonOutputParser().get_format_instructions()}
+                            # Handle cases where final_layer_response is not a proper dict or string
+                            final_layer_response = clean_json_response(
+                                final_layer_response,
+                                ["action_point"]
                             )
                             
-                            final_layer_chain = final_layer_template | llm | JsonOutputParser()
+                            action_point = final_layer_response.get("action_point", "Agent processed but no specific action point generated")
                             
-                            try:
-                                final_layer_response = final_layer_chain.invoke(
-                                    {
-                                        "company": company,
-                                        "company_type": company_type,
-                                        "update_category": first_layer_response.update_category,
-                                        "update_type": first_layer_response.update_type,
-                                        "customer_context": format_customer_context_for_prompt(customer_context),
-                                        "agent_name": agent_name,
-                                        "agent_output": agent_layer_response.get("agent_output", "")
-                                    },
-                                    config={
-                                        "metadata": {
-                                            "step": "final_layer",
-                                            "company": company,
-                                            "customer_uid": customer_uid,
-                                            "agent_name": agent_name
-                                        }
-                                    }
-                                )
-                                
-                                # Handle cases where final_layer_response is not a proper dict or string
-                                final_layer_response = clean_json_response(
-                                    final_layer_response,
-                                    ["action_point"]
-                                )
-                                
-                                action_point = final_layer_response.get("action_point", "Agent processed but no specific action point generated")
-                                
-                                # Ensure action_point is a string
-                                if not isinstance(action_point, str):
-                                    action_point = str(action_point) if action_point else "Agent processed but no specific action point generated"
-                                
-                                return LLMTrackedCompanyUpdate(
+                            # Ensure action_point is a string
+                            if not isinstance(action_point, str):
+                                action_point = str(action_point) if action_point else "Agent processed but no specific action point generated"
+                            
+                            return EnrichmentResult(
+                                update=LLMTrackedCompanyUpdate(
                                     title=first_layer_response.title,
                                     description=first_layer_response.description,
                                     update_category=first_layer_response.update_category,
@@ -672,24 +953,24 @@ async def convert_data_into_updates_llm(
                                     actionable_and_useful=first_layer_response.actionable_and_useful,
                                     update_usefulness_score=first_layer_response.update_usefulness_score,
                                     action_point=action_point
-                                )
-                            except Exception as e:
-                                error_msg = f"Error invoking final layer chain: {e}"
-                                logging.error(error_msg)
-                                return first_layer_response
-                else:
-                    print(f"DEBUG - Agent not deemed useful. Second layer response: {second_layer_response}")
-                    print(f"DEBUG - is_agent_useful value was: '{second_layer_response.get('is_agent_useful', 'MISSING')}'")
-                    return first_layer_response
-            except Exception as e:
-                error_msg = f"Error invoking second layer chain: {e}"
-                print(f"DEBUG - Exception in second layer: {error_msg}")
-                logging.error(error_msg)
-                return first_layer_response
-    else:
-        # Log when threshold check is negative
-        print(f"DEBUG - Threshold not met, skipping agent processing")
-        save_threshold_trigger_log(customer_uid, company, threshold_data, False)
-
-    
-    return first_layer_response
\ No newline at end of file
+                                ),
+                                enriched=True
+                            )
+                        except Exception as e:
+                            if raise_errors:
+                                raise
+                            error_msg = f"Error invoking final layer chain: {e}"
+                            logging.error(error_msg)
+                            return EnrichmentResult(update=first_layer_response)
+            else:
+                print(f"DEBUG - Agent not deemed useful. Second layer response: {second_layer_response}")
+                print(f"DEBUG - is_agent_useful value was: '{second_layer_response.get('is_agent_useful', 'MISSING')}'")
+                return EnrichmentResult(update=first_layer_response)
+        except Exception as e:
+            if raise_errors:
+                # Already raised from the agent or final layer, or the second layer itself failed
+                raise
+            error_msg = f"Error invoking second layer chain: {e}"
+            print(f"DEBUG - Exception in second layer: {error_msg}")
+            logging.error(error_msg)
+            return EnrichmentResult(update=first_layer_response)
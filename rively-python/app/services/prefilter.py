@@ -0,0 +1,199 @@
+# app/services/prefilter.py
+import atexit
+import json
+import logging
+import math
+import os
+import queue
+import random
+import re
+import zlib
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from app.scraper_config import scraper_settings
+
+# Shadow-mode decisions, one JSON object per line; also the training data for train_prefilter.py
+SHADOW_LOG_PATH = "app/logs/prefilter_shadow.jsonl"
+
+# Obvious low-value patterns as (name, pattern, log-odds weight). A trained model replaces the weights.
+RULES: List[Tuple[str, re.Pattern, float]] = [
+    ("hiring", re.compile(r"\b(we'?re hiring|we are hiring|join our (growing )?team|open (roles|positions)|apply (now|here|today)|job opening|now hiring)\b|#hiring\b", re.IGNORECASE), 3.5),
+    ("event_selfie", re.compile(r"\b(stopped by (our|the) booth|visit(ed)? (us at )?(our )?booth|great to (meet|see|connect with)|had a (blast|great time)|thanks to everyone who (came|joined|stopped)|what a (week|day|night|event))\b", re.IGNORECASE), 2.5),
+    ("reshare", re.compile(r"\b(reposted|reshar(e|ed|ing)|check out this (post|article) (by|from)|via @)\b", re.IGNORECASE), 2.0),
+    ("celebration", re.compile(r"\b(happy (holidays|new year|diwali|thanksgiving|international|[a-z]+ day)|work anniversary|congratulations to|congrats to|team outing|throwback)\b|#(tbt|lifeat\w*)\b", re.IGNORECASE), 3.5),
+    ("webinar_promo", re.compile(r"\b(register (now|here|today)|save (your|the) (seat|date)|link in (bio|comments))\b", re.IGNORECASE), 1.0),
+]
+
+# Items shorter than this rarely carry a product or market signal
+SHORT_TEXT_CHARS = 60
+SHORT_TEXT_WEIGHT = 1.5
+
+# Without a trained model the prior leans towards keeping an item: at the default threshold only
+# hiring and celebration posts are rejected on one rule, the others need a second signal
+DEFAULT_BIAS = -1.0
+
+HASH_BUCKETS = 2 ** 18
+_TOKEN = re.compile(r"[a-z0-9#@']+")
+
+
+def _sigmoid(x: float) -> float:
+    if x < -30:
+        return 0.0
+    if x > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def rule_hits(text: str) -> List[str]:
+    hits = [name for name, pattern, _ in RULES if pattern.search(text or "")]
+    if len((text or "").strip()) < SHORT_TEXT_CHARS:
+        hits.append("short_text")
+    return hits
+
+
+def hashed_features(text: str) -> Dict[int, float]:
+    """Unigrams and bigrams of the lowercased text hashed into HASH_BUCKETS, as term frequencies scaled to unit length."""
+    tokens = _TOKEN.findall((text or "").lower())
+    features: Dict[int, float] = {}
+    for gram in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        index = zlib.crc32(gram.encode("utf-8")) % HASH_BUCKETS
+        features[index] = features.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in features.values())) or 1.0
+    return {index: value / norm for index, value in features.items()}
+
+
+class PrefilterScore(BaseModel):
+    probability: float
+    reasons: List[str]
+
+
+class PrefilterModel:
+    """
+    Logistic model over the rule hits plus hashed word features; P(item is low value).
+    Without trained weights it scores with the rule weights above and DEFAULT_BIAS only.
+    """
+
+    def __init__(self, bias: float = DEFAULT_BIAS, rule_weights: Optional[Dict[str, float]] = None, weights: Optional[Dict[int, float]] = None):
+        self.bias = bias
+        self.rule_weights = rule_weights or {**{name: weight for name, _, weight in RULES}, "short_text": SHORT_TEXT_WEIGHT}
+        self.weights = weights or {}
+
+    @classmethod
+    def load(cls, path: str) -> "PrefilterModel":
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            bias=data["bias"],
+            rule_weights=data["rule_weights"],
+            weights={int(index): weight for index, weight in data["weights"].items()},
+        )
+
+    def save(self, path: str, trained_on: int = 0):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "bias": self.bias,
+                "rule_weights": self.rule_weights,
+                "weights": {str(index): round(weight, 6) for index, weight in self.weights.items() if abs(weight) > 1e-6},
+                "trained_on": trained_on,
+                "trained_at": datetime.utcnow().isoformat(),
+            }, f)
+
+    def _logit(self, reasons: List[str], features: Dict[int, float]) -> float:
+        logit = self.bias + sum(self.rule_weights.get(reason, 0.0) for reason in reasons)
+        return logit + sum(self.weights.get(index, 0.0) * value for index, value in features.items())
+
+    def score(self, text: str) -> PrefilterScore:
+        reasons = rule_hits(text)
+        return PrefilterScore(probability=round(_sigmoid(self._logit(reasons, hashed_features(text))), 4), reasons=reasons)
+
+    def train(self, samples: List[Tuple[str, bool]], epochs: int = 10, learning_rate: float = 0.5, l2: float = 1e-4, seed: int = 0):
+        """Plain SGD on log loss; `samples` are (text, is_low_value). Rule weights are learned alongside the word weights."""
+        prepared = [(rule_hits(text), hashed_features(text), 1.0 if low_value else 0.0) for text, low_value in samples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(prepared)
+            rate = learning_rate / (1 + epoch)
+            for reasons, features, label in prepared:
+                error = _sigmoid(self._logit(reasons, features)) - label
+                self.bias -= rate * error
+                for reason in reasons:
+                    self.rule_weights[reason] = self.rule_weights.get(reason, 0.0) - rate * (error + l2 * self.rule_weights.get(reason, 0.0))
+                for index, value in features.items():
+                    weight = self.weights.get(index, 0.0)
+                    self.weights[index] = weight - rate * (error * value + l2 * weight)
+
+
+_model: Optional[PrefilterModel] = None
+
+
+def get_prefilter() -> PrefilterModel:
+    global _model
+    if _model is None:
+        _model = PrefilterModel.load(scraper_settings.PREFILTER_MODEL_PATH)
+    return _model
+
+
+def applies_to(source_type: str) -> bool:
+    return scraper_settings.PREFILTER_MODE != "off" and source_type in scraper_settings.PREFILTER_SOURCE_TYPES
+
+
+_shadow_logger: Optional[logging.Logger] = None
+
+
+def _get_shadow_logger() -> logging.Logger:
+    """
+    Logger for the shadow log. Records are queued and written by a listener thread, so scoring on
+    the event loop never waits on the disk; the file rotates at PREFILTER_SHADOW_LOG_MAX_BYTES.
+    """
+    global _shadow_logger
+    if _shadow_logger is None:
+        os.makedirs(os.path.dirname(SHADOW_LOG_PATH), exist_ok=True)
+        file_handler = RotatingFileHandler(
+            SHADOW_LOG_PATH,
+            maxBytes=scraper_settings.PREFILTER_SHADOW_LOG_MAX_BYTES,
+            backupCount=scraper_settings.PREFILTER_SHADOW_LOG_BACKUPS,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(records, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+        logger = logging.getLogger("rively.prefilter_shadow")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(QueueHandler(records))
+        _shadow_logger = logger
+    return _shadow_logger
+
+
+def log_prefilter_decision(source_type: str, company: str, text: str, score: PrefilterScore, rejected: bool, llm_low_value: Optional[bool]):
+    """
+    Append one decision to the shadow log. llm_low_value is the first layer's verdict (None when the item was
+    rejected before the LLM); the log is what train_prefilter.py learns from.
+    """
+    try:
+        predicted_low_value = score.probability >= scraper_settings.PREFILTER_REJECT_THRESHOLD
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "mode": scraper_settings.PREFILTER_MODE,
+            "source_type": source_type,
+            "company": company,
+            "probability": score.probability,
+            "reasons": score.reasons,
+            "rejected": rejected,
+            "llm_low_value": llm_low_value,
+            "agrees": None if llm_low_value is None else predicted_low_value == llm_low_value,
+            "text": (text or "")[:2000],
+        }
+        _get_shadow_logger().info(json.dumps(entry, ensure_ascii=False))
+        if entry["agrees"] is False:
+            print(f"Pre-filter disagrees with LLM for {company}: p(low value)={score.probability} {score.reasons}, LLM low value={llm_low_value}")
+    except Exception as e:
+        print(f"Failed to log pre-filter decision: {e}")
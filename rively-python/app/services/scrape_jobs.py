@@ -0,0 +1,262 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Callable, Dict, List, Optional
+from app.repository.scrape_jobs import ScrapeJobRepository
+from app.schemas.scraper import (
+    CompanyScrapeResult,
+    ScrapeJobStatus,
+    ScrapeJobUnit,
+    ScraperResponse,
+    SourceScrapeResult,
+)
+from app.services.scraper import ScraperService
+from app.utils.concurrency import get_scrape_limiter
+from app.scraper_config import scraper_settings
+
+# Unit states that count as finished for progress reporting
+FINISHED_UNIT_STATUSES = ("done", "failed")
+
+
+def build_job_status(job, units: List[ScrapeJobUnit]) -> ScrapeJobStatus:
+    """Assemble the polled job status from the job row and its unit checkpoints."""
+    units_by_company: Dict[str, List[ScrapeJobUnit]] = {}
+    for unit in units:
+        units_by_company.setdefault(unit.tracked_company_uid, []).append(unit)
+
+    companies_done = sum(
+        1 for company_units in units_by_company.values()
+        if all(unit.status in FINISHED_UNIT_STATUSES for unit in company_units)
+    )
+    errors = [f"{unit.source}: {unit.domain}: {unit.error}" for unit in units if unit.error]
+    if job["error"]:
+        errors.append(job["error"])
+
+    result = None
+    if job["status"] in ("completed", "failed"):
+        sources: Dict[str, List[CompanyScrapeResult]] = {}
+        for unit in units:
+            sources.setdefault(unit.source, []).append(
+                CompanyScrapeResult(
+                    tracked_company_uid=unit.tracked_company_uid,
+                    domain=unit.domain,
+                    success=unit.status == "done",
+                    updates_stored=unit.updates_stored,
+                    error=unit.error,
+                )
+            )
+        result = ScraperResponse(
+            success=job["status"] == "completed",
+            sources=[
+                SourceScrapeResult(
+                    source=source,
+                    success=all(company.success for company in companies),
+                    companies=companies,
+                )
+                for source, companies in sources.items()
+            ],
+        )
+
+    return ScrapeJobStatus(
+        job_id=str(job["job_uid"]),
+        customer_uid=str(job["customer_uid"]),
+        status=job["status"],
+        companies_total=job["companies_total"],
+        companies_done=companies_done,
+        updates_stored=sum(unit.updates_stored for unit in units),
+        errors=errors,
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        result=result,
+    )
+
+
+class ScrapeJobManager:
+    """
+    Queues scrape jobs and runs their units on a pool of claim loops.
+    Jobs and one unit per (tracked company, source) live in the scrape_jobs tables. Every loop
+    leases one unit at a time from the shared table (FOR UPDATE SKIP LOCKED on Postgres) and keeps
+    the lease alive with heartbeats, so several rively-python instances can drain the same queue
+    without scraping a unit twice, and units of a crashed worker are reclaimed once their lease expires.
+    Created and drained by the app lifespan; routers only submit and poll.
+    """
+
+    def __init__(
+        self,
+        service_factory: Callable[[], ScraperService],
+        job_repo: ScrapeJobRepository,
+        worker_count: int = scraper_settings.SCRAPE_JOB_WORKERS,
+    ):
+        self.service_factory = service_factory
+        self.job_repo = job_repo
+        self.worker_count = max(1, worker_count)
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers: List[asyncio.Task] = []
+        self.accepting = False
+        self.work_available = asyncio.Event()
+
+    async def start(self) -> None:
+        await self.job_repo.ensure_schema()
+        self.accepting = True
+        self.workers = [
+            asyncio.create_task(self._worker(f"{self.node_id}:{i}"), name=f"scrape-job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        print(f"Started {self.worker_count} scrape job workers on {self.node_id}")
+
+    async def submit(self, customer_uid: str) -> str:
+        """
+        Persist a scrape job for the customer and return its id immediately; any worker may pick up its units.
+        A retried request for a customer whose job is still queued or running gets that job back;
+        the database allows one such job per customer, so concurrent requests end up on the same job.
+        """
+        if not self.accepting:
+            raise RuntimeError("Scrape job manager is not accepting jobs")
+
+        job_uid = str(uuid.uuid4())
+        while True:
+            active_job_uid = await self.job_repo.find_active_job(customer_uid)
+            if active_job_uid:
+                print(f"Reusing active scrape job {active_job_uid} for customer_uid: {customer_uid}")
+                return active_job_uid
+
+            scraper_service = self.service_factory()
+            tracked_companies = await scraper_service.scraper_repo.get_all_tracked_companies(customer_uid)
+            units = [
+                (tracked_company.tracked_company_uid, tracked_company.domain, source)
+                for tracked_company in tracked_companies
+                for source in ScraperService.SOURCES
+            ]
+            # Loses to a job created since the lookup above; that job is returned on the next pass
+            if await self.job_repo.create_job(job_uid, customer_uid, units):
+                break
+
+        # A customer with no active tracked companies has nothing to claim
+        await self.job_repo.finish_job_if_done(job_uid)
+        self.work_available.set()
+        print(f"Queued scrape job {job_uid} for customer_uid: {customer_uid} ({len(units)} units)")
+        return job_uid
+
+    async def get_status(self, job_uid: str) -> Optional[ScrapeJobStatus]:
+        job = await self.job_repo.get_job(job_uid)
+        if job is None:
+            return None
+        units = await self.job_repo.get_units(job_uid)
+        return build_job_status(job, units)
+
+    async def shutdown(self, timeout: float = scraper_settings.SCRAPE_JOB_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """
+        Stop claiming new units and let units in flight finish for up to `timeout`.
+        Units still running after that are cancelled and released so another worker can claim them straight away.
+        """
+        self.accepting = False
+        self.work_available.set()
+        done, pending = await asyncio.wait(self.workers, timeout=timeout) if self.workers else (set(), set())
+        if pending:
+            print(f"Scrape units did not drain within {timeout}s, cancelling workers")
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.workers = []
+
+    async def _worker(self, lease_owner: str) -> None:
+        while self.accepting:
+            try:
+                unit = await self.job_repo.claim_unit(
+                    lease_owner,
+                    scraper_settings.SCRAPE_UNIT_LEASE_SECONDS,
+                    scraper_settings.SCRAPE_JOB_MAX_ATTEMPTS,
+                )
+            except Exception as e:
+                print(f"[{lease_owner}] Failed to claim a scrape unit: {e}")
+                unit = None
+
+            if unit is None:
+                await self._wait_for_work()
+                continue
+
+            try:
+                await self._run_unit(unit, lease_owner)
+            except asyncio.CancelledError:
+                # Shutting down mid-unit: give it back instead of waiting for the lease to expire
+                await self.job_repo.release_unit(unit.id, lease_owner)
+                raise
+            except Exception as e:
+                print(f"[{lease_owner}] Scrape unit {unit.id} failed: {e}")
+                await self.job_repo.checkpoint_unit(unit.id, lease_owner, "failed", error=str(e))
+                await self.job_repo.finish_job_if_done(unit.job_uid)
+
+    async def _wait_for_work(self) -> None:
+        # Reap units whose workers died on their last attempt, then sleep until a local
+        # submit wakes us or the poll interval passes (units may be queued by other nodes)
+        try:
+            for job_uid in await self.job_repo.fail_exhausted_units(scraper_settings.SCRAPE_JOB_MAX_ATTEMPTS):
+                await self.job_repo.finish_job_if_done(job_uid)
+        except Exception as e:
+            print(f"Failed to reap expired scrape units: {e}")
+
+        self.work_available.clear()
+        try:
+            await asyncio.wait_for(self.work_available.wait(), timeout=scraper_settings.SCRAPE_QUEUE_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_unit(self, unit: ScrapeJobUnit, lease_owner: str) -> None:
+        print(f"[{lease_owner}] Claimed {unit.source} unit {unit.id} for {unit.domain} (attempt {unit.attempts})")
+        try:
+            await self.job_repo.mark_job_running(unit.job_uid)
+            scraper_service = self.service_factory()
+            tracked_company = await scraper_service.scraper_repo.get_tracked_company(unit.tracked_company_uid)
+            if tracked_company is None:
+                # The company was deactivated or removed after the job was queued
+                await self.job_repo.checkpoint_unit(unit.id, lease_owner, "done")
+                return
+
+            scrape_task = asyncio.create_task(
+                get_scrape_limiter().run_company(
+                    unit.source,
+                    tracked_company,
+                    lambda tc: scraper_service.scrape_company_source(unit.customer_uid, unit.source, tc),
+                )
+            )
+            lease_lost = asyncio.Event()
+            heartbeat_task = asyncio.create_task(self._heartbeat(unit, lease_owner, scrape_task, lease_lost))
+            try:
+                result = await scrape_task
+            except asyncio.CancelledError:
+                if not lease_lost.is_set():
+                    raise
+                print(f"[{lease_owner}] Lost the lease on unit {unit.id}, abandoning it")
+                return
+            finally:
+                heartbeat_task.cancel()
+
+            saved = await self.job_repo.checkpoint_unit(
+                unit.id,
+                lease_owner,
+                "done" if result.success else "failed",
+                result.updates_stored,
+                result.error,
+            )
+            if not saved:
+                print(f"[{lease_owner}] Lease on unit {unit.id} expired before it finished; result discarded")
+        finally:
+            await self.job_repo.finish_job_if_done(unit.job_uid)
+
+    async def _heartbeat(self, unit: ScrapeJobUnit, lease_owner: str, scrape_task: asyncio.Task, lease_lost: asyncio.Event) -> None:
+        """Extend the unit lease while it runs; cancel the scrape if another worker has taken the unit over."""
+        while not scrape_task.done():
+            await asyncio.sleep(scraper_settings.SCRAPE_UNIT_HEARTBEAT_SECONDS)
+            try:
+                still_owned = await self.job_repo.heartbeat_unit(
+                    unit.id, lease_owner, scraper_settings.SCRAPE_UNIT_LEASE_SECONDS
+                )
+            except Exception as e:
+                print(f"[{lease_owner}] Heartbeat for unit {unit.id} failed: {e}")
+                continue
+            if not still_owned:
+                lease_lost.set()
+                scrape_task.cancel()
+                return
@@ -1,40 +1,85 @@
+import asyncio
+from typing import Callable, Optional
 from app.repository.tracked_companies import TrackedCompanyRepository
-from app.schemas.scraper import ScraperResponse
+from app.schemas.scraper import CompanyScrapeResult, ScraperResponse
+from app.schemas.tracked_companies import TrackedCompany
 from app.repository.tracked_company_updates import TrackedCompanyUpdateRepository
 from app.repository.customers import CustomerRepository
+from app.repository.page_snapshots import PageSnapshotRepository
+from app.repository.seen_items import SeenItemRepository
+from app.repository.ingestion_watermarks import IngestionWatermarkRepository
+from app.repository.discovery_cache import DiscoveryCacheRepository
+from app.repository.first_layer_results import FirstLayerResultRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
 from app.services.scraper_sources.linkedin import LinkedInService
 from app.services.scraper_sources.website import ChangelogScraper
 from app.services.scraper_sources.news import NewsService
+from app.utils.concurrency import get_scrape_limiter
+from app.scraper_config import scraper_settings
 
 
 class ScraperService:
-    def __init__(self, scraper_repo: TrackedCompanyRepository, company_update_repo: TrackedCompanyUpdateRepository, customer_repo: CustomerRepository):
+    # Sources run by scrape_data, in the order they are reported
+    SOURCES = ("linkedin", "changelog") + (("news",) if scraper_settings.SCRAPER_NEWS_ENABLED else ())
+
+    def __init__(self, scraper_repo: TrackedCompanyRepository, company_update_repo: TrackedCompanyUpdateRepository, customer_repo: CustomerRepository, page_snapshot_repo: PageSnapshotRepository, seen_item_repo: SeenItemRepository, watermark_repo: IngestionWatermarkRepository, discovery_cache_repo: DiscoveryCacheRepository, first_layer_repo: FirstLayerResultRepository, enrichment_repo: Optional[UpdateEnrichmentRepository] = None):
         self.scraper_repo = scraper_repo 
         self.company_update_repo = company_update_repo
         self.customer_repo = customer_repo
+        self.page_snapshot_repo = page_snapshot_repo
+        self.seen_item_repo = seen_item_repo
+        self.watermark_repo = watermark_repo
+        self.discovery_cache_repo = discovery_cache_repo
+        self.first_layer_repo = first_layer_repo
+        self.enrichment_repo = enrichment_repo
 
-    async def scrape_data(self, customer_uid: str) -> ScraperResponse:
+    async def scrape_data(self, customer_uid: str, on_company_done: Optional[Callable[[str, CompanyScrapeResult], None]] = None) -> ScraperResponse:
         # Print the input data for debugging
         print(f"Scraping data for customer_uid: {customer_uid}")
 
-        # Call the LinkedIn scraper function
+        # All sources and all tracked companies run concurrently, bounded by the shared limiter
+        limiter = get_scrape_limiter()
+
         print("Calling scrape_linkedin function...")
-        linkedin_scraper = LinkedInService(company_update_repo=self.company_update_repo)
-        linkedin_success = await linkedin_scraper.scrape_linkedin(customer_uid, self.scraper_repo, self.customer_repo)
+        linkedin_scraper = LinkedInService(company_update_repo=self.company_update_repo, seen_item_repo=self.seen_item_repo, watermark_repo=self.watermark_repo, discovery_cache_repo=self.discovery_cache_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
 
-        # Call the Changelog scraper function
         print("Calling scrape_changelog function...")
-        changelog_scraper = ChangelogScraper(company_update_repo=self.company_update_repo, customer_repo=self.customer_repo)
-        changelog_success = await changelog_scraper.scrape_changelog(customer_uid, self.scraper_repo)
+        changelog_scraper = ChangelogScraper(company_update_repo=self.company_update_repo, customer_repo=self.customer_repo, page_snapshot_repo=self.page_snapshot_repo, seen_item_repo=self.seen_item_repo, discovery_cache_repo=self.discovery_cache_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
+
+        source_tasks = [
+            linkedin_scraper.scrape_linkedin(customer_uid, self.scraper_repo, self.customer_repo, limiter, on_company_done),
+            changelog_scraper.scrape_changelog(customer_uid, self.scraper_repo, limiter, on_company_done),
+        ]
+
+        # News crawls every article on the shared browser pool; enabled with SCRAPER_NEWS_ENABLED
+        if "news" in self.SOURCES:
+            print("Calling scrape_news function...")
+            news_scraper = NewsService(company_update_repo=self.company_update_repo, seen_item_repo=self.seen_item_repo, watermark_repo=self.watermark_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
+            source_tasks.append(news_scraper.scrape_news(customer_uid, self.scraper_repo, self.customer_repo, limiter, on_company_done))
+
+        source_results = await asyncio.gather(*source_tasks)
 
-        # Call the News scraper function
-        # print("Calling scrape_news function...")
-        # news_scraper = NewsService(company_update_repo=self.company_update_repo)
-        # news_success = await news_scraper.scrape_news(customer_uid, self.scraper_repo, self.customer_repo)
+        for source_result in source_results:
+            failed = [company.domain for company in source_result.companies if not company.success]
+            print(f"Scraping result: {source_result.source} : {source_result.success} (failed: {failed})")
 
-        print(f"Scraping result: LinkedIn : {linkedin_success}, Changelog : {changelog_success}, News : ")
+        return ScraperResponse(
+            success=all(source_result.success for source_result in source_results),
+            sources=list(source_results),
+        )
 
-        if linkedin_success and changelog_success:
-            return ScraperResponse(success=True)
-        else :
-            return ScraperResponse(success=False)
+    async def scrape_company_source(self, customer_uid: str, source: str, tracked_company: TrackedCompany) -> int:
+        """
+        Scrape one (tracked company, source) unit and return the number of updates stored.
+        Used by the scrape job queue, which checkpoints units individually.
+        """
+        if source == "linkedin":
+            linkedin_scraper = LinkedInService(company_update_repo=self.company_update_repo, seen_item_repo=self.seen_item_repo, watermark_repo=self.watermark_repo, discovery_cache_repo=self.discovery_cache_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
+            return await linkedin_scraper.scrape_company(customer_uid, tracked_company, self.scraper_repo, self.customer_repo)
+        if source == "changelog":
+            changelog_scraper = ChangelogScraper(company_update_repo=self.company_update_repo, customer_repo=self.customer_repo, page_snapshot_repo=self.page_snapshot_repo, seen_item_repo=self.seen_item_repo, discovery_cache_repo=self.discovery_cache_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
+            return await changelog_scraper.scrape_company(customer_uid, tracked_company, self.scraper_repo)
+        if source == "news":
+            news_scraper = NewsService(company_update_repo=self.company_update_repo, seen_item_repo=self.seen_item_repo, watermark_repo=self.watermark_repo, first_layer_repo=self.first_layer_repo, enrichment_repo=self.enrichment_repo)
+            return await news_scraper.scrape_company(customer_uid, tracked_company, self.customer_repo)
+        raise ValueError(f"Unknown scrape source: {source}")
@@ -1,33 +1,45 @@
-import requests
-import http.client
-import json
-import urllib.parse
 from datetime import datetime, timedelta
-from typing import Optional
-from langchain_groq import ChatGroq
+from typing import Callable, Optional
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from app.repository.tracked_companies import TrackedCompanyRepository
 from app.repository.customers import CustomerRepository
+from app.repository.seen_items import SeenItemRepository
+from app.repository.ingestion_watermarks import IngestionWatermarkRepository
+from app.repository.discovery_cache import DiscoveryCacheRepository
+from app.repository.first_layer_results import FirstLayerResultRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
 from app.schemas.company_updates import TrackedCompanyLinkedInUpdate, TrackedCompanyUpdateCreate
+from app.schemas.scraper import CompanyScrapeResult, SourceScrapeResult
+from app.schemas.tracked_companies import TrackedCompany
 from app.repository.tracked_company_updates import TrackedCompanyUpdateRepository
-from app.services.llm_update_generator import convert_data_into_updates_llm
+from app.services.llm_update_generator import convert_batch_into_updates_llm
+from app.services.discovery_cache import DiscoveryCache
+from app.services.update_enrichment import defers_enrichment, queue_update_enrichment
+from app.utils.concurrency import ScrapeLimiter, get_scrape_limiter
+from app.utils.http_client import get_http_client
+from app.utils.item_keys import make_item_key
+from app.utils.shared_fetch import get_shared_fetch_cache
+from app.utils.llm_calls import ainvoke_chain
+from app.utils.model_routing import route_model
+from app.utils.token_budget import trim_to_budget
 from app.config import settings
+from app.scraper_config import scraper_settings
 
 class LLMService:
     def __init__(self):
-        self.llm = ChatGroq(model="llama3-70b-8192", groq_api_key=settings.GROQ_API_KEY)
         self.output_parser = JsonOutputParser()
 
-    async def invoke_llm_chain(self, prompt_template: str, input_variables: dict, format_instructions: str) -> Optional[dict]:
+    async def invoke_llm_chain(self, prompt_template: str, input_variables: dict, format_instructions: str, step: str = "url_discovery") -> Optional[dict]:
+        route = route_model(step)
         prompt_template = PromptTemplate(
             template=f"{prompt_template}\n{{format_instructions}}\n",
             input_variables=list(input_variables.keys()),
             partial_variables={"format_instructions": format_instructions},
         )
-        chain = prompt_template | self.llm | self.output_parser
+        chain = prompt_template | route.llm | self.output_parser
         try:
-            return chain.invoke(input_variables)
+            return await ainvoke_chain(chain, input_variables, route.host, config={"metadata": {"step": step}}, route=route)
         except Exception as e:
             print(f"Error invoking LLM chain: {e}")
             return None
@@ -35,34 +47,42 @@ class LLMService:
 
 class LinkedInService:
 
-    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository):
+    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository, seen_item_repo: Optional[SeenItemRepository] = None, watermark_repo: Optional[IngestionWatermarkRepository] = None, discovery_cache_repo: Optional[DiscoveryCacheRepository] = None, first_layer_repo: Optional[FirstLayerResultRepository] = None, enrichment_repo: Optional[UpdateEnrichmentRepository] = None):
         self.company_update_repo = company_update_repo
+        self.seen_item_repo = seen_item_repo
+        self.watermark_repo = watermark_repo
+        self.discovery_cache = DiscoveryCache(discovery_cache_repo)
+        self.first_layer_repo = first_layer_repo
+        self.enrichment_repo = enrichment_repo
         self.llm_service = LLMService()
 
+    async def _mark_seen(self, tracked_company_uid: str, item_key: str):
+        if self.seen_item_repo:
+            await self.seen_item_repo.mark_seen(tracked_company_uid, "linkedin", item_key)
+
     async def get_company_linkedin_url(self, domain: str) -> Optional[str]:
         """
         Get the LinkedIn company page URL using SERP API and LLM.
         """
         # Use SERP API to search for LinkedIn company page
         try:
-            conn = http.client.HTTPSConnection("real-time-web-search.p.rapidapi.com")
             headers = {
                 'x-rapidapi-key': settings.RAPID_KEY,
                 'x-rapidapi-host': "real-time-web-search.p.rapidapi.com"
             }
+            params = {
+                "q": f"{domain} company linkedin page",
+                "num": 10, "start": 0, "gl": "us", "hl": "en", "device": "desktop", "nfpr": 0,
+            }
+            res = await get_http_client().get(
+                "https://real-time-web-search.p.rapidapi.com/search-advanced", params=params, headers=headers
+            )
             
-            # Encode the search query
-            search_query = urllib.parse.quote(f"{domain} company linkedin page")
-            conn.request("GET", f"/search-advanced?q={search_query}&num=10&start=0&gl=us&hl=en&device=desktop&nfpr=0", headers=headers)
-            
-            res = conn.getresponse()
-            data = res.read()
-            
-            if res.status != 200:
-                print(f"Error fetching search results: {res.status} - {data.decode('utf-8')}")
+            if res.status_code != 200:
+                print(f"Error fetching search results: {res.status_code} - {res.text}")
                 return None
                 
-            response_data = json.loads(data.decode("utf-8"))
+            response_data = res.json()
             
             if response_data.get('status') != 'OK':
                 print(f"Search API returned error: {response_data}")
@@ -109,152 +129,203 @@ class LinkedInService:
             # Fallback to current UTC time if parsing fails
             return datetime.utcnow()
 
-    async def scrape_linkedin(self, customer_uid: str, tracked_company_repo: TrackedCompanyRepository, customer_repo: CustomerRepository):
+    async def scrape_linkedin(self, customer_uid: str, tracked_company_repo: TrackedCompanyRepository, customer_repo: CustomerRepository, limiter: Optional[ScrapeLimiter] = None, on_company_done: Optional[Callable[[str, CompanyScrapeResult], None]] = None) -> SourceScrapeResult:
         """
         Scrape LinkedIn data for all tracked companies of a given product.
-        Stops processing posts for a company when 3 consecutive posts are older than one week.
-        Uses the new LinkedIn API and stores LinkedIn URL in linkedin_username field.
+        Each tracked company runs as its own task under the scrape limiter.
         """
         print(f"Fetching tracked companies for customer_uid: {customer_uid}")
         tracked_companies = await tracked_company_repo.get_all_tracked_companies(customer_uid)
         print(f"Found {len(tracked_companies)} tracked companies.")
 
-        for tracked_company in tracked_companies:
-            print(f"Processing tracked company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
+        limiter = limiter or get_scrape_limiter()
+        result = await limiter.run_for_companies(
+            "linkedin",
+            tracked_companies,
+            lambda tracked_company: self.scrape_company(customer_uid, tracked_company, tracked_company_repo, customer_repo),
+            on_company_done,
+        )
 
-            # Fetch LinkedIn URL if not already available
-            linkedin_url = tracked_company.linkedin_username
-            
-            if linkedin_url == 'false':
-                print(f"Skipping tracked company {tracked_company.tracked_company_uid} as linkedin_username is 'false'.")
+        print("Scraping process completed.")
+        return result
+
+    async def fetch_company_posts(self, linkedin_url: str) -> list:
+        # Use LinkedIn URL to fetch posts
+        print(f"Fetching LinkedIn posts for URL: {linkedin_url}")
+        # Use the new LinkedIn API
+        headers = {
+            'x-rapidapi-key': settings.RAPID_KEY,
+            'x-rapidapi-host': "linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com"
+        }
+        res = await get_http_client().get(
+            "https://linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com/company/posts",
+            params={"company_name": linkedin_url},
+            headers=headers,
+        )
+
+        if res.status_code != 200:
+            raise Exception(f"Error fetching LinkedIn posts: {res.status_code} - {res.text}")
+
+        response_data = res.json()
+
+        if not response_data.get('success'):
+            raise Exception(f"API returned error: {response_data.get('message', 'Unknown error')}")
+
+        return response_data.get('data', {}).get('posts', [])
+
+    async def scrape_company(self, customer_uid: str, tracked_company: TrackedCompany, tracked_company_repo: TrackedCompanyRepository, customer_repo: CustomerRepository) -> int:
+        """
+        Scrape LinkedIn posts for a single tracked company.
+        Stops processing posts when 3 consecutive posts are older than one week.
+        Uses the new LinkedIn API and stores LinkedIn URL in linkedin_username field.
+        Posts already processed in an earlier run are skipped before any LLM call, and
+        ingestion stops at the per-company watermark left by the previous run.
+        New posts are collected first and classified together in batched first-layer requests.
+        Returns the number of updates stored; raises when the company could not be scraped.
+        """
+        print(f"Processing tracked company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
+
+        # Shared across customers by domain and revalidated after DISCOVERY_CACHE_TTL_DAYS; the URL
+        # stored on the company is only used while discovery finds nothing
+        linkedin_url = await self.discovery_cache.resolve(
+            tracked_company.domain, "linkedin_url", lambda: self.get_company_linkedin_url(tracked_company.domain)
+        ) or tracked_company.linkedin_username
+        if not linkedin_url:
+            print(f"Failed to fetch LinkedIn URL for tracked company {tracked_company.tracked_company_uid}.")
+            return 0
+        if linkedin_url != tracked_company.linkedin_username:
+            print(f"Fetched LinkedIn URL: {linkedin_url}")
+            await tracked_company_repo.update_tracked_company_with_linkedin_username(
+                tracked_company.tracked_company_uid,
+                TrackedCompanyLinkedInUpdate(linkedin_username=linkedin_url)
+            )
+
+        # Customers tracking the same company in this round share one fetch
+        posts = await get_shared_fetch_cache().get_or_fetch(
+            ("linkedin_posts", linkedin_url), lambda: self.fetch_company_posts(linkedin_url)
+        )
+
+        seen_keys = set()
+        if self.seen_item_repo:
+            seen_keys = await self.seen_item_repo.get_seen_keys(
+                tracked_company.tracked_company_uid,
+                [make_item_key(post.get('post_url', ''), post.get('text', '')) for post in posts]
+            )
+
+        watermark = None
+        if self.watermark_repo:
+            watermark = await self.watermark_repo.get_watermark(tracked_company.tracked_company_uid, "linkedin")
+            if watermark:
+                print(f"Ingesting LinkedIn posts newer than {watermark.last_seen_posted_at} for {tracked_company.domain}")
+
+        run_started_at = datetime.utcnow()
+        one_month_ago = run_started_at - timedelta(days=30)
+        one_week_ago = run_started_at - timedelta(days=7)
+        consecutive_old_posts = 0
+        updates_stored = 0
+        newest_posted_at, newest_cursor = None, None
+        store_failed = False
+        new_posts = []
+
+        for post in posts:
+            posted_at_info = post.get('posted_at', {})
+            posted_date_str = posted_at_info.get('date', '')
+
+            if watermark and watermark.cursor and post.get('post_url', '') == watermark.cursor:
+                print(f"Reached the last post ingested for {tracked_company.domain}. Stopping post processing.")
+                break
+
+            if not posted_date_str:
+                print(f"No posted date found for post: {post.get('text', '')[:50]}... Skipping.")
                 continue
 
-            if not linkedin_url:
-                print(f"No LinkedIn URL found for tracked company {tracked_company.tracked_company_uid}. Fetching from search...")
-                try:
-                    linkedin_url = await self.get_company_linkedin_url(tracked_company.domain)
-                    if linkedin_url and linkedin_url != 'false':
-                        print(f"Fetched LinkedIn URL: {linkedin_url}")
-                        await tracked_company_repo.update_tracked_company_with_linkedin_username(
-                            tracked_company.tracked_company_uid,
-                            TrackedCompanyLinkedInUpdate(linkedin_username=linkedin_url)
-                        )
-                    else:
-                        print(f"Failed to fetch LinkedIn URL for tracked company {tracked_company.tracked_company_uid}.")
-                        # Store 'false' to avoid repeated attempts
-                        await tracked_company_repo.update_tracked_company_with_linkedin_username(
-                            tracked_company.tracked_company_uid,
-                            TrackedCompanyLinkedInUpdate(linkedin_username='false')
-                        )
-                        continue
-                except Exception as e:
-                    print(f"Error fetching LinkedIn URL: {e}")
-                    continue
-
-            # Use LinkedIn URL to fetch posts
-            if linkedin_url and linkedin_url != 'false':
-                print(f"Fetching LinkedIn posts for URL: {linkedin_url}")
-                try:
-                    # Use the new LinkedIn API
-                    conn = http.client.HTTPSConnection("linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com")
-                    headers = {
-                        'x-rapidapi-key': settings.RAPID_KEY,
-                        'x-rapidapi-host': "linkedin-scraper-api-real-time-fast-affordable.p.rapidapi.com"
-                    }
-                    
-                    # URL encode the LinkedIn URL
-                    encoded_url = urllib.parse.quote(linkedin_url, safe='')
-                    conn.request("GET", f"/company/posts?company_name={encoded_url}", headers=headers)
-                    
-                    res = conn.getresponse()
-                    data = res.read()
-                    
-                    if res.status != 200:
-                        print(f"Error fetching LinkedIn posts: {res.status} - {data.decode('utf-8')}")
-                        continue
+            post_timestamp = self._parse_posted_date(posted_date_str)
+
+            # Check if post is older than one week or already behind the watermark
+            if post_timestamp < one_week_ago or (watermark and post_timestamp <= watermark.last_seen_posted_at):
+                consecutive_old_posts += 1
+                print(f"Old post detected: {post.get('text', '')[:50]}... (Posted: {post_timestamp})")
+                if consecutive_old_posts >= 3:
+                    print(f"Found 3 consecutive old posts for {tracked_company.domain}. Stopping post processing.")
+                    break
+                continue  # Skip processing this post
 
-                    response_data = json.loads(data.decode("utf-8"))
-                    
-                    if not response_data.get('success'):
-                        print(f"API returned error: {response_data.get('message', 'Unknown error')}")
+            # Reset counter for recent posts
+            consecutive_old_posts = 0
+
+            # Unparseable dates fall back to utcnow(), which is after run_started_at; keep them out of the watermark
+            if post_timestamp <= run_started_at and (newest_posted_at is None or post_timestamp > newest_posted_at):
+                newest_posted_at, newest_cursor = post_timestamp, post.get('post_url', '')
+
+            # Process posts within one month
+            if post_timestamp >= one_month_ago:
+                post_text = post.get('text', '')
+                post_url = post.get('post_url', '')
+
+                if post_text:
+                    item_key = make_item_key(post_url, post_text)
+                    if item_key in seen_keys:
+                        print(f"Skipping post already processed: {post_text[:50]}...")
                         continue
+                    new_posts.append((post_text, post_url, post_timestamp, item_key))
 
-                    posts = response_data.get('data', {}).get('posts', [])
-                    
-                    one_month_ago = datetime.utcnow() - timedelta(days=30)
-                    one_week_ago = datetime.utcnow() - timedelta(days=7)
-                    consecutive_old_posts = 0
-
-                    for post in posts:
-                        posted_at_info = post.get('posted_at', {})
-                        posted_date_str = posted_at_info.get('date', '')
-                        
-                        if not posted_date_str:
-                            print(f"No posted date found for post: {post.get('text', '')[:50]}... Skipping.")
-                            continue
-
-                        post_timestamp = self._parse_posted_date(posted_date_str)
-
-                        # Check if post is older than one week
-                        if post_timestamp < one_week_ago:
-                            consecutive_old_posts += 1
-                            print(f"Old post detected: {post.get('text', '')[:50]}... (Posted: {post_timestamp})")
-                            if consecutive_old_posts >= 3:
-                                print(f"Found 3 consecutive posts older than one week for {tracked_company.domain}. Stopping post processing.")
-                                break
-                            continue  # Skip processing this post
-
-                        # Reset counter for recent posts
-                        consecutive_old_posts = 0
-
-                        # Process posts within one month
-                        if post_timestamp >= one_month_ago:
-                            post_text = post.get('text', '')
-                            post_url = post.get('post_url', '')
-                            
-                            if post_text:
-                                update = await convert_data_into_updates_llm(
-                                    post_text,
-                                    source_type="Company's LinkedIn Page",
-                                    company_type=tracked_company.type,
-                                    company=tracked_company.name,
-                                    tracked_company_uid=tracked_company.tracked_company_uid,
-                                    customer_repo=customer_repo,
-                                    customer_uid=customer_uid
-                                )
-
-                                if update.title == "Not useful for product manager":
-                                    print("Skipping post: Not useful for product manager")
-                                    continue
-
-                                company_update_data = TrackedCompanyUpdateCreate(
-                                    title=update.title,
-                                    description=update.description,
-                                    competitor_name=tracked_company.name,
-                                    source_url=post_url,
-                                    source_type="Company's LinkedIn Page",
-                                    competitor_domain=tracked_company.domain,
-                                    tracked_company_uid=tracked_company.tracked_company_uid,
-                                    customer_uid=customer_uid,
-                                    source="tracked_company's LinkedIn Page",
-                                    posted_at=post_timestamp,
-                                    update_category=update.update_category,
-                                    update_type=update.update_type,
-                                    action_point=update.action_point
-                                )
-                                print(company_update_data)
-
-                                try:
-                                    await self.company_update_repo.create_company_update(company_update=company_update_data)
-                                    print(f"Successfully stored update for post: {post_text[:50]}...")
-                                except Exception as e:
-                                    print(f"Failed to store update. Error: {e}")
-
-                except Exception as e:
-                    print(f"Error processing LinkedIn posts for {tracked_company.domain}: {e}")
-                    continue
-
-            print(f"Processing complete for tracked company: {tracked_company.domain}")
+        # First layer for all new posts in batched requests; the customer-specific layers run per post
+        updates = await convert_batch_into_updates_llm(
+            [trim_to_budget(post_text, scraper_settings.LINKEDIN_POST_MAX_TOKENS, "linkedin_post") for post_text, _, _, _ in new_posts],
+            source_type="Company's LinkedIn Page",
+            company_type=tracked_company.type,
+            company=tracked_company.name,
+            tracked_company_uid=tracked_company.tracked_company_uid,
+            customer_repo=customer_repo,
+            customer_uid=customer_uid,
+            domain=tracked_company.domain,
+            first_layer_repo=self.first_layer_repo,
+            defer_enrichment=defers_enrichment(self.enrichment_repo)
+        )
 
-        print("Scraping process completed.")
-        return True
\ No newline at end of file
+        for (post_text, post_url, post_timestamp, item_key), update in zip(new_posts, updates):
+            if update.title == "Not useful for product manager":
+                print("Skipping post: Not useful for product manager")
+                await self._mark_seen(tracked_company.tracked_company_uid, item_key)
+                continue
+
+            company_update_data = TrackedCompanyUpdateCreate(
+                title=update.title,
+                description=update.description,
+                competitor_name=tracked_company.name,
+                source_url=post_url,
+                source_type="Company's LinkedIn Page",
+                competitor_domain=tracked_company.domain,
+                tracked_company_uid=tracked_company.tracked_company_uid,
+                customer_uid=customer_uid,
+                source="tracked_company's LinkedIn Page",
+                posted_at=post_timestamp,
+                update_category=update.update_category,
+                update_type=update.update_type,
+                action_point=update.action_point,
+                item_key=item_key
+            )
+            print(company_update_data)
+
+            try:
+                update_id = await self.company_update_repo.create_company_update(company_update=company_update_data)
+                if update_id is None:
+                    print(f"Update already stored for post: {post_text[:50]}...")
+                else:
+                    updates_stored += 1
+                    print(f"Successfully stored update for post: {post_text[:50]}...")
+                    await queue_update_enrichment(
+                        self.enrichment_repo, update_id, update, post_text, "Company's LinkedIn Page",
+                        tracked_company.name, tracked_company.type, tracked_company.tracked_company_uid, customer_uid
+                    )
+                await self._mark_seen(tracked_company.tracked_company_uid, item_key)
+            except Exception as e:
+                store_failed = True
+                print(f"Failed to store update. Error: {e}")
+
+        # Only move the watermark when every post up to it was handled; failed posts are retried next run
+        if self.watermark_repo and newest_posted_at and not store_failed:
+            await self.watermark_repo.save_watermark(tracked_company.tracked_company_uid, "linkedin", newest_posted_at, newest_cursor)
+
+        print(f"Processing complete for tracked company: {tracked_company.domain}")
+        return updates_stored
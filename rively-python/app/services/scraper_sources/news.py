@@ -1,45 +1,55 @@
-import requests
+import asyncio
 from datetime import datetime, timedelta
-from typing import List
+from typing import Callable, Optional
 from app.repository.tracked_companies import TrackedCompanyRepository
 from app.repository.customers import CustomerRepository
+from app.repository.seen_items import SeenItemRepository
+from app.repository.ingestion_watermarks import IngestionWatermarkRepository
+from app.repository.first_layer_results import FirstLayerResultRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
 from app.schemas.company_updates import TrackedCompanyUpdateCreate
+from app.schemas.scraper import CompanyScrapeResult, SourceScrapeResult
+from app.schemas.tracked_companies import TrackedCompany
 from app.repository.tracked_company_updates import TrackedCompanyUpdateRepository
-from app.services.llm_update_generator import convert_data_into_updates_llm
+from app.services.llm_update_generator import convert_batch_into_updates_llm
+from app.services.update_enrichment import defers_enrichment, queue_update_enrichment
+from app.utils.browser_pool import get_crawler_pool
+from app.utils.concurrency import ScrapeLimiter, get_scrape_limiter
+from app.utils.http_client import get_http_client
+from app.utils.item_keys import make_item_key
+from app.utils.shared_fetch import get_shared_fetch_cache
+from app.utils.token_budget import trim_to_budget
 from app.config import settings
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CrawlResult, BrowserConfig
+from app.scraper_config import scraper_settings
 
 class NewsService:
 
-    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository):
+    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository, seen_item_repo: Optional[SeenItemRepository] = None, watermark_repo: Optional[IngestionWatermarkRepository] = None, first_layer_repo: Optional[FirstLayerResultRepository] = None, enrichment_repo: Optional[UpdateEnrichmentRepository] = None):
         self.company_update_repo = company_update_repo
+        self.seen_item_repo = seen_item_repo
+        self.watermark_repo = watermark_repo
+        self.first_layer_repo = first_layer_repo
+        self.enrichment_repo = enrichment_repo
+
+    async def _mark_seen(self, tracked_company_uid: str, item_key: str):
+        if self.seen_item_repo:
+            await self.seen_item_repo.mark_seen(tracked_company_uid, "news", item_key)
 
     async def _scrape_article_content(self, article_url: str) -> str:
         """
-        Scrape the full content from a news article URL using crawl4ai
+        Scrape the full content from a news article URL on a pooled crawl4ai browser
         Returns the article text content or empty string if scraping fails
         """
         try:
-            async with AsyncWebCrawler(config=BrowserConfig(
-                viewport_height=800,
-                viewport_width=1200,
-                headless=True,
-                verbose=False,
-            )) as crawler:
-                results: List[CrawlResult] = await crawler.arun(
-                    url=article_url,
-                    config=CrawlerRunConfig(cache_mode="bypass")
-                )
-                
-                for result in results:
-                    if result.success and result.markdown:
-                        # Return the markdown content which contains the article text
-                        content = result.markdown.raw_markdown
-                        print(f"Successfully scraped content from {article_url} ({len(content)} chars)")
-                        return content[:5000]  # Limit to 5000 chars to avoid token limits
-                    else:
-                        print(f"Failed to scrape content from {article_url}")
-                        return ""
+            # The same article is often found for several customers' tracked companies
+            content = await get_shared_fetch_cache().get_or_fetch(
+                ("news_article", article_url), lambda: get_crawler_pool().fetch_markdown(article_url)
+            )
+            if content:
+                print(f"Successfully scraped content from {article_url} ({len(content)} chars)")
+                return trim_to_budget(content, scraper_settings.NEWS_ARTICLE_MAX_TOKENS, "news_article")
+            print(f"Failed to scrape content from {article_url}")
+            return ""
         except Exception as e:
             print(f"Error scraping article content from {article_url}: {e}")
             return ""
@@ -60,109 +70,186 @@ class NewsService:
             # Fallback to current UTC time if parsing fails
             return datetime.utcnow()
 
-    async def scrape_news(self, customer_uid: str, tracked_company_repo: TrackedCompanyRepository, customer_repo: CustomerRepository):
+    async def scrape_news(self, customer_uid: str, tracked_company_repo: TrackedCompanyRepository, customer_repo: CustomerRepository, limiter: Optional[ScrapeLimiter] = None, on_company_done: Optional[Callable[[str, CompanyScrapeResult], None]] = None) -> SourceScrapeResult:
         """
         Scrape Google News data for all tracked companies of a given customer.
-        Stops processing articles for a company when 3 consecutive articles are older than one month.
-        Converts timestamp to database timestamp format before saving.
+        Each tracked company runs as its own task under the scrape limiter.
         """
         print(f"Fetching tracked companies for customer_uid: {customer_uid}")
         tracked_companies = await tracked_company_repo.get_all_tracked_companies(customer_uid)
         print(f"Found {len(tracked_companies)} tracked companies.")
 
-        for tracked_company in tracked_companies:
-            print(f"Processing tracked company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
+        limiter = limiter or get_scrape_limiter()
+        result = await limiter.run_for_companies(
+            "news",
+            tracked_companies,
+            lambda tracked_company: self.scrape_company(customer_uid, tracked_company, customer_repo),
+            on_company_done,
+        )
 
-            # Fetch Google News articles
-            url = "https://google-news13.p.rapidapi.com/search"
-            headers = {
-                "x-rapidapi-key": settings.RAPID_KEY,
-                "x-rapidapi-host": "google-news13.p.rapidapi.com"
-            }
-            querystring = {"keyword": tracked_company.domain, "lr": "en-US"}
+        print("News scraping process completed.")
+        return result
 
-            try:
-                response = requests.get(url, headers=headers, params=querystring)
-                if response.status_code != 200:
-                    print(f"Error fetching news articles: {response.status_code} - {response.text}")
-                    continue
-
-                data = response.json().get('items', [])
-                three_months_ago = datetime.utcnow() - timedelta(days=100)
-                consecutive_old_articles = 0
-
-                for article in data:
-                    timestamp_str = article.get('timestamp', '')
-                    if not timestamp_str:
-                        print(f"No timestamp found for article: {article.get('title', '')[:50]}... Skipping.")
-                        continue
-
-                    article_timestamp = self._parse_timestamp(timestamp_str)
-
-                    # Check if article is older than one month
-                    if article_timestamp < three_months_ago:
-                        consecutive_old_articles += 1
-                        print(f"Old article detected: {article.get('title', '')[:50]}... (Posted: {article_timestamp})")
-                        if consecutive_old_articles >= 3:
-                            print(f"Found 3 consecutive articles older than one month for {tracked_company.domain}. Stopping article processing.")
-                            break
-                        continue  # Skip processing this article
-
-                    # Reset counter for recent articles
-                    consecutive_old_articles = 0
-
-                    # Process articles within one month
-                    article_snippet = article.get('snippet', '')
-                    article_url = article.get('newsUrl', '')
-                    article_title = article.get('title', '')
-                    
-                    if article_url:
-                        print(f"Scraping full content from: {article_url}")
-                        # Scrape the full article content instead of using just the snippet
-                        article_content = await self._scrape_article_content(article_url)
-                        
-                        # If scraping fails, fall back to snippet
-                        if not article_content and article_snippet:
-                            article_content = article_snippet
-                            print(f"Falling back to snippet for {article_url}")
-                        
-                        if article_content:
-                            update = await convert_data_into_updates_llm(
-                                article_content,  # Use full scraped content instead of snippet
-                                source_type="Google News",
-                                company_type=tracked_company.type,
-                                company=tracked_company.name,
-                                tracked_company_uid=tracked_company.tracked_company_uid,
-                                customer_repo=customer_repo,
-                                customer_uid=customer_uid
-                            )
-
-                            company_update_data = TrackedCompanyUpdateCreate(
-                                title=article_title,
-                                description=update.description,
-                                source_type="Google News",
-                                source_url=article_url,
-                                posted_at=article_timestamp,  # Use parsed timestamp
-                                update_category=update.update_category,
-                                update_type=update.update_type,
-                                tracked_company_uid=tracked_company.tracked_company_uid,
-                                action_point=update.action_point
-                            )
-                            print(company_update_data)
-
-                            try:
-                                await self.company_update_repo.create_company_update(company_update=company_update_data)
-                                print(f"Successfully stored update for article: {article_title[:50]}...")
-                            except Exception as e:
-                                print(f"Failed to store update. Error: {e}")
-                        else:
-                            print(f"No content available for article: {article_title[:50]}... Skipping.")
-
-                print(f"Processing complete for tracked company: {tracked_company.domain}")
+    async def scrape_company(self, customer_uid: str, tracked_company: TrackedCompany, customer_repo: CustomerRepository) -> int:
+        """
+        Scrape Google News articles for a single tracked company.
+        Stops processing articles when 3 consecutive articles are older than one month.
+        Converts timestamp to database timestamp format before saving.
+        Articles already processed in an earlier run are skipped before they are crawled, as are
+        articles posted no later than the per-company watermark left by the previous run.
+        The remaining articles are crawled concurrently on the shared browser pool and
+        classified together in batched first-layer requests.
+        Returns the number of updates stored; raises when the company could not be scraped.
+        """
+        print(f"Processing tracked company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
+
+        # Fetch Google News articles
+        url = "https://google-news13.p.rapidapi.com/search"
+        headers = {
+            "x-rapidapi-key": settings.RAPID_KEY,
+            "x-rapidapi-host": "google-news13.p.rapidapi.com"
+        }
+        querystring = {"keyword": tracked_company.domain, "lr": "en-US"}
+
+        response = await get_http_client().get(url, headers=headers, params=querystring)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching news articles: {response.status_code} - {response.text}")
+
+        data = response.json().get('items', [])
+
+        seen_keys = set()
+        if self.seen_item_repo:
+            seen_keys = await self.seen_item_repo.get_seen_keys(
+                tracked_company.tracked_company_uid,
+                [make_item_key(article.get('newsUrl', ''), article.get('snippet', '')) for article in data]
+            )
+
+        watermark = None
+        if self.watermark_repo:
+            watermark = await self.watermark_repo.get_watermark(tracked_company.tracked_company_uid, "news")
+            if watermark:
+                print(f"Ingesting news articles newer than {watermark.last_seen_posted_at} for {tracked_company.domain}")
+
+        run_started_at = datetime.utcnow()
+        three_months_ago = run_started_at - timedelta(days=100)
+        consecutive_old_articles = 0
+        updates_stored = 0
+        newest_posted_at, newest_cursor = None, None
+        store_failed = False
+        new_articles = []
+
+        def advance_watermark(article_timestamp: datetime, article_url: str) -> None:
+            # Unparseable timestamps fall back to utcnow(), which is after run_started_at; keep them out of the watermark
+            nonlocal newest_posted_at, newest_cursor
+            if article_timestamp <= run_started_at and (newest_posted_at is None or article_timestamp > newest_posted_at):
+                newest_posted_at, newest_cursor = article_timestamp, article_url
+
+        # Results are ordered by relevance, not date, so every article is checked against the watermark
+        for article in data:
+            timestamp_str = article.get('timestamp', '')
+            if not timestamp_str:
+                print(f"No timestamp found for article: {article.get('title', '')[:50]}... Skipping.")
+                continue
 
-            except Exception as e:
-                print(f"Error processing news for {tracked_company.domain}: {e}")
+            article_timestamp = self._parse_timestamp(timestamp_str)
+
+            if watermark and article_timestamp <= watermark.last_seen_posted_at:
+                print(f"Article already behind the watermark: {article.get('title', '')[:50]}... (Posted: {article_timestamp})")
                 continue
 
-        print("News scraping process completed.")
-        return True
\ No newline at end of file
+            # Check if article is outside the window
+            if article_timestamp < three_months_ago:
+                consecutive_old_articles += 1
+                print(f"Old article detected: {article.get('title', '')[:50]}... (Posted: {article_timestamp})")
+                if consecutive_old_articles >= 3:
+                    print(f"Found 3 consecutive articles older than one month for {tracked_company.domain}. Stopping article processing.")
+                    break
+                continue  # Skip processing this article
+
+            # Reset counter for recent articles
+            consecutive_old_articles = 0
+
+            item_key = make_item_key(article.get('newsUrl', ''), article.get('snippet', ''))
+            if item_key in seen_keys:
+                print(f"Skipping article already processed: {article.get('title', '')[:50]}...")
+                advance_watermark(article_timestamp, article.get('newsUrl', ''))
+                continue
+
+            if article.get('newsUrl', ''):
+                new_articles.append((article, article_timestamp, item_key))
+
+        # Scrape the full article content instead of using just the snippet; the pool bounds how many run at once
+        print(f"Scraping full content of {len(new_articles)} articles for {tracked_company.domain}")
+        article_contents = await asyncio.gather(
+            *(self._scrape_article_content(article.get('newsUrl', '')) for article, _, _ in new_articles)
+        )
+
+        # If scraping fails, fall back to snippet; articles with neither are skipped
+        analysable = []
+        for (article, article_timestamp, item_key), article_content in zip(new_articles, article_contents):
+            if not article_content and article.get('snippet', ''):
+                article_content = article.get('snippet', '')
+                print(f"Falling back to snippet for {article.get('newsUrl', '')}")
+            if article_content:
+                analysable.append((article, article_timestamp, item_key, article_content))
+            else:
+                # Not marked seen, so keep the watermark behind it and retry next run
+                store_failed = True
+                print(f"No content available for article: {article.get('title', '')[:50]}... Skipping.")
+
+        # First layer for all articles in batched requests (full scraped content instead of snippet)
+        updates = await convert_batch_into_updates_llm(
+            [article_content for _, _, _, article_content in analysable],
+            source_type="Google News",
+            company_type=tracked_company.type,
+            company=tracked_company.name,
+            tracked_company_uid=tracked_company.tracked_company_uid,
+            customer_repo=customer_repo,
+            customer_uid=customer_uid,
+            domain=tracked_company.domain,
+            first_layer_repo=self.first_layer_repo,
+            defer_enrichment=defers_enrichment(self.enrichment_repo)
+        )
+
+        # Store articles in feed order
+        for (article, article_timestamp, item_key, article_content), update in zip(analysable, updates):
+            article_url = article.get('newsUrl', '')
+            article_title = article.get('title', '')
+
+            company_update_data = TrackedCompanyUpdateCreate(
+                title=article_title,
+                description=update.description,
+                source_type="Google News",
+                source_url=article_url,
+                posted_at=article_timestamp,  # Use parsed timestamp
+                update_category=update.update_category,
+                update_type=update.update_type,
+                tracked_company_uid=tracked_company.tracked_company_uid,
+                action_point=update.action_point,
+                item_key=item_key
+            )
+            print(company_update_data)
+
+            try:
+                update_id = await self.company_update_repo.create_company_update(company_update=company_update_data)
+                if update_id is None:
+                    print(f"Update already stored for article: {article_title[:50]}...")
+                else:
+                    updates_stored += 1
+                    print(f"Successfully stored update for article: {article_title[:50]}...")
+                    await queue_update_enrichment(
+                        self.enrichment_repo, update_id, update, article_content, "Google News",
+                        tracked_company.name, tracked_company.type, tracked_company.tracked_company_uid, customer_uid
+                    )
+                await self._mark_seen(tracked_company.tracked_company_uid, item_key)
+                advance_watermark(article_timestamp, article_url)
+            except Exception as e:
+                store_failed = True
+                print(f"Failed to store update. Error: {e}")
+
+        # Only move the watermark when every article up to it was handled; failed articles are retried next run
+        if self.watermark_repo and newest_posted_at and not store_failed:
+            await self.watermark_repo.save_watermark(tracked_company.tracked_company_uid, "news", newest_posted_at, newest_cursor)
+
+        print(f"Processing complete for tracked company: {tracked_company.domain}")
+        return updates_stored
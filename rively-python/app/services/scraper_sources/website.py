@@ -1,44 +1,67 @@
-import requests
-import http.client
-import json
-import urllib.parse
-from typing import Optional
-from bs4 import BeautifulSoup
+from typing import Callable, List, Optional, Tuple
+import httpx
 import datetime
-from urllib.parse import urljoin
-from langchain_groq import ChatGroq
+import difflib
+import hashlib
+import re
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from app.repository.tracked_companies import TrackedCompanyRepository
+from app.repository.page_snapshots import PageSnapshotRepository
+from app.repository.seen_items import SeenItemRepository
+from app.repository.discovery_cache import DiscoveryCacheRepository
+from app.repository.first_layer_results import FirstLayerResultRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
 from app.schemas.company_updates import TrackedCompanyLinkedInUpdate, TrackedCompanyUpdateCreate
+from app.schemas.page_snapshots import PageSnapshot
+from app.schemas.scraper import CompanyScrapeResult, SourceScrapeResult
+from app.schemas.tracked_companies import TrackedCompany
 from app.repository.tracked_company_updates import TrackedCompanyUpdateRepository
-from app.services.llm_update_generator import convert_data_into_updates_llm
+from app.services.llm_update_generator import convert_batch_into_updates_llm
+from app.services.discovery_cache import DiscoveryCache
+from app.services.update_enrichment import defers_enrichment, queue_update_enrichment
+from app.utils.concurrency import ScrapeLimiter, get_scrape_limiter
+from app.utils.http_client import get_http_client
+from app.utils.changelog_sections import changed_sections, sections_since, split_dated_sections
+from app.utils.feeds import FeedEntry, advertised_feed_urls, feed_kind, guessed_feed_urls, is_under, parse_feed, sitemap_url
+from app.utils.item_keys import make_item_key
+from app.utils.shared_fetch import get_shared_fetch_cache
+from app.utils.text_extraction import extract_text_fragments_async
+from app.utils.llm_calls import ainvoke_chain
+from app.utils.model_routing import route_model
+from app.utils.token_budget import trim_to_budget
 from app.config import settings
+from app.scraper_config import scraper_settings
 
 
 class LLMService:
     def __init__(self):
-        self.llm = ChatGroq(model="llama3-70b-8192", groq_api_key=settings.GROQ_API_KEY)
         self.output_parser = JsonOutputParser()
 
-    async def invoke_llm_chain(self, prompt_template: str, input_variables: dict, format_instructions: str) -> Optional[dict]:
+    async def invoke_llm_chain(self, prompt_template: str, input_variables: dict, format_instructions: str, step: str = "url_discovery") -> Optional[dict]:
+        route = route_model(step)
         prompt_template = PromptTemplate(
             template=f"{prompt_template}\n{{format_instructions}}\n",
             input_variables=list(input_variables.keys()),
             partial_variables={"format_instructions": format_instructions},
         )
-        chain = prompt_template | self.llm | self.output_parser
+        chain = prompt_template | route.llm | self.output_parser
         try:
-            return chain.invoke(input_variables)
+            return await ainvoke_chain(chain, input_variables, route.host, config={"metadata": {"step": step}}, route=route)
         except Exception as e:
             print(f"Error invoking LLM chain: {e}")
             return None
 
 
 class ChangelogScraper:
-    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository, customer_repo):
+    def __init__(self, company_update_repo: TrackedCompanyUpdateRepository, customer_repo, page_snapshot_repo: Optional[PageSnapshotRepository] = None, seen_item_repo: Optional[SeenItemRepository] = None, discovery_cache_repo: Optional[DiscoveryCacheRepository] = None, first_layer_repo: Optional[FirstLayerResultRepository] = None, enrichment_repo: Optional[UpdateEnrichmentRepository] = None):
         self.company_update_repo = company_update_repo
         self.customer_repo = customer_repo
+        self.page_snapshot_repo = page_snapshot_repo
+        self.seen_item_repo = seen_item_repo
+        self.discovery_cache = DiscoveryCache(discovery_cache_repo)
+        self.first_layer_repo = first_layer_repo
+        self.enrichment_repo = enrichment_repo
         self.llm_service = LLMService()
 
     async def get_company_changelogs_url(self, domain: str) -> Optional[str]:
@@ -47,24 +70,23 @@ class ChangelogScraper:
         """
         # Use SERP API to search for changelog page
         try:
-            conn = http.client.HTTPSConnection("real-time-web-search.p.rapidapi.com")
             headers = {
                 'x-rapidapi-key': settings.RAPID_KEY,
                 'x-rapidapi-host': "real-time-web-search.p.rapidapi.com"
             }
+            params = {
+                "q": f"changelogs page of {domain} saas tool 2025",
+                "num": 10, "start": 0, "gl": "us", "hl": "en", "device": "desktop", "nfpr": 0,
+            }
+            res = await get_http_client().get(
+                "https://real-time-web-search.p.rapidapi.com/search-advanced", params=params, headers=headers
+            )
             
-            # Encode the search query
-            search_query = urllib.parse.quote(f"changelogs page of {domain} saas tool 2025")
-            conn.request("GET", f"/search-advanced?q={search_query}&num=10&start=0&gl=us&hl=en&device=desktop&nfpr=0", headers=headers)
-            
-            res = conn.getresponse()
-            data = res.read()
-            
-            if res.status != 200:
-                print(f"Error fetching search results: {res.status} - {data.decode('utf-8')}")
+            if res.status_code != 200:
+                print(f"Error fetching search results: {res.status_code} - {res.text}")
                 return None
                 
-            response_data = json.loads(data.decode("utf-8"))
+            response_data = res.json()
             
             if response_data.get('status') != 'OK':
                 print(f"Search API returned error: {response_data}")
@@ -96,158 +118,468 @@ class ChangelogScraper:
         )
         return response.get("url") if response else None
 
-    def extract_text_with_links(self, soup, base_url: str) -> str:
-        text_with_links = []
-        for element in soup.descendants:
-            if element.name == 'a':
-                link = element.get('href', '')
-                link_text = element.get_text(strip=True)
-                if link and link_text:
-                    absolute_link = urljoin(base_url, link)
-                    text_with_links.append(f"[{link_text}]({absolute_link})")
-            elif isinstance(element, str):
-                text_with_links.append(element.strip())
-        return ' '.join(text_with_links)
-
-    async def scrape_changelog_page(self, url: str) -> Optional[dict]:
-        response = requests.get(url)
+    def diff_page_fragments(self, previous_fragments: List[str], fragments: List[str]) -> str:
+        """
+        Return only the fragments added since the previous snapshot, each run preceded by a few
+        unchanged fragments of context so an entry keeps its date heading.
+        """
+        context = scraper_settings.CHANGELOG_DIFF_CONTEXT_FRAGMENTS
+        matcher = difflib.SequenceMatcher(None, previous_fragments, fragments, autojunk=False)
+        added = []
+        last_emitted = 0
+        for tag, _, _, j1, j2 in matcher.get_opcodes():
+            if tag not in ("insert", "replace"):
+                continue
+            start = max(j1 - context, last_emitted)
+            if added and start > last_emitted:
+                added.append("...")
+            added.extend(fragments[start:j2])
+            last_emitted = j2
+        return ' '.join(added)
+
+    def hash_page_text(self, text: str) -> str:
+        """Hash the page text with whitespace collapsed, so re-indented markup does not count as a change."""
+        normalised = re.sub(r"\s+", " ", text).strip().lower()
+        return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+    async def conditional_get(self, tracked_company_uid: str, url: str) -> Tuple[httpx.Response, Optional[PageSnapshot]]:
+        """
+        GET `url` with If-None-Match / If-Modified-Since from its last snapshot; returns (response, previous snapshot).
+        A full 200 response fetched for another customer within SHARED_FETCH_TTL_SECONDS is reused instead;
+        304s are not shared since they are relative to each company's own snapshot.
+        """
+        previous = None
+        headers = {}
+        if self.page_snapshot_repo:
+            previous = await self.page_snapshot_repo.get_snapshot(tracked_company_uid, url)
+
+        shared = get_shared_fetch_cache().get(("changelog_page", url))
+        if shared is not None:
+            print(f"Reusing changelog page fetched for another customer: {url}")
+            return shared, previous
+        if previous:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        response = await get_http_client().get(url, headers=headers)
+        if response.status_code == 200:
+            get_shared_fetch_cache().put(("changelog_page", url), response)
+        return response, previous
+
+    async def fetch_changelog_page(self, tracked_company_uid: str, url: str) -> Tuple[Optional[str], Optional[PageSnapshot], List[str]]:
+        """
+        Fetch the changelog page with a conditional GET against the last stored snapshot.
+        Returns (new_text, snapshot, previous_fragments): new_text holds only what was added since
+        the last snapshot, or None when the page has not changed; previous_fragments is the last
+        snapshot's text ([] on the first fetch). The snapshot is not saved here so that a failed
+        LLM run is retried on the next scrape.
+        """
+        response, previous = await self.conditional_get(tracked_company_uid, url)
+        previous_fragments = previous.page_text.split('\n') if previous and previous.page_text else []
+        if response.status_code == 304:
+            print(f"Changelog page not modified (304): {url}")
+            return None, previous, previous_fragments
         if response.status_code != 200:
             raise Exception(f"Failed to retrieve the webpage. Status code: {response.status_code}")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        for element in soup(['script', 'style', 'meta', 'link']):
-            element.decompose()
+        fragments = await extract_text_fragments_async(response.content, url)
+        snapshot = PageSnapshot(
+            tracked_company_uid=tracked_company_uid,
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=self.hash_page_text(' '.join(fragments)),
+            page_text='\n'.join(fragments),
+        )
+
+        if previous and previous.content_hash == snapshot.content_hash:
+            print(f"Changelog page content unchanged: {url}")
+            # Keep the fresh validators so the next run can get a 304
+            await self.page_snapshot_repo.save_snapshot(snapshot)
+            return None, snapshot, previous_fragments
 
-        text_with_links = self.extract_text_with_links(soup, url)
-        half_length = len(text_with_links) // 2
-        first_half = text_with_links[:half_length]
+        if previous_fragments:
+            new_text = self.diff_page_fragments(previous_fragments, fragments)
+            if not new_text:
+                print(f"Changelog page only lost content, nothing new: {url}")
+                await self.page_snapshot_repo.save_snapshot(snapshot)
+                return None, snapshot, previous_fragments
+            print(f"Changelog diff for {url}: {len(new_text)} of {len(snapshot.page_text)} chars are new")
+        else:
+            # First fetch of this page: newest entries are usually at the top
+            new_text = ' '.join(fragments)
 
+        return trim_to_budget(new_text, scraper_settings.CHANGELOG_MAX_PROMPT_TOKENS, "changelog_page"), snapshot, previous_fragments
+
+    async def scrape_changelog_page(self, url: str, new_text: str) -> Optional[dict]:
         with open("app/services/prompts/changelogs_1st_layer_prompt.txt", "r") as file:
             base_prompt = file.read()
 
         return await self.llm_service.invoke_llm_chain(
             base_prompt,
-            {"scraped_text": first_half, "one_week_ago": datetime.datetime.now() - datetime.timedelta(days=7)},
-            self.llm_service.output_parser.get_format_instructions()
+            {"scraped_text": new_text, "one_week_ago": (datetime.datetime.now() - datetime.timedelta(days=scraper_settings.CHANGELOG_WINDOW_DAYS)).date()},
+            self.llm_service.output_parser.get_format_instructions(),
+            step="changelog_extraction"
         )
 
     async def scrape_detailed_changelog(self, detailed_link: str) -> Optional[dict]:
-        response = requests.get(detailed_link)
+        response = await get_http_client().get(detailed_link)
         if response.status_code != 200:
             raise Exception(f"Failed to retrieve the webpage. Status code: {response.status_code}")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        for element in soup(['script', 'style', 'meta', 'link']):
-            element.decompose()
-
-        text_with_links = self.extract_text_with_links(soup, detailed_link)
-        half_length = len(text_with_links) // 2
-        first_half = text_with_links[:half_length]
+        text_with_links = ' '.join(await extract_text_fragments_async(response.content, detailed_link))
+        detail_text = trim_to_budget(text_with_links, scraper_settings.CHANGELOG_DETAIL_MAX_TOKENS, "changelog_detail")
 
         with open("app/services/prompts/changelogs_2nd_layer_prompt.txt", "r") as file:
             base_prompt = file.read()
 
         return await self.llm_service.invoke_llm_chain(
             base_prompt,
-            {"scraped_text": first_half, "one_week_ago": datetime.datetime.now() - datetime.timedelta(days=7)},
-            self.llm_service.output_parser.get_format_instructions()
+            {"scraped_text": detail_text, "one_week_ago": (datetime.datetime.now() - datetime.timedelta(days=scraper_settings.CHANGELOG_WINDOW_DAYS)).date()},
+            self.llm_service.output_parser.get_format_instructions(),
+            step="changelog_extraction"
         )
 
-    async def store_company_update(self, text: str, source_url: str, customer_uid: str, tracked_company_uid: str, competitor_name: str, competitor_domain: str, competitor_type: str):
-        update = await convert_data_into_updates_llm(
-            text,
+    async def store_company_updates(self, entries: List[Tuple[str, str, Optional[datetime.datetime], Optional[str]]], customer_uid: str, tracked_company_uid: str, competitor_name: str, competitor_domain: str, competitor_type: str) -> Tuple[int, bool]:
+        """
+        Store changelog entries given as (text, source_url, posted_at, item_url). Entries processed
+        before are skipped; the rest are classified together in batched first-layer requests.
+        Returns the number of updates stored and whether storing any entry failed.
+        """
+        new_entries = []
+        # Entries scraped from the page share its URL, so they are keyed by their text; feed entries have their own link
+        item_keys = [make_item_key(item_url, text) for text, _, _, item_url in entries]
+        seen_keys = await self.seen_item_repo.get_seen_keys(tracked_company_uid, item_keys) if self.seen_item_repo else set()
+        for (text, source_url, posted_at, _), item_key in zip(entries, item_keys):
+            if item_key in seen_keys:
+                print(f"Skipping changelog entry already processed: {text[:50]}...")
+                continue
+            seen_keys.add(item_key)
+            new_entries.append((text, source_url, posted_at, item_key))
+
+        updates = await convert_batch_into_updates_llm(
+            [text for text, _, _, _ in new_entries],
             source_type="Company's Changelog Page",
             company=competitor_name,
             company_type=competitor_type,
             tracked_company_uid=tracked_company_uid,
             customer_uid=customer_uid,
-            customer_repo=self.customer_repo
+            customer_repo=self.customer_repo,
+            domain=competitor_domain,
+            first_layer_repo=self.first_layer_repo,
+            defer_enrichment=defers_enrichment(self.enrichment_repo)
         )
-    
-        if update.title == "Not useful for product manager":
-            print("Skipping post: Not useful for product manager")
-            return
-
-        company_update_data = TrackedCompanyUpdateCreate(
-            title=update.title,
-            description=update.description,
-            competitor_name=competitor_name,
-            source_url=source_url,
-            source_type="Company's Changelog Page",
-            competitor_domain=competitor_domain,
-            tracked_company_uid=tracked_company_uid,
-            customer_uid=customer_uid,
-            source="tracked_company's Changelogs Page",
-            posted_at=datetime.datetime.now(),
-            update_category=update.update_category,
-            update_type=update.update_type,
-            action_point=update.action_point
+
+        updates_stored = 0
+        store_failed = False
+        for (text, source_url, posted_at, item_key), update in zip(new_entries, updates):
+            if update.title == "Not useful for product manager":
+                print("Skipping post: Not useful for product manager")
+                if self.seen_item_repo:
+                    await self.seen_item_repo.mark_seen(tracked_company_uid, "changelog", item_key)
+                continue
+
+            company_update_data = TrackedCompanyUpdateCreate(
+                title=update.title,
+                description=update.description,
+                competitor_name=competitor_name,
+                source_url=source_url,
+                source_type="Company's Changelog Page",
+                competitor_domain=competitor_domain,
+                tracked_company_uid=tracked_company_uid,
+                customer_uid=customer_uid,
+                source="tracked_company's Changelogs Page",
+                posted_at=posted_at or datetime.datetime.now(),
+                update_category=update.update_category,
+                update_type=update.update_type,
+                action_point=update.action_point,
+                item_key=item_key
+            )
+
+            try:
+                update_id = await self.company_update_repo.create_company_update(company_update=company_update_data)
+                if self.seen_item_repo:
+                    await self.seen_item_repo.mark_seen(tracked_company_uid, "changelog", item_key)
+                if update_id is None:
+                    print(f"Update already stored for post: {text}")
+                    continue
+                print(f"Successfully stored update for post: {text}")
+                updates_stored += 1
+                await queue_update_enrichment(
+                    self.enrichment_repo, update_id, update, text, "Company's Changelog Page",
+                    competitor_name, competitor_type, tracked_company_uid, customer_uid
+                )
+            except Exception as e:
+                store_failed = True
+                print(f"Failed to store update. Error: {e}")
+        return updates_stored, store_failed
+
+    async def store_company_update(self, text: str, source_url: str, customer_uid: str, tracked_company_uid: str, competitor_name: str, competitor_domain: str, competitor_type: str, posted_at: Optional[datetime.datetime] = None, item_url: Optional[str] = None) -> bool:
+        stored, _ = await self.store_company_updates(
+            [(text, source_url, posted_at, item_url)], customer_uid, tracked_company_uid, competitor_name, competitor_domain, competitor_type
         )
+        return stored > 0
+
+    async def scrape_changelog_with_llm(self, customer_uid: str, tracked_company: TrackedCompany, changelogs_url: str, new_text: str) -> Tuple[int, bool]:
+        """
+        Fallback for pages without recognisable dates: the first LLM layer finds the latest entry,
+        following its detail link through the second layer when the page itself has no date.
+        Returns the number of updates stored and whether storing failed.
+        """
+        llm_text = None
+        response_1 = await self.scrape_changelog_page(changelogs_url, new_text)
+        if response_1 and response_1.get("date"):
+            llm_text = f"Changelog for {response_1['date']} is as follows: {response_1['all_text_data']}"
+        else:
+            detailed_link = response_1.get("http_link") if response_1 else None
+            if detailed_link:
+                response_2 = await self.scrape_detailed_changelog(detailed_link)
+                if response_2 and response_2.get("date"):
+                    llm_text = f"Changelog for {response_2['date']} is as follows: {response_2['all_text_data']}"
+        if not llm_text:
+            return 0, False
+        return await self.store_company_updates(
+            [(llm_text, changelogs_url, None, None)],
+            customer_uid,
+            tracked_company.tracked_company_uid,
+            tracked_company.name,
+            tracked_company.domain,
+            tracked_company.type
+        )
+
+    async def _fetch_feed_document(self, url: str) -> Optional[bytes]:
+        # Shared across customers; a failed fetch returns None and is not cached
+        return await get_shared_fetch_cache().get_or_fetch(("feed_document", url), lambda: self._get_feed_document(url))
 
+    async def _get_feed_document(self, url: str) -> Optional[bytes]:
         try:
-            await self.company_update_repo.create_company_update(company_update=company_update_data)
-            print(f"Successfully stored update for post: {text}")
-        except Exception as e:
-            print(f"Failed to store update. Error: {e}")
+            response = await get_http_client().get(url)
+        except httpx.HTTPError as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+        return response.content if response.status_code == 200 else None
+
+    async def _sitemap_changelog_entries(self, changelogs_url: str, document: Optional[bytes] = None) -> List[FeedEntry]:
+        """Sitemap entries below the changelog page that carry a lastmod, following a sitemap index one level."""
+        document = document or await self._fetch_feed_document(sitemap_url(changelogs_url))
+        if not document:
+            return []
+        if feed_kind(document) == "sitemapindex":
+            # Only child sitemaps that look like they cover the changelog
+            keyword = changelogs_url.rstrip("/").rsplit("/", 1)[-1].lower()
+            children = [entry.link for entry in parse_feed(document) if keyword and keyword in entry.link.lower()]
+            entries = []
+            for child in children[:3]:
+                child_document = await self._fetch_feed_document(child)
+                if child_document:
+                    entries.extend(parse_feed(child_document))
+        else:
+            entries = parse_feed(document)
+        return [entry for entry in entries if entry.published_at and is_under(entry.link, changelogs_url)]
+
+    async def discover_changelog_feed(self, changelogs_url: str) -> Optional[str]:
+        """
+        Look for a machine-readable list of changelog entries: a feed advertised by the page,
+        then common feed paths next to it, then the site sitemap when it lists pages under the changelog.
+        """
+        candidates = []
+        page = await self._fetch_feed_document(changelogs_url)
+        if page:
+            candidates.extend(advertised_feed_urls(page, changelogs_url))
+        candidates.extend(guessed_feed_urls(changelogs_url))
+
+        for candidate in dict.fromkeys(candidates):
+            document = await self._fetch_feed_document(candidate)
+            if document and feed_kind(document) in ("rss", "atom") and parse_feed(document, candidate):
+                return candidate
+
+        if await self._sitemap_changelog_entries(changelogs_url):
+            return sitemap_url(changelogs_url)
+        return None
+
+    async def resolve_changelog_feed(self, tracked_company: TrackedCompany, changelogs_url: str, competitor_repo: TrackedCompanyRepository) -> Optional[str]:
+        """Stored feed URL, re-running discovery when none was found and the last check is stale."""
+        if tracked_company.changelogs_feed_url:
+            return tracked_company.changelogs_feed_url
+
+        checked_at = tracked_company.changelogs_feed_checked_at
+        rediscover_after = datetime.timedelta(days=scraper_settings.CHANGELOG_FEED_REDISCOVERY_DAYS)
+        if checked_at and datetime.datetime.utcnow() - checked_at < rediscover_after:
+            return None
+
+        print(f"Discovering changelog feed for {changelogs_url}")
+        feed_url = await self.discover_changelog_feed(changelogs_url)
+        print(f"Changelog feed for {changelogs_url}: {feed_url or 'none found'}")
+        await competitor_repo.update_tracked_company_with_changelogs_feed_url(
+            tracked_company.tracked_company_uid,
+            TrackedCompanyLinkedInUpdate(changelogs_feed_url=feed_url)
+        )
+        return feed_url
+
+    async def scrape_changelog_feed(self, customer_uid: str, tracked_company: TrackedCompany, changelogs_url: str, feed_url: str, competitor_repo: TrackedCompanyRepository) -> Optional[int]:
+        """
+        Store updates for feed entries inside the changelog window, with no LLM extraction.
+        Returns the number of updates stored, or None when the page should be scraped instead: the
+        feed is gone (404/410 or no longer a feed), which clears the stored URL, or failed this time.
+        """
+        response, previous = await self.conditional_get(tracked_company.tracked_company_uid, feed_url)
+        if response.status_code == 304:
+            print(f"Changelog feed not modified (304): {feed_url}")
+            return 0
+        kind = feed_kind(response.content) if response.status_code == 200 else None
+        if kind is None and response.status_code in (200, 404, 410):
+            print(f"Changelog feed gone ({response.status_code}), falling back to the page: {feed_url}")
+            await competitor_repo.update_tracked_company_with_changelogs_feed_url(
+                tracked_company.tracked_company_uid,
+                TrackedCompanyLinkedInUpdate(changelogs_feed_url=None)
+            )
+            return None
+        if kind is None:
+            # Rate limits and server errors are transient; keep the feed for the next run
+            print(f"Changelog feed unavailable ({response.status_code}), scraping the page this run: {feed_url}")
+            return None
+
+        snapshot = PageSnapshot(
+            tracked_company_uid=tracked_company.tracked_company_uid,
+            url=feed_url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=hashlib.sha256(response.content).hexdigest(),
+        )
+        if previous and previous.content_hash == snapshot.content_hash:
+            print(f"Changelog feed content unchanged: {feed_url}")
+            await self.page_snapshot_repo.save_snapshot(snapshot)
+            return 0
 
-    async def scrape_changelog(self, customer_uid: str, competitor_repo: TrackedCompanyRepository) -> bool:
+        if kind in ("sitemap", "sitemapindex"):
+            entries = await self._sitemap_changelog_entries(changelogs_url, response.content)
+        else:
+            entries = parse_feed(response.content, feed_url)
+
+        since = datetime.datetime.utcnow() - datetime.timedelta(days=scraper_settings.CHANGELOG_WINDOW_DAYS)
+        recent_entries = [entry for entry in entries if entry.published_at and entry.published_at >= since]
+        print(f"Changelog feed {feed_url}: {len(entries)} entries, {len(recent_entries)} since {since:%Y-%m-%d}")
+
+        # One lookup for the whole feed, before any entry page is fetched
+        seen_keys = await self.seen_item_repo.get_seen_keys(
+            tracked_company.tracked_company_uid, [make_item_key(entry.link) for entry in recent_entries if entry.link]
+        ) if self.seen_item_repo else set()
+        entries_to_store = []
+        for entry in recent_entries:
+            if entry.link and make_item_key(entry.link) in seen_keys:
+                print(f"Skipping changelog entry already processed: {entry.link}")
+                continue
+
+            content = entry.content
+            if not content and entry.link:
+                # Sitemap entries (and title-only feeds) carry no body; read the entry page itself
+                page = await self._fetch_feed_document(entry.link)
+                content = ' '.join(await extract_text_fragments_async(page, entry.link)) if page else ""
+            if not content and not entry.title:
+                continue
+
+            entry_text = f"{entry.title}. {content}" if entry.title else content
+            llm_text = f"Changelog for {entry.published_at.date().isoformat()} is as follows: {entry_text}"
+            entries_to_store.append((trim_to_budget(llm_text, scraper_settings.CHANGELOG_MAX_PROMPT_TOKENS, "changelog_entry"), entry.link or changelogs_url, entry.published_at, entry.link))
+
+        updates_stored, store_failed = await self.store_company_updates(
+            entries_to_store,
+            customer_uid,
+            tracked_company.tracked_company_uid,
+            tracked_company.name,
+            tracked_company.domain,
+            tracked_company.type
+        )
+
+        # A failed entry is retried next run only if the feed does not look unchanged
+        if self.page_snapshot_repo and not store_failed:
+            await self.page_snapshot_repo.save_snapshot(snapshot)
+        return updates_stored
+
+    async def scrape_changelog(self, customer_uid: str, competitor_repo: TrackedCompanyRepository, limiter: Optional[ScrapeLimiter] = None, on_company_done: Optional[Callable[[str, CompanyScrapeResult], None]] = None) -> SourceScrapeResult:
         print(f"Scraping Changelog data for customer_uid: {customer_uid}")
         tracked_companies = await competitor_repo.get_all_tracked_companies(customer_uid)
         print(f"Found {len(tracked_companies)} tracked_companies.")
 
-        for tracked_company in tracked_companies:
-            print(f"Processing tracked_company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
+        limiter = limiter or get_scrape_limiter()
+        result = await limiter.run_for_companies(
+            "changelog",
+            tracked_companies,
+            lambda tracked_company: self.scrape_company(customer_uid, tracked_company, competitor_repo),
+            on_company_done,
+        )
 
-            changelogs_url = tracked_company.changelogs_url
+        print("Scraping process completed.")
+        return result
 
-            if changelogs_url == 'false':
-                print(f"Skipping tracked_company {tracked_company.tracked_company_uid} as changelogs_url is 'false'.")
-                continue
+    async def scrape_company(self, customer_uid: str, tracked_company: TrackedCompany, competitor_repo: TrackedCompanyRepository) -> int:
+        """
+        Scrape the changelog page of a single tracked company.
+        Returns the number of updates stored; raises when the company could not be scraped.
+        """
+        print(f"Processing tracked_company: {tracked_company.tracked_company_uid} (Domain: {tracked_company.domain})")
 
-            if not changelogs_url:
-                print(f"No Changelogs URL found for tracked_company {tracked_company.tracked_company_uid}. Fetching from API...")
-                changelogs_url = await self.get_company_changelogs_url(tracked_company.domain)
-                if changelogs_url:
-                    print(f"Fetched changelogs_url: {changelogs_url}")
-                    await competitor_repo.update_tracked_company_with_changelogs_url(
-                        tracked_company.tracked_company_uid,
-                        TrackedCompanyLinkedInUpdate(changelogs_url=changelogs_url)
-                    )
-                else:
-                    print(f"Failed to fetch changelogs_url for tracked_company {tracked_company.tracked_company_uid}.")
-                    continue
+        # Shared across customers by domain and revalidated after DISCOVERY_CACHE_TTL_DAYS; the URL
+        # stored on the company is only used while discovery finds nothing
+        changelogs_url = await self.discovery_cache.resolve(
+            tracked_company.domain, "changelogs_url", lambda: self.get_company_changelogs_url(tracked_company.domain)
+        ) or tracked_company.changelogs_url
+        if not changelogs_url:
+            print(f"Failed to fetch changelogs_url for tracked_company {tracked_company.tracked_company_uid}.")
+            return 0
+        if changelogs_url != tracked_company.changelogs_url:
+            print(f"Fetched changelogs_url: {changelogs_url}")
+            await competitor_repo.update_tracked_company_with_changelogs_url(
+                tracked_company.tracked_company_uid,
+                TrackedCompanyLinkedInUpdate(changelogs_url=changelogs_url)
+            )
+            # A feed found next to the old page says nothing about the new one
+            tracked_company = tracked_company.model_copy(update={"changelogs_feed_url": None, "changelogs_feed_checked_at": None})
 
-            if changelogs_url:
-                print(f"Fetching changelog data for URL: {changelogs_url}")
-                response_1 = await self.scrape_changelog_page(changelogs_url)
-                if response_1 and response_1.get("date"):
-                    llm_text = f"Changelog for {response_1['date']} is as follows: {response_1['all_text_data']}"
-                    await self.store_company_update(
-                        llm_text,
-                        changelogs_url,
-                        customer_uid,
-                        tracked_company.tracked_company_uid,
-                        tracked_company.name,
-                        tracked_company.domain,
-                        tracked_company.type  
-                    )
-                else:
-                    detailed_link = response_1.get("http_link") if response_1 else None
-                    if detailed_link:
-                        response_2 = await self.scrape_detailed_changelog(detailed_link)
-                        if response_2 and response_2.get("date"):
-                            llm_text = f"Changelog for {response_2['date']} is as follows: {response_2['all_text_data']}"
-                            await self.store_company_update(
-                                llm_text,
-                                changelogs_url,
-                                customer_uid,
-                                tracked_company.tracked_company_uid,
-                                tracked_company.name,
-                                tracked_company.domain,
-                                tracked_company.type
-                            )
-
-            print(f"Processing complete for tracked_company: {tracked_company.domain}")
+        # Feeds and sitemaps give dated entries directly; only the final summarisation uses the LLM
+        feed_url = await self.resolve_changelog_feed(tracked_company, changelogs_url, competitor_repo)
+        if feed_url:
+            feed_updates = await self.scrape_changelog_feed(customer_uid, tracked_company, changelogs_url, feed_url, competitor_repo)
+            if feed_updates is not None:
+                print(f"Processing complete for tracked_company: {tracked_company.domain}")
+                return feed_updates
 
-        print("Scraping process completed.")
-        return True
+        print(f"Fetching changelog data for URL: {changelogs_url}")
+        new_text, snapshot, previous_fragments = await self.fetch_changelog_page(tracked_company.tracked_company_uid, changelogs_url)
+        if new_text is None:
+            print(f"Skipping LLM for tracked_company {tracked_company.tracked_company_uid}: changelog unchanged since last scrape.")
+            return 0
+
+        # Pages with dated entries are split deterministically; the LLM only reads undated pages
+        since = (datetime.datetime.now() - datetime.timedelta(days=scraper_settings.CHANGELOG_WINDOW_DAYS)).date()
+        sections = split_dated_sections(snapshot.page_text.split('\n'))
+        if sections:
+            # Only entries that are new or whose text changed since the last snapshot; unchanged
+            # entries were handled on an earlier run
+            new_sections = changed_sections(split_dated_sections(previous_fragments), sections)
+            recent_sections = sections_since(new_sections, since)
+            print(f"Found {len(sections)} dated changelog entries, {len(new_sections)} new or changed, {len(recent_sections)} since {since}: {changelogs_url}")
+            updates_stored, store_failed = await self.store_company_updates(
+                [
+                    (f"Changelog for {section.label} is as follows: {trim_to_budget(section.text, scraper_settings.CHANGELOG_MAX_PROMPT_TOKENS, 'changelog_entry')}", changelogs_url, datetime.datetime.combine(section.date, datetime.time()), None)
+                    for section in recent_sections
+                ],
+                customer_uid,
+                tracked_company.tracked_company_uid,
+                tracked_company.name,
+                tracked_company.domain,
+                tracked_company.type
+            )
+        else:
+            print(f"No dated entries found, asking the LLM: {changelogs_url}")
+            updates_stored, store_failed = await self.scrape_changelog_with_llm(customer_uid, tracked_company, changelogs_url, new_text)
+
+        # Keep the previous snapshot when an entry failed to store: the next run then diffs
+        # against the old text and finds the lost entries again
+        if self.page_snapshot_repo and not store_failed:
+            await self.page_snapshot_repo.save_snapshot(snapshot)
+
+        print(f"Processing complete for tracked_company: {tracked_company.domain}")
+        return updates_stored
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import socket
+from typing import Dict, List, Optional
+from app.repository.customers import CustomerRepository
+from app.repository.update_enrichment import UpdateEnrichmentRepository
+from app.schemas.company_updates import LLMTrackedCompanyUpdate
+from app.schemas.update_enrichment import UpdateEnrichmentJob
+from app.services.llm_update_generator import enrich_update, needs_enrichment
+from app.scraper_config import scraper_settings
+
+# Set when a job is queued in this process so idle workers do not wait out the poll interval
+_work_available = asyncio.Event()
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before a job that has failed `attempts` times is claimed again."""
+    delay = scraper_settings.ENRICHMENT_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return min(delay, scraper_settings.ENRICHMENT_RETRY_MAX_SECONDS)
+
+
+def defers_enrichment(enrichment_repo: Optional[UpdateEnrichmentRepository]) -> bool:
+    """Whether a source should store updates straight after the first layer and queue the rest."""
+    return enrichment_repo is not None and scraper_settings.AGENT_ENRICHMENT_MODE == "deferred"
+
+
+async def queue_update_enrichment(
+    enrichment_repo: Optional[UpdateEnrichmentRepository],
+    company_update_id: Optional[int],
+    update: LLMTrackedCompanyUpdate,
+    item_text: str,
+    source_type: str,
+    company: str,
+    company_type: Optional[str],
+    tracked_company_uid: str,
+    customer_uid: str,
+) -> bool:
+    """
+    Queue a freshly stored update for the second layer, agent and final layer when enrichment is
+    deferred and the update is over the threshold. A failure to queue is logged, not raised: the
+    update is already stored and keeps enrichment_status NULL.
+    """
+    if company_update_id is None or not defers_enrichment(enrichment_repo) or not needs_enrichment(update):
+        return False
+    try:
+        queued = await enrichment_repo.enqueue(
+            UpdateEnrichmentJob(
+                company_update_id=company_update_id,
+                customer_uid=customer_uid,
+                tracked_company_uid=tracked_company_uid,
+                company=company,
+                company_type=company_type,
+                source_type=source_type,
+                item_text=item_text,
+                first_layer=update.model_dump_json(),
+            )
+        )
+    except Exception as e:
+        print(f"Failed to queue enrichment for update {company_update_id}: {e}")
+        return False
+    if queued:
+        _work_available.set()
+        print(f"Queued enrichment for update {company_update_id}")
+    return queued
+
+
+class UpdateEnrichmentManager:
+    """
+    Runs agent selection, the agent call and action-point generation for stored updates, off the
+    scrape path. Jobs live in update_enrichment_jobs; every loop leases one job at a time (FOR
+    UPDATE SKIP LOCKED on Postgres), so ENRICHMENT_WORKERS bounds the enrichments a process runs
+    at once and several instances can share the queue. Created and drained by the app lifespan.
+    """
+
+    def __init__(
+        self,
+        enrichment_repo: UpdateEnrichmentRepository,
+        customer_repo: CustomerRepository,
+        worker_count: int = scraper_settings.ENRICHMENT_WORKERS,
+    ):
+        self.enrichment_repo = enrichment_repo
+        self.customer_repo = customer_repo
+        self.worker_count = max(1, worker_count)
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers: List[asyncio.Task] = []
+        self.running = False
+
+    async def start(self) -> None:
+        self.running = True
+        self.workers = [
+            asyncio.create_task(self._worker(f"{self.node_id}:enrich:{i}"), name=f"update-enrichment-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        print(f"Started {self.worker_count} update enrichment workers on {self.node_id}")
+
+    async def shutdown(self, timeout: float = scraper_settings.ENRICHMENT_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Stop claiming jobs and let those in flight finish for up to `timeout`; the rest are released."""
+        self.running = False
+        _work_available.set()
+        done, pending = await asyncio.wait(self.workers, timeout=timeout) if self.workers else (set(), set())
+        if pending:
+            print(f"Update enrichments did not drain within {timeout}s, cancelling workers")
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self.workers = []
+
+    async def get_stats(self) -> Dict[str, int]:
+        """Jobs per status across all instances."""
+        return await self.enrichment_repo.count_by_status()
+
+    async def _worker(self, lease_owner: str) -> None:
+        while self.running:
+            try:
+                job = await self.enrichment_repo.claim_job(
+                    lease_owner,
+                    scraper_settings.ENRICHMENT_LEASE_SECONDS,
+                    scraper_settings.ENRICHMENT_MAX_ATTEMPTS,
+                )
+            except Exception as e:
+                print(f"[{lease_owner}] Failed to claim an enrichment job: {e}")
+                job = None
+
+            if job is None:
+                await self._wait_for_work()
+                continue
+
+            try:
+                await self._run_job(job, lease_owner)
+            except asyncio.CancelledError:
+                # Shutting down mid-job: give it back instead of waiting for the lease to expire
+                await self.enrichment_repo.release_job(job.id, lease_owner)
+                raise
+            except Exception as e:
+                print(f"[{lease_owner}] Enrichment of update {job.company_update_id} failed (attempt {job.attempts}): {e}")
+                if job.attempts >= scraper_settings.ENRICHMENT_MAX_ATTEMPTS:
+                    await self.enrichment_repo.complete_job(job.id, lease_owner, "failed", "failed", error=str(e))
+                else:
+                    # Back off before the retry so a failing upstream is not hit again straight away
+                    await self.enrichment_repo.complete_job(
+                        job.id, lease_owner, "pending", "pending", error=str(e), retry_in_seconds=retry_delay(job.attempts)
+                    )
+
+    async def _wait_for_work(self) -> None:
+        # Fail jobs whose workers died on their last attempt, then sleep until a local
+        # enqueue wakes us or the poll interval passes (jobs may be queued by other nodes)
+        try:
+            reaped = await self.enrichment_repo.fail_exhausted_jobs(scraper_settings.ENRICHMENT_MAX_ATTEMPTS)
+            if reaped:
+                print(f"Failed {reaped} enrichment jobs that ran out of attempts")
+        except Exception as e:
+            print(f"Failed to reap expired enrichment jobs: {e}")
+
+        _work_available.clear()
+        try:
+            await asyncio.wait_for(_work_available.wait(), timeout=scraper_settings.ENRICHMENT_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_job(self, job: UpdateEnrichmentJob, lease_owner: str) -> None:
+        print(f"[{lease_owner}] Enriching update {job.company_update_id} for {job.company} (attempt {job.attempts})")
+        first_layer_response = LLMTrackedCompanyUpdate.model_validate_json(job.first_layer)
+        # Layer and agent failures raise, so they are retried by _worker instead of ending as no_action_point
+        result = await asyncio.wait_for(
+            enrich_update(
+                first_layer_response,
+                job.item_text,
+                job.company_type,
+                job.company,
+                self.customer_repo,
+                job.customer_uid,
+                raise_errors=True,
+            ),
+            timeout=scraper_settings.ENRICHMENT_TIMEOUT_SECONDS,
+        )
+        saved = await self.enrichment_repo.complete_job(
+            job.id,
+            lease_owner,
+            "done",
+            "done" if result.enriched else "no_action_point",
+            action_point=result.update.action_point if result.enriched else None,
+        )
+        if not saved:
+            print(f"[{lease_owner}] Lease on enrichment job {job.id} was lost; result discarded")
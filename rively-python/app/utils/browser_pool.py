@@ -0,0 +1,118 @@
+# app/utils/browser_pool.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, CrawlerRunConfig, CrawlResult
+from app.scraper_config import scraper_settings
+
+
+class _PooledCrawler:
+    """One long-lived headless browser; launched on first use and relaunched after `max_pages` crawls."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.crawler: Optional[AsyncWebCrawler] = None
+        self.pages = 0
+
+    async def get(self) -> AsyncWebCrawler:
+        if self.crawler is None:
+            self.crawler = AsyncWebCrawler(config=BrowserConfig(
+                viewport_height=800,
+                viewport_width=1200,
+                headless=True,
+                verbose=False,
+            ))
+            await self.crawler.start()
+            self.pages = 0
+            print(f"Started pooled browser #{self.index}")
+        return self.crawler
+
+    async def close(self):
+        crawler, self.crawler = self.crawler, None
+        if crawler is not None:
+            try:
+                await crawler.close()
+            except Exception as e:
+                print(f"Error closing pooled browser #{self.index}: {e}")
+
+
+class CrawlerPool:
+    """
+    Fixed number of headless browsers shared by every article crawl in the process.
+    Browsers start lazily, are handed out one crawl at a time, and are recycled after
+    `pages_per_browser` crawls or after a crawl raises.
+    """
+
+    def __init__(self, size: int, pages_per_browser: int, cache_mode: str = "enabled"):
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self.cache_mode = CacheMode(cache_mode)
+        self._slots: List[_PooledCrawler] = [_PooledCrawler(i) for i in range(size)]
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _idle_slots(self) -> asyncio.Queue:
+        # Created on first use so the queue binds to the running event loop
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+        return self._idle
+
+    @asynccontextmanager
+    async def crawler(self) -> AsyncIterator[AsyncWebCrawler]:
+        idle = self._idle_slots()
+        slot = await idle.get()
+        try:
+            crawler = await slot.get()
+            try:
+                yield crawler
+            except BaseException:
+                # The browser may be wedged after a failed crawl; start fresh next time
+                await slot.close()
+                raise
+            slot.pages += 1
+            if slot.pages >= self.pages_per_browser:
+                print(f"Recycling pooled browser #{slot.index} after {slot.pages} pages")
+                await slot.close()
+        finally:
+            idle.put_nowait(slot)
+
+    async def fetch_markdown(self, url: str) -> Optional[str]:
+        """Crawl `url` on a pooled browser and return its markdown, or None when the crawl failed."""
+        async with self.crawler() as crawler:
+            results: List[CrawlResult] = await crawler.arun(url=url, config=CrawlerRunConfig(cache_mode=self.cache_mode))
+        # arun returns a container of results; a single-URL crawl has one, so only the first counts
+        for result in results:
+            if result.success and result.markdown:
+                return result.markdown.raw_markdown
+            print(f"Failed to crawl {url}: {result.error_message}")
+            return None
+        print(f"Failed to crawl {url}: no result")
+        return None
+
+    async def close(self):
+        await asyncio.gather(*(slot.close() for slot in self._slots))
+        self._idle = None
+
+
+_pool: Optional[CrawlerPool] = None
+
+
+def get_crawler_pool() -> CrawlerPool:
+    """Return the process-wide crawler pool; no browser is launched until the first crawl."""
+    global _pool
+    if _pool is None:
+        _pool = CrawlerPool(
+            scraper_settings.CRAWLER_POOL_SIZE,
+            scraper_settings.CRAWLER_PAGES_PER_BROWSER,
+            scraper_settings.CRAWLER_CACHE_MODE,
+        )
+    return _pool
+
+
+async def close_crawler_pool() -> None:
+    """Close every pooled browser; called from the app lifespan on shutdown."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,120 @@
+# app/utils/changelog_sections.py
+import calendar
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+
+_MONTHS = {name.lower(): index for index, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): index for index, name in enumerate(calendar.month_abbr) if name})
+_MONTHS["sept"] = 9
+_MONTH = r"(?P<month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>(?:19|20)\d{2})"
+
+# Ordered most to least specific; month-only dates ("July 2025") are checked last
+_DATE_PATTERNS = [
+    ("iso", re.compile(r"\b" + _YEAR + r"[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})\b")),
+    ("month_day_year", re.compile(r"\b" + _MONTH + r"\s+" + _DAY + r",?\s+" + _YEAR + r"\b", re.IGNORECASE)),
+    ("day_month_year", re.compile(r"\b" + _DAY + r"\s+(?:of\s+)?" + _MONTH + r",?\s+" + _YEAR + r"\b", re.IGNORECASE)),
+    ("numeric", re.compile(r"\b(?P<first>\d{1,2})/(?P<second>\d{1,2})/" + _YEAR + r"\b")),
+    ("month_year", re.compile(r"\b" + _MONTH + r",?\s+" + _YEAR + r"\b", re.IGNORECASE)),
+]
+
+# A fragment longer than this is body text that happens to mention a date, not an entry heading
+MAX_HEADING_CHARS = 80
+
+
+class ChangelogSection(BaseModel):
+    date: date
+    text: str
+    # Heading gave only a month ("July 2025"); `date` is then the 1st of that month
+    month_only: bool = False
+
+    @property
+    def label(self) -> str:
+        return self.date.strftime("%B %Y") if self.month_only else self.date.isoformat()
+
+
+def parse_date(text: str) -> Optional[date]:
+    """Find the first calendar date in `text`. Month-only dates resolve to the 1st of the month."""
+    parsed = _parse_date(text)
+    return parsed[0] if parsed else None
+
+
+def _parse_date(text: str) -> Optional[Tuple[date, bool]]:
+    """Like parse_date, also returning whether only a month was given."""
+    for kind, pattern in _DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        try:
+            year = int(match.group("year"))
+            if kind == "numeric":
+                first, second = int(match.group("first")), int(match.group("second"))
+                # US order unless the first number cannot be a month
+                month, day = (second, first) if first > 12 else (first, second)
+            else:
+                month = match.group("month")
+                month = int(month) if month.isdigit() else _MONTHS[month.lower()]
+                day = int(match.group("day")) if kind != "month_year" else 1
+            return date(year, month, day), kind == "month_year"
+        except (ValueError, KeyError):
+            continue
+    return None
+
+
+def split_dated_sections(fragments: List[str]) -> List[ChangelogSection]:
+    """
+    Split extracted page fragments into entries, each starting at a short fragment that
+    carries a date (a heading, a <time> tag or a dated title line). Text before the first
+    dated fragment (navigation, intro) is dropped. Returns [] when the page has no dates.
+    """
+    sections: List[ChangelogSection] = []
+    current_date: Optional[Tuple[date, bool]] = None
+    current: List[str] = []
+
+    for fragment in fragments:
+        fragment_date = _parse_date(fragment) if len(fragment) <= MAX_HEADING_CHARS else None
+        if fragment_date:
+            if current_date:
+                sections.append(ChangelogSection(date=current_date[0], month_only=current_date[1], text=" ".join(current)))
+            current_date, current = fragment_date, [fragment]
+        elif current_date:
+            current.append(fragment)
+
+    if current_date:
+        sections.append(ChangelogSection(date=current_date[0], month_only=current_date[1], text=" ".join(current)))
+    return sections
+
+
+def sections_since(sections: List[ChangelogSection], since: date, until: Optional[date] = None) -> List[ChangelogSection]:
+    """
+    Entries dated from `since` to `until` (default today), merging consecutive entries that
+    share a date. Month-only entries are compared by month, so the current month's entry is
+    kept. Future dates are roadmap items or typos, not releases.
+    """
+    until = until or date.today()
+    recent: List[ChangelogSection] = []
+    for section in sections:
+        if section.month_only:
+            in_window = (since.year, since.month) <= (section.date.year, section.date.month) <= (until.year, until.month)
+        else:
+            in_window = since <= section.date <= until
+        if not in_window:
+            continue
+        if recent and (recent[-1].date, recent[-1].month_only) == (section.date, section.month_only):
+            recent[-1] = ChangelogSection(date=section.date, month_only=section.month_only, text=f"{recent[-1].text} {section.text}")
+        else:
+            recent.append(section)
+    return recent
+
+
+def _section_key(section: ChangelogSection):
+    return section.date, section.month_only, re.sub(r"\s+", " ", section.text).strip().lower()
+
+
+def changed_sections(previous: List[ChangelogSection], sections: List[ChangelogSection]) -> List[ChangelogSection]:
+    """Entries of `sections` that are not in `previous` verbatim: new entries and entries whose text changed."""
+    seen = {_section_key(section) for section in previous}
+    return [section for section in sections if _section_key(section) not in seen]
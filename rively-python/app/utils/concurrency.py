@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.schemas.scraper import CompanyScrapeResult, SourceScrapeResult
+from app.schemas.tracked_companies import TrackedCompany
+from app.scraper_config import scraper_settings
+
+
+class ScrapeLimiter:
+    """
+    Bounds concurrent scrape work with one global semaphore and one semaphore per source.
+    Every (tracked company, source) pair runs as its own task under both limits. Tasks only
+    overlap while they await, so workers must do their I/O through the shared async HTTP
+    client and ainvoke_chain; a blocking call stalls every slot.
+    """
+
+    def __init__(self, max_concurrency: int, per_source: Dict[str, int]):
+        self.global_semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.source_semaphores = {
+            source: asyncio.Semaphore(max(1, limit)) for source, limit in per_source.items()
+        }
+
+    def _source_semaphore(self, source: str) -> asyncio.Semaphore:
+        if source not in self.source_semaphores:
+            self.source_semaphores[source] = asyncio.Semaphore(1)
+        return self.source_semaphores[source]
+
+    @asynccontextmanager
+    async def slot(self, source: str):
+        # Take the source slot first so a saturated source does not sit on global slots
+        async with self._source_semaphore(source):
+            async with self.global_semaphore:
+                yield
+
+    async def run_company(
+        self,
+        source: str,
+        tracked_company: TrackedCompany,
+        worker: Callable[[TrackedCompany], Awaitable[Optional[int]]],
+    ) -> CompanyScrapeResult:
+        """Run `worker` for one tracked company inside a slot, turning its outcome into a CompanyScrapeResult."""
+        async with self.slot(source):
+            try:
+                updates_stored = await worker(tracked_company)
+                return CompanyScrapeResult(
+                    tracked_company_uid=tracked_company.tracked_company_uid,
+                    domain=tracked_company.domain,
+                    success=True,
+                    updates_stored=updates_stored or 0,
+                )
+            except Exception as e:
+                print(f"[{source}] Failed for {tracked_company.domain}: {e}")
+                return CompanyScrapeResult(
+                    tracked_company_uid=tracked_company.tracked_company_uid,
+                    domain=tracked_company.domain,
+                    success=False,
+                    error=str(e),
+                )
+
+    async def run_for_companies(
+        self,
+        source: str,
+        tracked_companies: List[TrackedCompany],
+        worker: Callable[[TrackedCompany], Awaitable[Optional[int]]],
+        on_company_done: Optional[Callable[[str, CompanyScrapeResult], None]] = None,
+    ) -> SourceScrapeResult:
+        """
+        Run `worker` for every tracked company as an independent task.
+        The worker returns the number of updates stored; any exception marks that company as failed.
+        `on_company_done` is called with (source, result) as soon as each company finishes.
+        """
+
+        async def run_one(tracked_company: TrackedCompany) -> CompanyScrapeResult:
+            result = await self.run_company(source, tracked_company, worker)
+            if on_company_done:
+                on_company_done(source, result)
+            return result
+
+        companies = await asyncio.gather(*(run_one(tc) for tc in tracked_companies))
+        return SourceScrapeResult(
+            source=source,
+            success=all(company.success for company in companies),
+            companies=list(companies),
+        )
+
+
+_scrape_limiter: Optional[ScrapeLimiter] = None
+
+
+def get_scrape_limiter() -> ScrapeLimiter:
+    """Process-wide limiter, so concurrent scrape requests share the same bounds."""
+    global _scrape_limiter
+    if _scrape_limiter is None:
+        _scrape_limiter = ScrapeLimiter(
+            scraper_settings.SCRAPER_MAX_CONCURRENCY,
+            {
+                "linkedin": scraper_settings.SCRAPER_LINKEDIN_CONCURRENCY,
+                "changelog": scraper_settings.SCRAPER_CHANGELOG_CONCURRENCY,
+                "news": scraper_settings.SCRAPER_NEWS_CONCURRENCY,
+            },
+        )
+    return _scrape_limiter
@@ -0,0 +1,171 @@
+# app/utils/feeds.py
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+from urllib.parse import urljoin, urlsplit
+from lxml import etree, html as lxml_html
+from pydantic import BaseModel
+
+FEED_CONTENT_TYPES = ("application/rss+xml", "application/atom+xml", "application/feed+xml")
+
+# Tried in order when the page does not advertise a feed; relative to the changelog page URL
+FEED_URL_GUESSES = ("rss.xml", "feed.xml", "atom.xml", "rss", "feed")
+
+# Feeds are untrusted remote XML: no entity expansion, no DTD or entity fetches, default size limits
+_FEED_PARSER = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+
+
+class FeedEntry(BaseModel):
+    title: str = ""
+    link: Optional[str] = None
+    published_at: Optional[datetime] = None
+    # Plain text of the entry body; empty for sitemap entries, whose pages must be fetched
+    content: str = ""
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _child(element, name: str):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child
+    return None
+
+
+def _child_text(element, *names: str) -> str:
+    for name in names:
+        child = _child(element, name)
+        if child is not None and (child.text or "").strip():
+            return child.text.strip()
+    return ""
+
+
+def _html_to_text(markup: str) -> str:
+    if not markup:
+        return ""
+    if "<" not in markup:
+        return re.sub(r"\s+", " ", markup).strip()
+    try:
+        return re.sub(r"\s+", " ", lxml_html.fromstring(markup).text_content()).strip()
+    except (etree.ParserError, ValueError):
+        return re.sub(r"\s+", " ", markup).strip()
+
+
+def parse_feed_date(value: str) -> Optional[datetime]:
+    """RFC 822 (RSS pubDate) or ISO 8601 (Atom, sitemap lastmod); returned as naive UTC like the rest of the app."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _kind_of(root) -> Optional[str]:
+    name = _local_name(root.tag)
+    if name in ("rss", "RDF"):
+        return "rss"
+    if name == "feed":
+        return "atom"
+    if name == "urlset":
+        return "sitemap"
+    if name == "sitemapindex":
+        return "sitemapindex"
+    return None
+
+
+def _parse_xml(document: bytes):
+    return etree.fromstring(document, _FEED_PARSER)
+
+
+def feed_kind(document: bytes) -> Optional[str]:
+    """'rss', 'atom', 'sitemap' or 'sitemapindex' for a parseable feed document, else None."""
+    try:
+        return _kind_of(_parse_xml(document))
+    except (etree.XMLSyntaxError, ValueError):
+        return None
+
+
+def parse_feed(document: bytes, base_url: str = "") -> List[FeedEntry]:
+    """Parse an RSS 2.0 / RSS 1.0, Atom or sitemap document into entries, in document order."""
+    try:
+        root = _parse_xml(document)
+    except (etree.XMLSyntaxError, ValueError):
+        return []
+    kind = _kind_of(root)
+    entries: List[FeedEntry] = []
+
+    if kind == "rss":
+        for item in root.iter():
+            if _local_name(item.tag) != "item":
+                continue
+            link = _child_text(item, "link", "guid")
+            entries.append(FeedEntry(
+                title=_child_text(item, "title"),
+                link=urljoin(base_url, link) if link else None,
+                published_at=parse_feed_date(_child_text(item, "pubDate", "date", "published", "updated")),
+                content=_html_to_text(_child_text(item, "encoded", "description")),
+            ))
+    elif kind == "atom":
+        for entry in root:
+            if _local_name(entry.tag) != "entry":
+                continue
+            link = None
+            for child in entry:
+                if _local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+                    link = urljoin(base_url, child.get("href"))
+                    break
+            entries.append(FeedEntry(
+                title=_html_to_text(_child_text(entry, "title")),
+                link=link,
+                published_at=parse_feed_date(_child_text(entry, "published", "updated")),
+                content=_html_to_text(_child_text(entry, "content", "summary")),
+            ))
+    elif kind in ("sitemap", "sitemapindex"):
+        for url in root:
+            location = _child_text(url, "loc")
+            if location:
+                entries.append(FeedEntry(link=location, published_at=parse_feed_date(_child_text(url, "lastmod"))))
+    return entries
+
+
+def advertised_feed_urls(page: bytes, page_url: str) -> List[str]:
+    """Feed URLs from <link rel="alternate" type="application/rss+xml|atom+xml"> in the page head."""
+    try:
+        root = lxml_html.document_fromstring(page)
+    except (etree.ParserError, ValueError):
+        return []
+    urls = []
+    for link in root.iter("link"):
+        rel = (link.get("rel") or "").lower().split()
+        if "alternate" in rel and (link.get("type") or "").lower() in FEED_CONTENT_TYPES and link.get("href"):
+            urls.append(urljoin(page_url, link.get("href")))
+    return urls
+
+
+def guessed_feed_urls(page_url: str) -> List[str]:
+    base = page_url.rstrip("/") + "/"
+    return [urljoin(base, guess) for guess in FEED_URL_GUESSES]
+
+
+def sitemap_url(page_url: str) -> str:
+    parts = urlsplit(page_url)
+    return f"{parts.scheme}://{parts.netloc}/sitemap.xml"
+
+
+def is_under(url: str, page_url: str) -> bool:
+    """True for pages below the changelog page, e.g. /changelog/2025-07-export under /changelog."""
+    page, candidate = urlsplit(page_url), urlsplit(url)
+    prefix = page.path.rstrip("/") + "/"
+    return candidate.netloc.lower() == page.netloc.lower() and candidate.path.startswith(prefix) and candidate.path != prefix
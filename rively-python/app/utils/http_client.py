@@ -0,0 +1,105 @@
+import asyncio
+import httpx
+from typing import Optional
+from app.scraper_config import scraper_settings
+from app.utils.rate_limiter import get_rate_limiter, parse_retry_after
+
+# One client for the whole app: connections (and TLS sessions) are pooled and kept alive
+# per host across scraper sources and tracked companies. gzip/deflate are always decoded;
+# brotli and zstd are decoded when the Brotli / zstandard packages are installed.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport with the per-host token buckets: every request first takes a token
+    for its host, and a 429 is retried after the upstream's Retry-After, which is also recorded on
+    the shared bucket so other callers back off too.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = get_rate_limiter()
+        host = request.url.host
+        attempt = 0
+        while True:
+            await limiter.acquire(host)
+            response = await self.transport.handle_async_request(request)
+            if response.status_code != 429 or attempt >= scraper_settings.RATE_LIMIT_MAX_RETRIES:
+                return response
+
+            attempt += 1
+            retry_after = parse_retry_after(
+                response.headers.get("retry-after"), scraper_settings.RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+            )
+            await response.aclose()
+            print(f"429 from {host}, retrying in {retry_after:.1f}s (attempt {attempt})")
+            if limiter.is_limited(host):
+                await limiter.back_off(host, retry_after)
+            else:
+                await asyncio.sleep(retry_after)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def build_transport() -> httpx.AsyncBaseTransport:
+    return RateLimitedTransport(
+        httpx.AsyncHTTPTransport(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=scraper_settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=scraper_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=scraper_settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+    )
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=build_transport(),
+        follow_redirects=True,
+        timeout=httpx.Timeout(
+            scraper_settings.HTTP_TIMEOUT_SECONDS,
+            connect=scraper_settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Create the shared client; called from the app lifespan on startup."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        print(f"Opened shared HTTP client (http2={_http2_available()})")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections; called from the app lifespan on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client. Outside the app (scripts, ad-hoc runs) it is created lazily
+    and stays open until close_http_client() is called.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
@@ -0,0 +1,31 @@
+# app/utils/item_keys.py
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalise_text(text: str) -> str:
+    """Lowercase and collapse whitespace so cosmetic edits do not produce a new key."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def normalise_url(url: str) -> str:
+    """Drop the fragment and trailing slash; scheme and host are case-insensitive."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalise_text(text).encode("utf-8")).hexdigest()
+
+
+def make_item_key(source_url: Optional[str], text: str = "") -> str:
+    """
+    Dedup key for a scraped item: its URL when the item has one of its own,
+    otherwise a hash of its normalised text.
+    """
+    if source_url and source_url.strip():
+        return normalise_url(source_url)[:500]
+    return f"sha256:{text_hash(text)}"
@@ -0,0 +1,117 @@
+# app/utils/llm_cache.py
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.prompts import BasePromptTemplate
+from app.db.database import llm_cache_database
+from app.repository.llm_response_cache import LLMResponseCacheRepository
+from app.scraper_config import scraper_settings
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _canonical_json(value: Any) -> str:
+    """Stable JSON for hashing: sorted keys, no whitespace, non-JSON values (dates) as strings."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def describe_chain(chain) -> Tuple[str, str]:
+    """
+    (model, prompt_hash) for a `prompt | llm | parser` chain. The model includes its class, name and
+    temperature; the prompt hash covers the template text and its partial variables (format instructions).
+    """
+    steps = getattr(chain, "steps", [chain])
+    model, prompt = "unknown", ""
+    for step in steps:
+        if isinstance(step, BasePromptTemplate):
+            template = getattr(step, "template", None) or repr(step)
+            prompt = _canonical_json({"template": template, "partials": {k: v for k, v in step.partial_variables.items() if isinstance(v, str)}})
+        elif isinstance(step, BaseLanguageModel):
+            name = getattr(step, "model_name", None) or getattr(step, "model", None) or ""
+            model = f"{type(step).__name__}:{name}:{getattr(step, 'temperature', '')}"
+    return model, _sha256(prompt)
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of parsed chain outputs keyed by model, prompt template hash and canonical
+    inputs. Entries live for LLM_CACHE_TTL_HOURS; the table is trimmed to LLM_CACHE_MAX_ENTRIES
+    by last use. Cache failures are counted and otherwise ignored: a call never fails because of them.
+    """
+
+    def __init__(self, repo: LLMResponseCacheRepository):
+        self.repo = repo
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "bypassed": 0, "errors": 0}
+        self._schema_ready = False
+        self._writes_since_eviction = 0
+
+    def make_key(self, chain, inputs: dict) -> Tuple[str, str, str]:
+        model, prompt_hash = describe_chain(chain)
+        return _sha256(_canonical_json({"model": model, "prompt": prompt_hash, "inputs": inputs})), model, prompt_hash
+
+    async def _ensure_schema(self):
+        if not self._schema_ready:
+            await self.repo.ensure_schema()
+            self._schema_ready = True
+
+    async def get(self, cache_key: str) -> Optional[Any]:
+        try:
+            await self._ensure_schema()
+            stored = await self.repo.get_response(cache_key, datetime.utcnow())
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"LLM cache read failed: {e}")
+            return None
+        if stored is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(stored)
+
+    async def put(self, cache_key: str, model: str, prompt_hash: str, value: Any):
+        if value is None or value == {} or value == []:
+            return
+        try:
+            response = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            # Only JSON outputs (dicts from JsonOutputParser) are cached
+            return
+        now = datetime.utcnow()
+        try:
+            await self._ensure_schema()
+            await self.repo.save_response(cache_key, model, prompt_hash, response, now, now + timedelta(hours=scraper_settings.LLM_CACHE_TTL_HOURS))
+            self.stats["writes"] += 1
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= scraper_settings.LLM_CACHE_EVICT_EVERY_WRITES:
+                self._writes_since_eviction = 0
+                self.stats["evictions"] += await self.repo.evict(now, scraper_settings.LLM_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"LLM cache write failed: {e}")
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not scraper_settings.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache(LLMResponseCacheRepository(llm_cache_database))
+    return _cache
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    cache = get_llm_response_cache()
+    stats = dict(cache.stats) if cache else {}
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["enabled"] = cache is not None
+    stats["bypass"] = scraper_settings.LLM_CACHE_BYPASS
+    return stats
@@ -0,0 +1,55 @@
+# app/utils/llm_calls.py
+import asyncio
+import time
+from typing import Any, Optional
+from app.scraper_config import scraper_settings
+from app.utils.llm_cache import get_llm_response_cache
+from app.utils.model_routing import ModelRoute, get_routing_stats
+from app.utils.rate_limiter import get_rate_limiter
+
+
+async def ainvoke_chain(chain, inputs: dict, host: str, config: Optional[dict] = None, timeout: Optional[float] = None, use_cache: bool = True, route: Optional[ModelRoute] = None) -> Any:
+    """
+    Run a LangChain runnable without blocking the event loop: take a token for `host`, await
+    chain.ainvoke under a per-call timeout, and back off the host's bucket on a 429.
+    Cancelling the caller cancels the in-flight request.
+    Outputs are served from / written to the persistent LLM response cache unless `use_cache`
+    is False; LLM_CACHE_BYPASS skips the read but still refreshes the entry.
+    With a `route` (see route_model) the tier decision goes into the run metadata and the
+    call's latency into the routing stats.
+    """
+    if route:
+        config = {**(config or {}), "metadata": {**(config or {}).get("metadata", {}), **route.metadata}}
+    cache = get_llm_response_cache() if use_cache else None
+    if cache:
+        cache_key, model, prompt_hash = cache.make_key(chain, inputs)
+        if scraper_settings.LLM_CACHE_BYPASS:
+            cache.stats["bypassed"] += 1
+        else:
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                if route:
+                    get_routing_stats().record(route, None, cached=True)
+                return cached
+
+    timeout = timeout if timeout is not None else scraper_settings.LLM_TIMEOUT_SECONDS
+    rate_limiter = get_rate_limiter()
+    await rate_limiter.acquire(host)
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(chain.ainvoke(inputs, config=config), timeout=timeout)
+    except asyncio.TimeoutError:
+        if route:
+            get_routing_stats().record(route, None, failed=True)
+        raise TimeoutError(f"LLM call to {host} timed out after {timeout} seconds") from None
+    except Exception as e:
+        if route:
+            get_routing_stats().record(route, None, failed=True)
+        await rate_limiter.back_off_from_error(host, e)
+        raise
+    if route:
+        get_routing_stats().record(route, time.monotonic() - started)
+
+    if cache:
+        await cache.put(cache_key, model, prompt_hash, result)
+    return result
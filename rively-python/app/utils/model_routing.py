@@ -0,0 +1,132 @@
+# app/utils/model_routing.py
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from langchain_groq import ChatGroq
+from langchain_openai import ChatOpenAI
+from portkey_ai import createHeaders, PORTKEY_GATEWAY_URL
+from app.config import settings
+from app.scraper_config import scraper_settings
+
+# Rate-limiter bucket per provider
+PROVIDER_HOSTS = {
+    "portkey": urlparse(PORTKEY_GATEWAY_URL).hostname,
+    "groq": "api.groq.com",
+}
+
+
+class ModelRoute:
+    """The model an LLM step runs on: its tier, the chat model and the host whose rate limit it uses."""
+
+    def __init__(self, step: str, tier: str, provider: str, model: str, llm):
+        self.step = step
+        self.tier = tier
+        self.provider = provider
+        self.model = model
+        self.llm = llm
+        self.host = PROVIDER_HOSTS[provider]
+
+    @property
+    def metadata(self) -> Dict[str, str]:
+        """Routing decision for the LangSmith run metadata."""
+        return {"model_tier": self.tier, "model_provider": self.provider, "model": self.model or "portkey-default"}
+
+
+def _build_llm(provider: str, model: str, temperature: float, portkey_config: Optional[str] = None):
+    if provider == "groq":
+        return ChatGroq(model=model, groq_api_key=settings.GROQ_API_KEY, temperature=temperature, timeout=scraper_settings.LLM_TIMEOUT_SECONDS)
+    if provider == "portkey":
+        # Without a model (or with a Portkey config that overrides it) Portkey picks model and provider
+        portkey_headers = createHeaders(api_key=settings.PORTKEY_KEY, config=portkey_config) if portkey_config else createHeaders(api_key=settings.PORTKEY_KEY)
+        kwargs = {"model": model} if model else {}
+        return ChatOpenAI(
+            api_key="dummy-key-portkey-handles-routing",
+            base_url=PORTKEY_GATEWAY_URL,
+            default_headers=portkey_headers,
+            temperature=temperature,
+            timeout=scraper_settings.LLM_TIMEOUT_SECONDS,
+            **kwargs
+        )
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+# Chat models per tier, built on first use; a tier's client is shared by every step routed to it
+_models: Dict[str, Any] = {}
+
+
+def route_model(step: str) -> ModelRoute:
+    """Pick the tier for `step` from LLM_LAYER_TIERS (LLM_DEFAULT_TIER when unlisted) and return its model."""
+    tier = scraper_settings.LLM_LAYER_TIERS.get(step, scraper_settings.LLM_DEFAULT_TIER)
+    if tier not in scraper_settings.LLM_MODEL_TIERS:
+        print(f"Unknown model tier {tier!r} for {step}; using {scraper_settings.LLM_DEFAULT_TIER}")
+        tier = scraper_settings.LLM_DEFAULT_TIER
+    spec = scraper_settings.LLM_MODEL_TIERS[tier]
+    provider = spec.get("provider", "portkey")
+    model = spec.get("model", "")
+    if tier not in _models:
+        _models[tier] = _build_llm(provider, model, float(spec.get("temperature", 0.7)), spec.get("portkey_config"))
+    return ModelRoute(step, tier, provider, model, _models[tier])
+
+
+class RoutingStats:
+    """Calls, cache hits, errors and recent latencies per (step, tier), for tuning LLM_LAYER_TIERS."""
+
+    def __init__(self, samples: int):
+        self.samples = samples
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def _counter(self, key: Tuple[str, str]) -> Dict[str, int]:
+        if key not in self._counters:
+            self._counters[key] = {"calls": 0, "cache_hits": 0, "errors": 0}
+            self._latencies[key] = deque(maxlen=self.samples)
+        return self._counters[key]
+
+    def record(self, route: ModelRoute, seconds: Optional[float], cached: bool = False, failed: bool = False):
+        key = (route.step, route.tier)
+        counter = self._counter(key)
+        if cached:
+            counter["cache_hits"] += 1
+            return
+        counter["calls"] += 1
+        if failed:
+            counter["errors"] += 1
+        elif seconds is not None:
+            self._latencies[key].append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        steps: Dict[str, Any] = {}
+        tiers: Dict[str, Any] = {}
+        for (step, tier), counter in self._counters.items():
+            latencies = sorted(self._latencies[(step, tier)])
+            steps[f"{step}:{tier}"] = {**counter, **_latency_summary(latencies)}
+            tier_entry = tiers.setdefault(tier, {"calls": 0, "cache_hits": 0, "errors": 0, "_latencies": []})
+            for name, value in counter.items():
+                tier_entry[name] += value
+            tier_entry["_latencies"].extend(latencies)
+        for tier, tier_entry in tiers.items():
+            tier_entry.update(_latency_summary(sorted(tier_entry.pop("_latencies"))))
+        return {
+            "policy": {"layer_tiers": scraper_settings.LLM_LAYER_TIERS, "default_tier": scraper_settings.LLM_DEFAULT_TIER},
+            "tiers": tiers,
+            "steps": steps,
+        }
+
+
+def _latency_summary(latencies) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"latency_p50_seconds": None, "latency_p95_seconds": None}
+    return {
+        "latency_p50_seconds": round(latencies[len(latencies) // 2], 3),
+        "latency_p95_seconds": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+    }
+
+
+_stats: Optional[RoutingStats] = None
+
+
+def get_routing_stats() -> RoutingStats:
+    global _stats
+    if _stats is None:
+        _stats = RoutingStats(scraper_settings.LLM_ROUTING_LATENCY_SAMPLES)
+    return _stats
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from databases import Database
+from app.db.database import database
+from app.scraper_config import scraper_settings
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this process; enough for a single worker."""
+
+    def __init__(self):
+        self.buckets: Dict[str, Dict[str, float]] = {}
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        """
+        Reserve one token and return how many seconds the caller must wait before using it.
+        Tokens may go negative, so concurrent callers queue up behind each other instead of retrying.
+        """
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(key, {"tokens": burst, "updated_at": now, "blocked_until": 0.0})
+        bucket["tokens"] = min(burst, bucket["tokens"] + (now - bucket["updated_at"]) * rate) - 1
+        bucket["updated_at"] = now
+        return max(0.0, -bucket["tokens"] / rate, bucket["blocked_until"] - now)
+
+    async def block(self, key: str, seconds: float) -> None:
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(key, {"tokens": 0.0, "updated_at": now, "blocked_until": 0.0})
+        bucket["blocked_until"] = max(bucket["blocked_until"], now + seconds)
+
+
+class DatabaseBucketStore:
+    """
+    Token buckets in the rate_limit_buckets table (Postgres), shared by every worker and node.
+    Refill and reservation happen in one upsert on the database clock, so workers never race.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        query = """
+            INSERT INTO rate_limit_buckets (bucket_key, tokens, updated_at)
+            VALUES (:bucket_key, CAST(:burst AS DOUBLE PRECISION) - 1, timezone('utc', now()))
+            ON CONFLICT (bucket_key) DO UPDATE SET
+                tokens = LEAST(
+                    CAST(:burst AS DOUBLE PRECISION),
+                    rate_limit_buckets.tokens
+                        + EXTRACT(EPOCH FROM (timezone('utc', now()) - rate_limit_buckets.updated_at)) * CAST(:rate AS DOUBLE PRECISION)
+                ) - 1,
+                updated_at = timezone('utc', now())
+            RETURNING GREATEST(
+                0,
+                -tokens / CAST(:rate AS DOUBLE PRECISION),
+                COALESCE(EXTRACT(EPOCH FROM (blocked_until - timezone('utc', now()))), 0)
+            ) AS wait_seconds
+        """
+        row = await self.db.fetch_one(query=query, values={"bucket_key": key, "rate": rate, "burst": burst})
+        return float(row["wait_seconds"])
+
+    async def block(self, key: str, seconds: float) -> None:
+        query = """
+            INSERT INTO rate_limit_buckets (bucket_key, tokens, updated_at, blocked_until)
+            VALUES (:bucket_key, 0, timezone('utc', now()), timezone('utc', now()) + CAST(:seconds AS DOUBLE PRECISION) * INTERVAL '1 second')
+            ON CONFLICT (bucket_key) DO UPDATE SET
+                blocked_until = GREATEST(
+                    COALESCE(rate_limit_buckets.blocked_until, EXCLUDED.blocked_until),
+                    EXCLUDED.blocked_until
+                )
+        """
+        await self.db.execute(query=query, values={"bucket_key": key, "seconds": seconds})
+
+
+class UpstreamRateLimiter:
+    """
+    One token bucket per upstream host, configured in UPSTREAM_RATE_LIMITS.
+    Hosts without a configured limit are not throttled, but a Retry-After they send is still honoured.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]], store):
+        self.limits = limits
+        self.store = store
+
+    def is_limited(self, host: str) -> bool:
+        return host in self.limits
+
+    async def acquire(self, host: str) -> None:
+        limit = self.limits.get(host)
+        if not limit:
+            return
+        wait_seconds = await self.store.take(host, float(limit["rate"]), float(limit["burst"]))
+        if wait_seconds > 0:
+            print(f"Rate limiting {host}: waiting {wait_seconds:.2f}s")
+            await asyncio.sleep(wait_seconds)
+
+    async def back_off(self, host: str, seconds: float) -> None:
+        """Record a Retry-After so every caller of this host (in every worker, with a shared store) waits it out."""
+        if self.is_limited(host):
+            await self.store.block(host, seconds)
+
+    async def back_off_from_error(self, host: str, error: Exception) -> None:
+        """Honour the Retry-After of a 429 raised by an SDK client (openai/groq errors carry the httpx response)."""
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) != 429:
+            return
+        retry_after = parse_retry_after(
+            response.headers.get("retry-after"), scraper_settings.RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+        )
+        await self.back_off(host, retry_after)
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Parse a Retry-After header given either as delta-seconds or as an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+_rate_limiter: Optional[UpstreamRateLimiter] = None
+
+
+def get_rate_limiter() -> UpstreamRateLimiter:
+    """Process-wide limiter; RATE_LIMIT_STORE=database shares the buckets through Postgres."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        if scraper_settings.RATE_LIMIT_STORE == "database":
+            store = DatabaseBucketStore(database)
+        else:
+            store = InMemoryBucketStore()
+        _rate_limiter = UpstreamRateLimiter(scraper_settings.UPSTREAM_RATE_LIMITS, store)
+    return _rate_limiter
@@ -0,0 +1,78 @@
+# app/utils/shared_fetch.py
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from app.scraper_config import scraper_settings
+
+
+class SharedFetchCache:
+    """
+    Short-lived, in-process memo of source fetches (LinkedIn posts, changelog pages) so that
+    customers tracking the same competitor in one scrape round share a single request.
+    Concurrent callers for the same key wait on the one fetch in flight.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The cached value for `key` if it is still fresh, else None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        now = time.monotonic()
+        # Drop expired entries as we go so the memo never outlives a scrape round by much
+        for stale in [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl_seconds]:
+            del self._entries[stale]
+        self._entries[key] = (now, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget `key`; a fetch already in flight still completes for the callers waiting on it."""
+        self._entries.pop(key, None)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self.get(key)
+        if cached is not None:
+            print(f"Shared fetch hit: {key}")
+            return cached
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await fetch()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Failures are not cached; waiters see the same exception and the next caller retries
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+_cache: Optional[SharedFetchCache] = None
+
+
+def get_shared_fetch_cache() -> SharedFetchCache:
+    global _cache
+    if _cache is None:
+        _cache = SharedFetchCache(scraper_settings.SHARED_FETCH_TTL_SECONDS)
+    return _cache
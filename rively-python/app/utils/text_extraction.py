@@ -0,0 +1,142 @@
+# app/utils/text_extraction.py
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from app.scraper_config import scraper_settings
+
+# Elements whose content never reaches the prompt
+SKIPPED_TAGS = {"script", "style", "meta", "link", "noscript", "template", "svg", "head"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", text).strip() if text else ""
+
+
+def _link_fragment(link_text: str, href: str, base_url: str) -> str:
+    return f"[{link_text}]({urljoin(base_url, href)})"
+
+
+def extract_fragments_lxml(page: Union[bytes, str], base_url: str) -> List[str]:
+    """
+    Single pass over the lxml tree. Links are emitted once as [text](absolute_url) and their
+    inner text is not repeated; <time> keeps its datetime; consecutive duplicate fragments are dropped.
+    """
+    if not page:
+        return []
+    try:
+        root = lxml_html.document_fromstring(page)
+    except (etree.ParserError, ValueError):
+        return []
+
+    fragments: List[str] = []
+
+    def emit(text: str):
+        if text and (not fragments or fragments[-1] != text):
+            fragments.append(text)
+
+    skip_depth = 0
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            if skip_depth:
+                skip_depth += 1
+                continue
+            tag = element.tag if isinstance(element.tag, str) else None
+            if tag is None or tag in SKIPPED_TAGS:
+                # Comments, processing instructions and non-content elements: skip the subtree, keep the tail
+                skip_depth = 1
+                continue
+            if tag == "time" and element.get("datetime"):
+                # Keep the machine-readable date so relative labels ("3 days ago") stay datable
+                time_text = _clean(element.text_content())
+                machine_date = element.get("datetime", "").strip()[:10]
+                emit(time_text if machine_date in time_text else _clean(f"{time_text} ({machine_date})"))
+                skip_depth = 1
+                continue
+            if tag == "a":
+                href = element.get("href", "")
+                link_text = _clean(element.text_content())
+                if href and link_text:
+                    emit(_link_fragment(link_text, href, base_url))
+                    skip_depth = 1
+                    continue
+            emit(_clean(element.text))
+        else:
+            if skip_depth:
+                skip_depth -= 1
+                if skip_depth:
+                    continue
+            emit(_clean(element.tail))
+    return fragments
+
+
+def extract_fragments_bs4(page: Union[bytes, str], base_url: str) -> List[str]:
+    """
+    The original BeautifulSoup walk over soup.descendants, kept as a fallback and as the
+    baseline for benchmark_text_extraction.py. Link text is also emitted as a bare string.
+    """
+    soup = BeautifulSoup(page, 'html.parser')
+    for element in soup(['script', 'style', 'meta', 'link']):
+        element.decompose()
+
+    text_with_links = []
+    for element in soup.descendants:
+        if element.name == 'a':
+            link = element.get('href', '')
+            link_text = element.get_text(strip=True)
+            if link and link_text:
+                text_with_links.append(_link_fragment(link_text, link, base_url))
+        elif isinstance(element, str):
+            fragment = _clean(element)
+            if fragment:
+                text_with_links.append(fragment)
+    return text_with_links
+
+
+# Extraction engines by name; TEXT_EXTRACTION_ENGINE picks the one used by the scrapers
+EXTRACTORS: Dict[str, Callable[[Union[bytes, str], str], List[str]]] = {
+    "lxml": extract_fragments_lxml,
+    "bs4": extract_fragments_bs4,
+}
+
+
+def extract_text_fragments(page: Union[bytes, str], base_url: str, engine: Optional[str] = None) -> List[str]:
+    engine = engine or scraper_settings.TEXT_EXTRACTION_ENGINE
+    if engine not in EXTRACTORS:
+        raise ValueError(f"Unknown text extraction engine: {engine}")
+    return EXTRACTORS[engine](page, base_url)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=scraper_settings.TEXT_EXTRACTION_PROCESSES)
+    return _process_pool
+
+
+async def extract_text_fragments_async(page: Union[bytes, str], base_url: str, engine: Optional[str] = None) -> List[str]:
+    """
+    Extract off the event loop. Pages above TEXT_EXTRACTION_PROCESS_MIN_BYTES go to the
+    process pool; smaller ones are cheaper to parse inline than to pickle across processes.
+    """
+    engine = engine or scraper_settings.TEXT_EXTRACTION_ENGINE
+    if scraper_settings.TEXT_EXTRACTION_PROCESSES <= 0 or len(page) < scraper_settings.TEXT_EXTRACTION_PROCESS_MIN_BYTES:
+        return extract_text_fragments(page, base_url, engine)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_process_pool(), extract_text_fragments, page, base_url, engine)
+
+
+def shutdown_text_extraction_pool() -> None:
+    """Stop the worker processes; called from the app lifespan on shutdown."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
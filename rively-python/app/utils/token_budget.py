@@ -0,0 +1,138 @@
+# app/utils/token_budget.py
+import math
+import re
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from app.scraper_config import scraper_settings
+
+# Rough English average for the OpenAI / Llama tokenizers; used when tiktoken has no encoding available
+CHARS_PER_TOKEN = 4
+
+# Trim points, coarsest first: blank-line sections, lines, sentence ends
+_SECTION_BREAK = re.compile(r"\n\s*\n")
+_LINE_BREAK = re.compile(r"\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Encodings by model name; None once tiktoken failed for that model so it is not retried per call
+_encodings: Dict[str, Any] = {}
+
+
+def _encoding(model: Optional[str]):
+    model = model or scraper_settings.TOKEN_BUDGET_MODEL
+    if model not in _encodings:
+        try:
+            import tiktoken
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                # Llama and other non-OpenAI models: cl100k_base is within a few percent
+                _encodings[model] = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # tiktoken downloads its BPE files on first use; offline workers fall back to CHARS_PER_TOKEN
+            print(f"No tokenizer for {model}, estimating {CHARS_PER_TOKEN} chars per token: {e}")
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model) if scraper_settings.TOKEN_BUDGET_USE_TIKTOKEN else None
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class BudgetedText(BaseModel):
+    text: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def dropped_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+    @property
+    def trimmed(self) -> bool:
+        return self.original_tokens > self.tokens
+
+
+# Per-prompt counters since startup: items budgeted, items trimmed, tokens in and tokens dropped
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(label: str, budgeted: BudgetedText):
+    stats = _stats.setdefault(label, {"items": 0, "trimmed": 0, "tokens": 0, "dropped_tokens": 0})
+    stats["items"] += 1
+    stats["tokens"] += budgeted.original_tokens
+    if budgeted.trimmed:
+        stats["trimmed"] += 1
+        stats["dropped_tokens"] += budgeted.dropped_tokens
+        print(f"Token budget [{label}]: kept {budgeted.tokens} of {budgeted.original_tokens} tokens")
+
+
+def get_token_budget_stats() -> Dict[str, Dict[str, int]]:
+    return {label: dict(stats) for label, stats in _stats.items()}
+
+
+def _keep_head(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """
+    Longest prefix of `text` under max_tokens that ends on a section, line or sentence boundary;
+    on a tie the coarser boundary wins.
+    """
+    best_end = 0
+    for boundary in (_SECTION_BREAK, _LINE_BREAK, _SENTENCE_END):
+        # Segments are counted separately, so the sum slightly overestimates and the prefix stays under budget
+        kept_end, used, start = 0, 0, 0
+        for end in [match.start() for match in boundary.finditer(text)] + [len(text)]:
+            used += estimate_tokens(text[start:end], model)
+            if used > max_tokens:
+                break
+            kept_end, start = end, end
+        if kept_end > best_end:
+            best_end = kept_end
+    if text[:best_end].strip():
+        return text[:best_end].rstrip()
+    # One sentence longer than the whole budget: cut on a word boundary
+    kept = text[:max_tokens * CHARS_PER_TOKEN]
+    while kept and estimate_tokens(kept, model) > max_tokens:
+        kept = kept[:int(len(kept) * 0.9)]
+    return kept.rsplit(" ", 1)[0] if " " in kept else kept
+
+
+def fit_to_budget(text: str, max_tokens: int, label: str, model: Optional[str] = None) -> BudgetedText:
+    """
+    Trim `text` to at most `max_tokens`, keeping the beginning (where feeds, pages and posts put
+    the newest or most important content) and cutting on a section, line or sentence boundary.
+    What was dropped is counted under `label` in get_token_budget_stats().
+    """
+    text = text or ""
+    original_tokens = estimate_tokens(text, model)
+    if original_tokens <= max_tokens:
+        budgeted = BudgetedText(text=text, tokens=original_tokens, original_tokens=original_tokens)
+    else:
+        kept = _keep_head(text, max_tokens, model)
+        budgeted = BudgetedText(text=kept, tokens=estimate_tokens(kept, model), original_tokens=original_tokens)
+    _record(label, budgeted)
+    return budgeted
+
+
+def trim_to_budget(text: str, max_tokens: int, label: str, model: Optional[str] = None) -> str:
+    return fit_to_budget(text, max_tokens, label, model).text
+
+
+def chunk_by_budget(texts: List[str], max_tokens: int, max_items: int, model: Optional[str] = None) -> List[List[int]]:
+    """Group indices of `texts` in order into chunks of at most `max_items` items and `max_tokens` tokens."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text, model)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the changelog HTML-to-text engines (app/utils/text_extraction.py) on saved pages.
+
+Usage:
+    python benchmark_text_extraction.py page1.html saved_pages/ [--repeat 20] [--base-url https://example.com/changelog]
+
+Directories are searched for *.html files. Without any path a synthetic changelog page is used.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Run from the rively-python directory so `app` is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.text_extraction import EXTRACTORS
+
+
+def synthetic_changelog_page(entries: int = 400) -> bytes:
+    """A changelog-shaped page: nav, many dated entries with links, footer, inline scripts."""
+    parts = ["<html><head><title>Changelog</title><style>body{}</style><script>var x = 1;</script></head><body>"]
+    parts.append("<nav>" + "".join(f"<a href='/section/{i}'>Section {i}</a>" for i in range(30)) + "</nav>")
+    for i in range(entries):
+        parts.append(
+            f"<article><h2><time datetime='2025-07-{i % 28 + 1:02d}'>July {i % 28 + 1}, 2025</time></h2>"
+            f"<p>Release {i}: improved <a href='/docs/feature-{i}'><strong>feature {i}</strong></a> and fixed "
+            f"<em>bug {i}</em> in the <code>api</code>.</p><ul><li>Faster sync</li><li>New export</li></ul>"
+            f"<script>track({i});</script></article>"
+        )
+    parts.append("<footer><a href='/privacy'>Privacy</a> <a href='/terms'>Terms</a></footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def load_pages(paths):
+    pages = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.html")) if path.is_dir() else [path]
+        for file in files:
+            pages.append((file.name, file.read_bytes()))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Saved .html files or directories of them")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per page and engine")
+    parser.add_argument("--base-url", default="https://example.com/changelog", help="Base URL used to resolve links")
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths) if args.paths else [("synthetic.html", synthetic_changelog_page())]
+    if not pages:
+        print("No .html pages found")
+        return 1
+
+    print(f"{'page':<30} {'engine':<6} {'KB':>8} {'ms/page':>10} {'fragments':>10} {'chars':>10}")
+    totals = {engine: 0.0 for engine in EXTRACTORS}
+    for name, page in pages:
+        for engine, extract in EXTRACTORS.items():
+            fragments = extract(page, args.base_url)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                extract(page, args.base_url)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+            totals[engine] += elapsed_ms
+            chars = len(" ".join(fragments))
+            print(f"{name[:30]:<30} {engine:<6} {len(page) / 1024:>8.1f} {elapsed_ms:>10.2f} {len(fragments):>10} {chars:>10}")
+
+    baseline = totals.get("bs4")
+    print()
+    for engine, total in totals.items():
+        speedup = f" ({baseline / total:.1f}x vs bs4)" if baseline and total else ""
+        print(f"{engine:<6} total {total:.2f} ms{speedup}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+from datetime import date
+
+from app.utils.changelog_sections import (
+    ChangelogSection,
+    changed_sections,
+    parse_date,
+    sections_since,
+    split_dated_sections,
+)
+
+
+def test_parse_date_formats():
+    assert parse_date("Released 2025-08-14") == date(2025, 8, 14)
+    assert parse_date("August 14th, 2025") == date(2025, 8, 14)
+    assert parse_date("14 Aug 2025") == date(2025, 8, 14)
+    assert parse_date("Sept. 3, 2025") == date(2025, 9, 3)
+    assert parse_date("08/14/2025") == date(2025, 8, 14)
+    assert parse_date("14/08/2025") == date(2025, 8, 14)
+    assert parse_date("No date here") is None
+
+
+def test_parse_date_month_only_is_first_of_month():
+    assert parse_date("August 2025") == date(2025, 8, 1)
+
+
+def test_split_dated_sections_drops_preamble_and_long_fragments():
+    fragments = [
+        "Changelog",
+        "Subscribe for updates",
+        "August 14, 2025",
+        "New dashboard",
+        "We shipped a new dashboard, first announced on August 1, 2025 at our user conference in Berlin.",
+        "August 2, 2025",
+        "Bug fixes",
+    ]
+    sections = split_dated_sections(fragments)
+    assert [section.date for section in sections] == [date(2025, 8, 14), date(2025, 8, 2)]
+    assert sections[0].text.startswith("August 14, 2025 New dashboard We shipped")
+    assert sections[1].text == "August 2, 2025 Bug fixes"
+
+
+def test_split_dated_sections_without_dates():
+    assert split_dated_sections(["Changelog", "Some release notes"]) == []
+
+
+def test_sections_since_window_and_merge():
+    sections = [
+        ChangelogSection(date=date(2025, 8, 20), text="roadmap"),
+        ChangelogSection(date=date(2025, 8, 14), text="a"),
+        ChangelogSection(date=date(2025, 8, 14), text="b"),
+        ChangelogSection(date=date(2025, 8, 10), text="c"),
+        ChangelogSection(date=date(2025, 8, 1), text="old"),
+    ]
+    recent = sections_since(sections, since=date(2025, 8, 8), until=date(2025, 8, 15))
+    assert [(section.date, section.text) for section in recent] == [
+        (date(2025, 8, 14), "a b"),
+        (date(2025, 8, 10), "c"),
+    ]
+
+
+def test_sections_since_keeps_current_month_only_entry():
+    sections = split_dated_sections(["August 2025", "Monthly release", "July 2025", "Older release", "September 2025", "Planned"])
+    recent = sections_since(sections, since=date(2025, 8, 8), until=date(2025, 8, 15))
+    assert [section.text for section in recent] == ["August 2025 Monthly release"]
+    assert recent[0].month_only
+    assert recent[0].label == "August 2025"
+
+
+def test_sections_since_month_only_entry_across_month_boundary():
+    sections = split_dated_sections(["July 2025", "Release"])
+    assert sections_since(sections, since=date(2025, 7, 28), until=date(2025, 8, 3))
+    assert not sections_since(sections, since=date(2025, 8, 1), until=date(2025, 8, 3))
+
+
+def test_changed_sections_returns_new_and_edited_entries():
+    previous = [
+        ChangelogSection(date=date(2025, 8, 10), text="August 10, 2025 Bug fixes"),
+        ChangelogSection(date=date(2025, 8, 2), text="August 2, 2025 Old release"),
+    ]
+    current = [
+        ChangelogSection(date=date(2025, 8, 14), text="August 14, 2025 New release"),
+        ChangelogSection(date=date(2025, 8, 10), text="August 10, 2025  bug fixes and a new export"),
+        ChangelogSection(date=date(2025, 8, 2), text="August 2,  2025 OLD release"),
+    ]
+    assert [section.date for section in changed_sections(previous, current)] == [date(2025, 8, 14), date(2025, 8, 10)]
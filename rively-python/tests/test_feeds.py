@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from app.utils.feeds import (
+    advertised_feed_urls,
+    feed_kind,
+    guessed_feed_urls,
+    is_under,
+    parse_feed,
+    parse_feed_date,
+    sitemap_url,
+)
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>Changelog</title>
+    <item>
+      <title>New export</title>
+      <link>/changelog/new-export</link>
+      <pubDate>Thu, 14 Aug 2025 10:00:00 +0200</pubDate>
+      <description>Short</description>
+      <content:encoded><![CDATA[<p>Export to <b>CSV</b></p>]]></content:encoded>
+    </item>
+    <item>
+      <title>Undated</title>
+      <guid>https://example.com/changelog/undated</guid>
+    </item>
+  </channel>
+</rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title>Dark mode</title>
+    <link rel="self" href="https://example.com/feed/1"/>
+    <link href="https://example.com/changelog/dark-mode"/>
+    <updated>2025-08-14T08:00:00Z</updated>
+    <summary type="html">&lt;p&gt;Dark mode is here&lt;/p&gt;</summary>
+  </entry>
+</feed>"""
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/changelog/a</loc><lastmod>2025-08-14</lastmod></url>
+  <url><loc>https://example.com/pricing</loc></url>
+</urlset>"""
+
+
+def test_feed_kind():
+    assert feed_kind(RSS) == "rss"
+    assert feed_kind(ATOM) == "atom"
+    assert feed_kind(SITEMAP) == "sitemap"
+    assert feed_kind(b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"/>') == "sitemapindex"
+    assert feed_kind(b"<html><body>Not a feed</body></html>") is None
+    assert feed_kind(b"not xml at all") is None
+
+
+def test_parse_rss():
+    entries = parse_feed(RSS, "https://example.com/changelog")
+    assert [entry.link for entry in entries] == [
+        "https://example.com/changelog/new-export",
+        "https://example.com/changelog/undated",
+    ]
+    assert entries[0].published_at == datetime(2025, 8, 14, 8, 0)
+    assert entries[0].content == "Export to CSV"
+    assert entries[1].published_at is None
+
+
+def test_parse_atom_uses_alternate_link():
+    [entry] = parse_feed(ATOM)
+    assert entry.title == "Dark mode"
+    assert entry.link == "https://example.com/changelog/dark-mode"
+    assert entry.published_at == datetime(2025, 8, 14, 8, 0)
+    assert entry.content == "Dark mode is here"
+
+
+def test_parse_sitemap():
+    entries = parse_feed(SITEMAP)
+    assert [(entry.link, entry.published_at) for entry in entries] == [
+        ("https://example.com/changelog/a", datetime(2025, 8, 14)),
+        ("https://example.com/pricing", None),
+    ]
+
+
+def test_parse_feed_does_not_expand_entities():
+    document = b"""<?xml version="1.0"?>
+<!DOCTYPE rss [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+<rss version="2.0"><channel><item><title>&secret;</title><link>https://example.com/a</link></item></channel></rss>"""
+    entries = parse_feed(document)
+    assert all("root:" not in entry.title for entry in entries)
+
+
+def test_parse_feed_date():
+    assert parse_feed_date("Thu, 14 Aug 2025 10:00:00 GMT") == datetime(2025, 8, 14, 10, 0)
+    assert parse_feed_date("2025-08-14T10:00:00+02:00") == datetime(2025, 8, 14, 8, 0)
+    assert parse_feed_date("yesterday") is None
+    assert parse_feed_date("") is None
+
+
+def test_feed_urls():
+    page = b"""<html><head>
+        <link rel="alternate" type="application/rss+xml" href="/changelog/rss.xml">
+        <link rel="stylesheet" href="/site.css">
+    </head><body></body></html>"""
+    assert advertised_feed_urls(page, "https://example.com/changelog") == ["https://example.com/changelog/rss.xml"]
+    assert guessed_feed_urls("https://example.com/changelog")[0] == "https://example.com/changelog/rss.xml"
+    assert sitemap_url("https://example.com/changelog") == "https://example.com/sitemap.xml"
+
+
+def test_is_under():
+    assert is_under("https://example.com/changelog/2025-08-export", "https://example.com/changelog")
+    assert not is_under("https://example.com/changelog/", "https://example.com/changelog")
+    assert not is_under("https://example.com/changelogs-old", "https://example.com/changelog")
+    assert not is_under("https://other.com/changelog/a", "https://example.com/changelog")
@@ -0,0 +1,73 @@
+import pytest
+
+from app.scraper_config import ScraperSettings, scraper_settings
+from app.utils import model_routing
+from app.utils.model_routing import RoutingStats, route_model
+
+TIERS = {
+    "portkey": {"provider": "portkey", "model": "", "temperature": 0.7},
+    "groq": {"provider": "groq", "model": "llama3-70b-8192", "temperature": 0.7},
+    "small": {"provider": "portkey", "model": "llama-3.1-8b-instant", "temperature": 0.0},
+}
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Record the chat models route_model builds instead of creating real clients."""
+    calls = []
+
+    def build_llm(provider, model, temperature, portkey_config=None):
+        calls.append((provider, model, temperature))
+        return object()
+
+    monkeypatch.setattr(model_routing, "_build_llm", build_llm)
+    monkeypatch.setattr(model_routing, "_models", {})
+    monkeypatch.setattr(scraper_settings, "LLM_MODEL_TIERS", TIERS)
+    monkeypatch.setattr(scraper_settings, "LLM_LAYER_TIERS", {"first_layer": "small", "url_discovery": "groq", "final_layer": "missing"})
+    monkeypatch.setattr(scraper_settings, "LLM_DEFAULT_TIER", "portkey")
+    return calls
+
+
+def test_route_model_uses_layer_tier(built):
+    route = route_model("first_layer")
+    assert (route.tier, route.provider, route.model) == ("small", "portkey", "llama-3.1-8b-instant")
+    assert route.host == model_routing.PROVIDER_HOSTS["portkey"]
+    assert route_model("url_discovery").host == "api.groq.com"
+
+
+def test_route_model_falls_back_to_default_tier(built):
+    assert route_model("second_layer").tier == "portkey"
+    # A step mapped to a tier that does not exist also runs on the default tier
+    assert route_model("final_layer").tier == "portkey"
+
+
+def test_tier_client_is_shared_between_steps(built):
+    first = route_model("second_layer")
+    second = route_model("final_layer")
+    assert first.llm is second.llm
+    assert built == [("portkey", "", 0.7)]
+
+
+def test_default_tiers_keep_pre_routing_models():
+    defaults = ScraperSettings.model_fields["LLM_LAYER_TIERS"].default
+    assert defaults["url_discovery"] == "groq"
+    assert defaults["changelog_extraction"] == "groq"
+    assert {defaults[step] for step in ("first_layer", "second_layer", "final_layer")} == {"portkey"}
+
+
+def test_routing_stats(built):
+    stats = RoutingStats(samples=3)
+    route = route_model("first_layer")
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        stats.record(route, seconds)
+    stats.record(route, None, cached=True)
+    stats.record(route, 9.0, failed=True)
+
+    snapshot = stats.snapshot()
+    step = snapshot["steps"]["first_layer:small"]
+    assert (step["calls"], step["cache_hits"], step["errors"]) == (5, 1, 1)
+    # Only the last `samples` latencies are kept, and failed calls are not timed
+    assert step["latency_p50_seconds"] == 3.0
+    assert step["latency_p95_seconds"] == 4.0
+    assert snapshot["tiers"]["small"]["calls"] == 5
+    assert snapshot["policy"]["default_tier"] == "portkey"
@@ -0,0 +1,52 @@
+from app.services.prefilter import PrefilterModel, hashed_features, rule_hits
+
+PRODUCT_POST = (
+    "Today we are launching usage-based pricing for all plans, plus a new API for exporting "
+    "invoices and a self-serve migration path from the legacy seat-based tiers."
+)
+
+
+def test_rule_hits():
+    assert rule_hits("We're hiring! Join our growing team of engineers in Berlin and Lisbon today.") == ["hiring"]
+    assert "celebration" in rule_hits("Happy holidays from all of us at Acme, see you in the new year everyone!")
+    assert rule_hits("Short") == ["short_text"]
+    assert rule_hits(PRODUCT_POST) == []
+
+
+def test_hashed_features_are_unit_length():
+    features = hashed_features(PRODUCT_POST)
+    assert features
+    assert abs(sum(value * value for value in features.values()) - 1.0) < 1e-9
+    assert hashed_features("") == {}
+
+
+def test_untrained_model_scores_on_rules_only():
+    model = PrefilterModel()
+    hiring = model.score("We're hiring! Join our growing team of engineers in Berlin and Lisbon today.")
+    product = model.score(PRODUCT_POST)
+    assert hiring.reasons == ["hiring"]
+    assert hiring.probability >= 0.9
+    assert product.reasons == []
+    assert product.probability < 0.5
+
+
+def test_training_learns_word_weights():
+    samples = [(f"Team lunch photos from the offsite number {i}, what a great day with everyone", True) for i in range(20)]
+    samples += [(f"Release {i}: new SSO integration and audit log export for enterprise admins", False) for i in range(20)]
+    model = PrefilterModel()
+    model.train(samples, epochs=10)
+    assert model.score("Team lunch photos from the offsite, what a great day").probability > 0.5
+    assert model.score("New SSO integration and audit log export").probability < 0.5
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model = PrefilterModel()
+    model.train([("we are hiring engineers", True), (PRODUCT_POST, False)], epochs=2)
+    path = tmp_path / "model.json"
+    model.save(str(path), trained_on=2)
+    loaded = PrefilterModel.load(str(path))
+    assert loaded.score(PRODUCT_POST).probability == model.score(PRODUCT_POST).probability
+
+
+def test_load_without_model_file_uses_defaults(tmp_path):
+    assert PrefilterModel.load(str(tmp_path / "missing.json")).weights == {}
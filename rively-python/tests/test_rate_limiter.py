@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.utils import rate_limiter
+from app.utils.rate_limiter import InMemoryBucketStore, UpstreamRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+def take(store, n=1, rate=2.0, burst=3.0):
+    return [asyncio.run(store.take("host", rate, burst)) for _ in range(n)]
+
+
+def test_burst_then_callers_queue(clock):
+    store = InMemoryBucketStore()
+    assert take(store, 5) == [0.0, 0.0, 0.0, 0.5, 1.0]
+
+
+def test_refill_over_time(clock):
+    store = InMemoryBucketStore()
+    take(store, 3)
+    clock.now += 1.0
+    # Two tokens came back at 2 per second
+    assert take(store, 3) == [0.0, 0.0, 0.5]
+
+
+def test_refill_is_capped_at_burst(clock):
+    store = InMemoryBucketStore()
+    take(store, 3)
+    clock.now += 60.0
+    assert take(store, 4) == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_block_delays_until_retry_after(clock):
+    store = InMemoryBucketStore()
+    asyncio.run(store.block("host", 10.0))
+    clock.now += 4.0
+    assert take(store) == [6.0]
+
+
+def test_acquire_sleeps_for_the_wait(clock, monkeypatch):
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    limiter = UpstreamRateLimiter({"api.example.com": {"rate": 1, "burst": 1}}, InMemoryBucketStore())
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire("api.example.com")
+        await limiter.acquire("unlimited.example.com")
+
+    asyncio.run(run())
+    assert slept == [1.0, 2.0]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7", 5.0) == 7.0
+    assert parse_retry_after("-3", 5.0) == 0.0
+    assert parse_retry_after(None, 5.0) == 5.0
+    assert parse_retry_after("soon", 5.0) == 5.0
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25.0 <= parse_retry_after(retry_at, 5.0) <= 30.0
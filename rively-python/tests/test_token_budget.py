@@ -0,0 +1,59 @@
+import pytest
+
+from app.scraper_config import scraper_settings
+from app.utils.token_budget import chunk_by_budget, estimate_tokens, fit_to_budget, get_token_budget_stats, trim_to_budget
+
+
+@pytest.fixture(autouse=True)
+def estimate_by_characters(monkeypatch):
+    # 4 characters per token, so budgets are exact and no tokenizer files are needed
+    monkeypatch.setattr(scraper_settings, "TOKEN_BUDGET_USE_TIKTOKEN", False)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_text_under_budget_is_unchanged():
+    budgeted = fit_to_budget("Short text.", 100, "test_under")
+    assert budgeted.text == "Short text."
+    assert not budgeted.trimmed
+    assert get_token_budget_stats()["test_under"] == {"items": 1, "trimmed": 0, "tokens": 3, "dropped_tokens": 0}
+
+
+def test_trims_on_section_boundary():
+    text = "First section line one.\nLine two.\n\nSecond section " + "x" * 200
+    assert trim_to_budget(text, 12, "test_section") == "First section line one.\nLine two."
+
+
+def test_trims_on_sentence_boundary_inside_a_section():
+    text = "One sentence here. Another sentence here. " + "A third sentence that is much longer than the rest. " * 5
+    kept = trim_to_budget(text, 12, "test_sentence")
+    assert kept == "One sentence here. Another sentence here."
+
+
+def test_single_long_sentence_is_cut_on_a_word():
+    text = " ".join(f"word{i}" for i in range(100))
+    kept = trim_to_budget(text, 10, "test_word")
+    assert estimate_tokens(kept) <= 10
+    assert text.startswith(kept)
+    assert text[len(kept)] == " "
+
+
+def test_trimmed_text_is_counted():
+    budgeted = fit_to_budget("Keep this line.\n" + "drop " * 100, 5, "test_counted")
+    assert budgeted.trimmed
+    assert budgeted.tokens <= 5
+    stats = get_token_budget_stats()["test_counted"]
+    assert stats["trimmed"] == 1
+    assert stats["dropped_tokens"] == budgeted.original_tokens - budgeted.tokens
+
+
+def test_chunk_by_budget():
+    texts = ["a" * 40, "b" * 40, "c" * 40, "d" * 400, "e" * 4]
+    # 10 tokens each for the first three, 100 for the fourth, 1 for the last
+    assert chunk_by_budget(texts, max_tokens=25, max_items=8) == [[0, 1], [2], [3], [4]]
+    assert chunk_by_budget(texts, max_tokens=1000, max_items=2) == [[0, 1], [2, 3], [4]]
+    assert chunk_by_budget([], max_tokens=10, max_items=2) == []
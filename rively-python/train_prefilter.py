@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Train the local pre-filter (app/services/prefilter.py) from the shadow log.
+
+In PREFILTER_MODE=shadow every LinkedIn post is scored locally and logged with the first layer's
+verdict to app/logs/prefilter_shadow.jsonl. Stored company_updates cannot be used on their own:
+they hold only items that passed and keep the LLM's summary, not the raw text.
+
+Usage:
+    python train_prefilter.py [--log app/logs/prefilter_shadow.jsonl] [--out app/services/prefilter_model.json] [--epochs 10]
+
+Prints precision/recall of the "low value" prediction on a held-out 20% at PREFILTER_REJECT_THRESHOLD,
+then retrains on everything and writes the model. Set PREFILTER_MODE=enforce once precision is high enough.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+# Run from the rively-python directory so `app` is importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.scraper_config import scraper_settings
+from app.services.prefilter import SHADOW_LOG_PATH, PrefilterModel
+
+
+def log_files(path):
+    """The log and its rotated backups (path.1 is the most recent), oldest first."""
+    backups = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index += 1
+    return backups[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def load_samples(path):
+    samples = {}
+    for log_file in log_files(path):
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("llm_low_value") is None or not entry.get("text"):
+                    continue
+                # The latest verdict for a text wins; items are re-analysed across customers and prompt changes
+                samples[entry["text"]] = bool(entry["llm_low_value"])
+    return list(samples.items())
+
+
+def evaluate(model, samples, threshold):
+    tp = fp = fn = tn = 0
+    for text, low_value in samples:
+        predicted = model.score(text).probability >= threshold
+        tp += predicted and low_value
+        fp += predicted and not low_value
+        fn += (not predicted) and low_value
+        tn += (not predicted) and not low_value
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall, tp, fp, fn, tn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=SHADOW_LOG_PATH, help="Shadow log to learn from")
+    parser.add_argument("--out", default=scraper_settings.PREFILTER_MODEL_PATH, help="Where to write the model")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=scraper_settings.PREFILTER_REJECT_THRESHOLD)
+    args = parser.parse_args()
+
+    if not log_files(args.log):
+        print(f"No shadow log at {args.log}; run the scraper with PREFILTER_MODE=shadow first")
+        return 1
+    samples = load_samples(args.log)
+    low_value = sum(1 for _, label in samples if label)
+    print(f"{len(samples)} labelled items, {low_value} low value")
+    if len(samples) < 50 or low_value == 0 or low_value == len(samples):
+        print("Not enough labelled data of both kinds to train")
+        return 1
+
+    random.Random(0).shuffle(samples)
+    split = int(len(samples) * 0.8)
+    rules_only = PrefilterModel()
+    print("rules only  precision {:.2f} recall {:.2f} (tp {} fp {} fn {} tn {})".format(*evaluate(rules_only, samples[split:], args.threshold)))
+    held_out = PrefilterModel()
+    held_out.train(samples[:split], epochs=args.epochs)
+    print("trained     precision {:.2f} recall {:.2f} (tp {} fp {} fn {} tn {})".format(*evaluate(held_out, samples[split:], args.threshold)))
+
+    model = PrefilterModel()
+    model.train(samples, epochs=args.epochs)
+    model.save(args.out, trained_on=len(samples))
+    print(f"Model written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())